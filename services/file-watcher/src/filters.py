@@ -0,0 +1,26 @@
+"""Shared path filters for the file watcher and the Git commit monitor."""
+
+import re
+
+# Directory names whose contents are never watched or indexed
+IGNORE_DIRS = frozenset({
+    '__pycache__', 'node_modules', '.git', '.venv', 'venv',
+    'env', 'dist', 'build', 'target', '.pytest_cache',
+    '.mypy_cache', '.tox', 'coverage', 'htmlcov'
+})
+
+# File extensions (lowercase) that are watched and indexed
+EXTENSIONS = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.go', '.rs',
+    '.rb', '.c', '.cpp', '.h', '.hpp', '.md', '.txt', '.json',
+    '.yaml', '.yml', '.toml', '.ini', '.cfg'
+})
+
+# Lowercase suffixes as a tuple for a single C-level str.endswith() check
+EXTENSION_SUFFIXES = tuple(sorted(EXTENSIONS))
+
+# Matches paths containing an ignored directory segment or a hidden file name
+IGNORE_RE = re.compile(
+    r'(?:^|/)(?:' + '|'.join(re.escape(d) for d in sorted(IGNORE_DIRS)) + r')(?:/|$)'
+    r'|(?:^|/)\.[^/]*$'
+)
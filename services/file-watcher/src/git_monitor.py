@@ -1,146 +1,440 @@
 """Git commit monitor for tracking new commits."""
 
+import asyncio
+import inspect
+import json
 import logging
+import os
 import time
 import threading
-from typing import Optional, Callable, List
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Callable, List, Set, Tuple
 from pathlib import Path
-import git
+
+import pygit2
+
+from filters import IGNORE_DIRS, EXTENSIONS
 
 logger = logging.getLogger(__name__)
 
 
+def _stat_key(path) -> Tuple[int, int]:
+    """Return a file's (mtime in nanoseconds, inode), or (0, 0) if it does not exist.
+
+    Git rewrites refs by renaming a lockfile over them, so the inode changes
+    even when two updates land within the same mtime tick.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0, 0
+    return st.st_mtime_ns, st.st_ino
+
+
+# Status bits for staged, unstaged and untracked changes (ignored files excluded)
+_UNCOMMITTED_STATUS = (
+    pygit2.GIT_STATUS_INDEX_NEW | pygit2.GIT_STATUS_INDEX_MODIFIED |
+    pygit2.GIT_STATUS_INDEX_DELETED | pygit2.GIT_STATUS_INDEX_RENAMED |
+    pygit2.GIT_STATUS_INDEX_TYPECHANGE | pygit2.GIT_STATUS_WT_NEW |
+    pygit2.GIT_STATUS_WT_MODIFIED | pygit2.GIT_STATUS_WT_DELETED |
+    pygit2.GIT_STATUS_WT_RENAMED | pygit2.GIT_STATUS_WT_TYPECHANGE
+)
+
+
+def _is_indexable(name: str) -> bool:
+    """Check whether a file name has a watched extension."""
+    return os.path.splitext(name)[1].lower() in EXTENSIONS
+
+
+# Stand-in for the missing parent oid of a root commit in diff cache keys
+_NULL_OID = bytes(20)
+
+
+def _resolve_common_dir(git_dir: Path) -> Path:
+    """Resolve the directory holding shared refs (differs in worktrees)."""
+    try:
+        return (git_dir / (git_dir / 'commondir').read_text().strip()).resolve()
+    except OSError:
+        return git_dir
+
+
 class GitCommitMonitor:
     """Monitor a Git repository for new commits."""
 
+    # Maximum number of commit pairs kept in the changed-files cache
+    DIFF_CACHE_SIZE = 256
+
+    # Consecutive polls without a new commit before the interval backs off
+    IDLE_POLLS_BEFORE_BACKOFF = 3
+
     def __init__(
         self,
         repo_path: str,
-        callback: Callable[[str, List[str]], None],
-        poll_interval: float = 5.0
+        callback: Callable[[str, List[str]], Any],
+        poll_interval: float = 5.0,
+        cache_path: Optional[str] = None,
+        max_interval: float = 300.0
     ):
         """Initialize Git commit monitor.
 
         Args:
             repo_path: Path to Git repository
-            callback: Function to call with (commit_hash, changed_files) when new commit detected
-            poll_interval: Seconds between Git status checks
+            callback: Function to call with (commit_hash, changed_files) when new commit detected.
+                May be a coroutine function when the monitor is driven by run_async().
+            poll_interval: Seconds between Git status checks while active
+            cache_path: File for the persisted changed-files cache
+                (default: git_monitor_cache.json inside the .git directory)
+            max_interval: Upper bound for the polling interval when idle
         """
         self.repo_path = Path(repo_path).resolve()
         self.callback = callback
         self.poll_interval = poll_interval
+        self.max_interval = max(max_interval, poll_interval)
+        self.current_interval = poll_interval
 
-        # Validate Git repository
+        # Validate Git repository (libgit2 does all Git work in-process)
         try:
-            self.repo = git.Repo(self.repo_path)
-        except git.InvalidGitRepositoryError:
+            self.repo = pygit2.Repository(str(self.repo_path))
+        except (pygit2.GitError, KeyError):
             raise ValueError(f"Not a valid Git repository: {repo_path}")
+        self._git_dir = Path(self.repo.path)
 
-        # Get initial HEAD commit
-        try:
-            self.last_commit_hash = self.repo.head.commit.hexsha
-            logger.info(f"Initial commit: {self.last_commit_hash[:8]}")
-        except ValueError:
+        self._common_dir = _resolve_common_dir(self._git_dir)
+        self._fetch_head = self._git_dir / 'FETCH_HEAD'
+
+        # Stat signature of HEAD/refs, used to skip polls when nothing moved
+        self._head_stat = None
+        self._head_ref_path: Optional[Path] = None
+        self._last_refs_signature: Optional[tuple] = None
+
+        # Changed files keyed by old oid + new oid (40 bytes), persisted across restarts
+        self._diff_cache_path = (
+            Path(cache_path) if cache_path else self._git_dir / 'git_monitor_cache.json'
+        )
+        self._diff_cache: "OrderedDict[bytes, List[str]]" = self._load_diff_cache()
+
+        # Get initial HEAD commit as a raw 20-byte oid; hex only for logs
+        self.last_commit_oid: Optional[bytes] = self._head_oid()
+        if self.last_commit_oid:
+            logger.info(f"Initial commit: {self.last_commit_oid[:4].hex()}")
+        else:
             # Empty repository (no commits yet)
-            self.last_commit_hash = None
             logger.info("Repository has no commits yet")
 
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._activity_event: Optional[asyncio.Event] = None
 
         logger.info(f"Git monitor initialized for: {self.repo_path}")
 
-    def _monitor_loop(self):
-        """Main monitoring loop (runs in separate thread)."""
-        logger.info("Git monitor loop started")
+    def _resolve_head_ref_path(self) -> Optional[Path]:
+        """Find the loose ref file HEAD points to.
 
-        while self._running:
-            try:
-                self._check_for_new_commits()
-            except Exception as e:
-                logger.error(f"Error checking for commits: {e}")
+        Returns:
+            Path to the ref file, or None for a detached HEAD
+        """
+        try:
+            head = (self._git_dir / 'HEAD').read_text().strip()
+        except OSError:
+            return None
+
+        if head.startswith('ref: '):
+            return self._common_dir / head[5:]
+        return None
 
-            # Sleep for poll interval
-            time.sleep(self.poll_interval)
+    def _refs_signature(self) -> tuple:
+        """Build a stat-only signature of the refs that can move HEAD.
 
-        logger.info("Git monitor loop stopped")
+        Covers HEAD, packed-refs, the branch ref HEAD points to and the
+        remote-tracking ref directories. No object database access.
+
+        Returns:
+            Tuple of (mtime, inode) pairs that changes whenever any of those refs change
+        """
+        head_stat = _stat_key(self._git_dir / 'HEAD')
+        if head_stat != self._head_stat:
+            # HEAD rewritten (e.g. checkout), re-resolve the branch ref
+            self._head_stat = head_stat
+            self._head_ref_path = self._resolve_head_ref_path()
+
+        signature = [head_stat, _stat_key(self._common_dir / 'packed-refs')]
+        if self._head_ref_path is not None:
+            signature.append(_stat_key(self._head_ref_path))
 
-    def _check_for_new_commits(self):
-        """Check if there are new commits since last check."""
         try:
+            with os.scandir(self._common_dir / 'refs' / 'remotes') as entries:
+                for entry in entries:
+                    st = entry.stat()
+                    signature.append((st.st_mtime_ns, st.st_ino))
+        except OSError:
+            pass
+
+        return tuple(signature)
+
+    def _fetch_recently_updated(self) -> bool:
+        """Check whether FETCH_HEAD was written within the last poll interval.
+
+        Returns:
+            True if a fetch (ours or another process's) happened recently
+        """
+        try:
+            age = time.time() - self._fetch_head.stat().st_mtime
+        except OSError:
+            return False
+        return age < self.poll_interval
+
+    def _upstream_refspec(self) -> Optional[Tuple[str, str]]:
+        """Find the remote and refspec tracked by the current branch.
+
+        Returns:
+            Tuple of (remote_name, refspec), or None for a detached HEAD,
+            an unborn branch or a branch without upstream
+        """
+        if self.repo.head_is_unborn or self.repo.head_is_detached:
+            return None
+        branch = self.repo.branches.local.get(self.repo.head.shorthand)
+        upstream = branch.upstream if branch is not None else None
+        if upstream is None:
+            return None
+        remote_name = upstream.remote_name
+        remote_branch = upstream.branch_name[len(remote_name) + 1:]
+
+        refspec = f"+refs/heads/{remote_branch}:refs/remotes/{remote_name}/{remote_branch}"
+        return remote_name, refspec
+
+    def _fetch_remotes(self):
+        """Fetch the current branch's upstream in-process via libgit2."""
+        if self._fetch_recently_updated():
+            return
+
+        # A failed fetch (offline, missing credentials) must not stop the
+        # local HEAD check that follows
+        try:
+            upstream = self._upstream_refspec()
+            if upstream is None:
+                # Nothing remote to compare against
+                return
+
+            remote_name, refspec = upstream
+            self.repo.remotes[remote_name].fetch(refspecs=[refspec])
+        except Exception as e:
+            logger.warning(f"Fetch failed: {e}")
+
+    def _head_oid(self) -> Optional[bytes]:
+        """Resolve HEAD to a raw commit oid.
+
+        Returns:
+            20-byte oid, or None if the repository has no commits
+        """
+        if self.repo.head_is_unborn:
+            return None
+        return self.repo.head.target.raw
+
+    def _detect_new_commit(self) -> Optional[Tuple[str, List[str]]]:
+        """Poll the repository once for a new HEAD commit.
+
+        Returns:
+            Tuple of (commit_hash, changed_files) if HEAD moved, else None
+        """
+        try:
+            # Nothing to do if no ref file changed since the last poll
+            signature = self._refs_signature()
+            if signature == self._last_refs_signature:
+                return None
+
             # Refresh repository state
-            self.repo.git.fetch('--all', '--quiet')
+            self._fetch_remotes()
 
             # Get current HEAD commit
-            try:
-                current_commit = self.repo.head.commit
-                current_hash = current_commit.hexsha
-            except ValueError:
-                # Repository still has no commits
-                return
+            current_oid = self._head_oid()
+            if current_oid is None or current_oid == self.last_commit_oid:
+                self._last_refs_signature = signature
+                return None
+
+            logger.info(f"New commit detected: {current_oid[:4].hex()}")
+
+            # Get list of changed files
+            changed_files = self._get_changed_files(
+                self.last_commit_oid,
+                current_oid
+            )
+
+            # Update last commit oid; the signature is only recorded once the
+            # commit is processed, so a failure above is retried next poll
+            old_oid = self.last_commit_oid
+            self.last_commit_oid = current_oid
+            self._last_refs_signature = signature
+
+            logger.info(
+                f"Processed commit: {old_oid[:4].hex() if old_oid else 'none'} -> {current_oid[:4].hex()}"
+            )
+            return current_oid.hex(), changed_files
+
+        except Exception as e:
+            logger.error(f"Error checking commits: {e}")
 
-            # Check if commit has changed
-            if current_hash != self.last_commit_hash:
-                logger.info(f"New commit detected: {current_hash[:8]}")
+        return None
 
-                # Get list of changed files
-                changed_files = self._get_changed_files(
-                    self.last_commit_hash,
-                    current_hash
-                )
+    async def _monitor_loop(self):
+        """Adaptive monitoring loop (runs on an asyncio event loop).
 
-                # Update last commit hash
-                old_commit = self.last_commit_hash
-                self.last_commit_hash = current_hash
+        Polls every poll_interval while there is activity. After
+        IDLE_POLLS_BEFORE_BACKOFF polls without a new commit the interval
+        doubles, up to max_interval. notify_activity() returns the loop to
+        the active interval straight away.
+        """
+        logger.info("Git monitor loop started")
 
-                # Trigger callback
+        self._loop = asyncio.get_running_loop()
+        self._activity_event = asyncio.Event()
+        idle_polls = 0
+
+        try:
+            while self._running:
+                poll_started = self._loop.time()
+                result = await asyncio.to_thread(self._detect_new_commit)
+
+                if result is not None:
+                    idle_polls = 0
+                    self.current_interval = self.poll_interval
+
+                    try:
+                        outcome = self.callback(*result)
+                        if inspect.isawaitable(outcome):
+                            await outcome
+                    except Exception as e:
+                        logger.error(f"Error in commit callback: {e}")
+                else:
+                    idle_polls += 1
+                    if idle_polls >= self.IDLE_POLLS_BEFORE_BACKOFF:
+                        self.current_interval = min(
+                            self.current_interval * 2,
+                            self.max_interval
+                        )
+
+                # Count the poll itself against the interval so the rate doesn't drift
+                elapsed = self._loop.time() - poll_started
                 try:
-                    self.callback(current_hash, changed_files)
-                except Exception as e:
-                    logger.error(f"Error in commit callback: {e}")
+                    await asyncio.wait_for(
+                        self._activity_event.wait(),
+                        timeout=max(0.0, self.current_interval - elapsed)
+                    )
+                    # Activity reported: back to the active interval
+                    self._activity_event.clear()
+                    idle_polls = 0
+                    self.current_interval = self.poll_interval
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._running = False
+            self._loop = None
+            self._activity_event = None
+            logger.info("Git monitor loop stopped")
+
+    async def run_async(self):
+        """Monitor for new commits as an asyncio task.
+
+        Git work runs in the default executor; the callback is awaited on
+        the event loop if it returns an awaitable. Cancel the task to stop.
+        """
+        self._running = True
+        await self._monitor_loop()
+
+    def notify_activity(self):
+        """Signal repository activity so the next poll happens right away.
+
+        Safe to call from any thread.
+        """
+        loop, event = self._loop, self._activity_event
+        if loop is None or event is None:
+            return
+
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # Event loop already closed
+            pass
 
-                logger.info(
-                    f"Processed commit: {old_commit[:8] if old_commit else 'none'} -> {current_hash[:8]}"
-                )
+    def _load_diff_cache(self) -> "OrderedDict[bytes, List[str]]":
+        """Load the persisted changed-files cache.
 
-        except git.GitCommandError as e:
-            logger.error(f"Git command failed: {e}")
+        Returns:
+            Cache keyed by old oid + new oid bytes; empty on any error
+        """
+        cache = OrderedDict()
+        try:
+            with open(self._diff_cache_path, 'r') as f:
+                data: Dict[str, List[str]] = json.load(f)
+            for key, files in data.items():
+                cache[bytes.fromhex(key)] = files
+            logger.debug(f"Loaded {len(cache)} cached commit diffs")
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            logger.error(f"Error checking commits: {e}")
+            logger.warning(f"Ignoring unreadable diff cache {self._diff_cache_path}: {e}")
+        return cache
+
+    def _save_diff_cache(self):
+        """Persist the changed-files cache atomically."""
+        data = {key.hex(): files for key, files in self._diff_cache.items()}
+        tmp_path = self._diff_cache_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._diff_cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to save diff cache: {e}")
 
     def _get_changed_files(
         self,
-        old_commit: Optional[str],
-        new_commit: str
+        old_oid: Optional[bytes],
+        new_oid: bytes
+    ) -> List[str]:
+        """Get list of files changed between commits, using the diff cache.
+
+        Args:
+            old_oid: Old commit oid (None if first commit)
+            new_oid: New commit oid
+
+        Returns:
+            List of changed file paths (relative to repo root)
+        """
+        key = (old_oid or _NULL_OID) + new_oid
+
+        cached = self._diff_cache.get(key)
+        if cached is not None:
+            self._diff_cache.move_to_end(key)
+            logger.debug(f"Changed files (cached): {len(cached)}")
+            return cached
+
+        changed_files = self._compute_changed_files(old_oid, new_oid)
+
+        # Empty results may come from errors; don't persist them
+        if changed_files:
+            self._diff_cache[key] = changed_files
+            while len(self._diff_cache) > self.DIFF_CACHE_SIZE:
+                self._diff_cache.popitem(last=False)
+            self._save_diff_cache()
+
+        return changed_files
+
+    def _compute_changed_files(
+        self,
+        old_oid: Optional[bytes],
+        new_oid: bytes
     ) -> List[str]:
         """Get list of files changed between commits.
 
         Args:
-            old_commit: Old commit hash (None if first commit)
-            new_commit: New commit hash
+            old_oid: Old commit oid (None if first commit)
+            new_oid: New commit oid
 
         Returns:
             List of changed file paths (relative to repo root)
         """
         try:
-            if old_commit is None:
-                # First commit - get all files in the commit
-                commit = self.repo.commit(new_commit)
-                changed_files = [item.path for item in commit.tree.traverse()]
-            else:
-                # Get diff between commits
-                old = self.repo.commit(old_commit)
-                new = self.repo.commit(new_commit)
-                diff = old.diff(new)
-
-                # Extract file paths from diff
-                changed_files = []
-                for item in diff:
-                    if item.a_path:
-                        changed_files.append(item.a_path)
-                    if item.b_path and item.b_path != item.a_path:
-                        changed_files.append(item.b_path)
-
+            changed_files = self._get_changed_files_pygit2(old_oid, new_oid)
             logger.debug(f"Changed files: {len(changed_files)}")
             return changed_files
 
@@ -148,27 +442,95 @@ class GitCommitMonitor:
             logger.error(f"Error getting changed files: {e}")
             return []
 
-    def get_uncommitted_files(self) -> List[str]:
-        """Get list of files with uncommitted changes.
+    def _get_changed_files_pygit2(
+        self,
+        old_oid: Optional[bytes],
+        new_oid: bytes
+    ) -> List[str]:
+        """Get changed file paths with a raw libgit2 tree diff.
+
+        Only name-level deltas are produced: no patch text, no binary
+        sniffing and no rename detection. Subtrees with identical oids are
+        skipped by libgit2 without being expanded.
+
+        Args:
+            old_oid: Old commit oid (None if first commit)
+            new_oid: New commit oid
 
         Returns:
-            List of file paths with uncommitted changes
+            List of changed file paths (relative to repo root)
         """
-        try:
-            # Get modified files (unstaged changes)
-            modified_files = [item.a_path for item in self.repo.index.diff(None)]
+        new_tree = self.repo[pygit2.Oid(raw=new_oid)].tree
+
+        if old_oid is None:
+            # First commit - walk the tree with an explicit stack, skipping
+            # ignored subtrees without loading them
+            changed_files = []
+            stack = [(new_tree, '')]
+            while stack:
+                tree, prefix = stack.pop()
+                for entry in tree:
+                    name = entry.name
+                    type_str = entry.type_str
+                    if type_str == 'tree':
+                        if name not in IGNORE_DIRS:
+                            stack.append((entry, prefix + name + '/'))
+                    elif type_str == 'blob' and _is_indexable(name):
+                        changed_files.append(prefix + name)
+            return changed_files
+
+        old_tree = self.repo[pygit2.Oid(raw=old_oid)].tree
+        diff = old_tree.diff_to_tree(
+            new_tree,
+            flags=pygit2.GIT_DIFF_SKIP_BINARY_CHECK,
+            context_lines=0,
+            interhunk_lines=0
+        )
+
+        changed_files = []
+        for delta in diff.deltas:
+            old_path = delta.old_file.path
+            new_path = delta.new_file.path
+            if old_path:
+                changed_files.append(old_path)
+            if new_path and new_path != old_path:
+                changed_files.append(new_path)
 
-            # Get staged files (staged changes)
-            staged_files = [item.a_path for item in self.repo.index.diff('HEAD')]
+        return changed_files
 
-            # Get untracked files
-            untracked_files = self.repo.untracked_files
+    def get_uncommitted_files(self, dirty_hint: Optional[Set[str]] = None) -> List[str]:
+        """Get list of files with uncommitted changes.
 
-            # Combine all (remove duplicates)
-            all_files = set(modified_files + staged_files + untracked_files)
+        Args:
+            dirty_hint: Repo-relative paths known to have changed (e.g. from
+                file system events). When given, only these paths are checked
+                instead of walking the whole working tree.
 
+        Returns:
+            List of file paths with uncommitted changes
+        """
+        try:
+            if dirty_hint is not None:
+                all_files = []
+                for path in dirty_hint:
+                    try:
+                        flags = self.repo.status_file(path)
+                    except KeyError:
+                        # Gone from disk and never tracked
+                        continue
+                    if flags & _UNCOMMITTED_STATUS:
+                        all_files.append(path)
+                logger.debug(f"Uncommitted files (hinted): {len(all_files)}")
+                return all_files
+
+            # One libgit2 status walk covers unstaged, staged and untracked
+            status = self.repo.status(untracked_files='all', ignored=False)
+            all_files = [
+                path for path, flags in status.items()
+                if flags & _UNCOMMITTED_STATUS
+            ]
             logger.debug(f"Uncommitted files: {len(all_files)}")
-            return list(all_files)
+            return all_files
 
         except Exception as e:
             logger.error(f"Error getting uncommitted files: {e}")
@@ -183,9 +545,9 @@ class GitCommitMonitor:
         logger.info("Starting Git commit monitor")
         self._running = True
 
-        # Start monitoring thread
+        # Start monitoring thread with its own event loop
         self._thread = threading.Thread(
-            target=self._monitor_loop,
+            target=lambda: asyncio.run(self._monitor_loop()),
             daemon=True,
             name="GitMonitor"
         )
@@ -199,11 +561,19 @@ class GitCommitMonitor:
         logger.info("Stopping Git commit monitor")
         self._running = False
 
+        # Wake the loop so it notices the stop without waiting out the interval
+        self.notify_activity()
+
         # Wait for thread to finish
         if self._thread:
             self._thread.join(timeout=self.poll_interval + 1)
             self._thread = None
 
+    @property
+    def last_commit_hash(self) -> Optional[str]:
+        """Hex form of the last seen commit oid (for display)."""
+        return self.last_commit_oid.hex() if self.last_commit_oid else None
+
     def is_running(self) -> bool:
         """Check if monitor is running.
 
@@ -218,10 +588,8 @@ class GitCommitMonitor:
         Returns:
             Commit hash or None if no commits
         """
-        try:
-            return self.repo.head.commit.hexsha
-        except ValueError:
-            return None
+        oid = self._head_oid()
+        return oid.hex() if oid else None
 
     def get_branch_name(self) -> Optional[str]:
         """Get current branch name.
@@ -229,10 +597,11 @@ class GitCommitMonitor:
         Returns:
             Branch name or None if detached HEAD
         """
-        try:
-            return self.repo.active_branch.name
-        except TypeError:
+        if self.repo.head_is_detached:
             return None
+        # Symbolic HEAD target works for unborn branches too
+        target = self.repo.lookup_reference('HEAD').target
+        return target[len('refs/heads/'):] if target.startswith('refs/heads/') else target
 
     def __enter__(self):
         """Context manager entry."""
@@ -1,9 +1,9 @@
 """Main file watcher service for Git repository monitoring."""
 
+import asyncio
 import logging
 import os
 import sys
-import time
 import signal
 from typing import Optional, List
 from pathlib import Path
@@ -29,7 +29,10 @@ class WatcherService:
         repo_id: str,
         rag_api_url: str = "http://rag-pipeline:8001",
         debounce_seconds: float = 2.0,
-        poll_interval: float = 5.0
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 300.0,
+        max_batch: int = 100,
+        batch_interval_ms: int = 250
     ):
         """Initialize watcher service.
 
@@ -38,59 +41,112 @@ class WatcherService:
             repo_id: Repository UUID for API calls
             rag_api_url: URL of RAG pipeline API
             debounce_seconds: Debounce period for file changes
-            poll_interval: Poll interval for Git commits
+            poll_interval: Poll interval for Git commits while active
+            max_poll_interval: Poll interval ceiling when the repository is idle
+            max_batch: Maximum number of files sent in one re-index request
+            batch_interval_ms: How long to collect changes before sending a batch
         """
         self.repo_path = Path(repo_path).resolve()
         self.repo_id = repo_id
         self.rag_api_url = rag_api_url.rstrip('/')
         self.debounce_seconds = debounce_seconds
         self.poll_interval = poll_interval
+        self.max_batch = max_batch
+        self.batch_interval = batch_interval_ms / 1000.0
 
         # Validate repository
         if not self.repo_path.exists():
             raise ValueError(f"Repository path does not exist: {repo_path}")
 
-        # HTTP client for API calls
-        self.http_client = httpx.Client(timeout=30.0)
+        # Async HTTP client and event loop, created in start()
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
 
         # Initialize watchers
         self.file_watcher = FileWatcher(
             repo_path=str(self.repo_path),
-            callback=self._on_file_changed,
+            callback=self._schedule_file_changed,
             debounce_seconds=debounce_seconds
         )
 
         self.git_monitor = GitCommitMonitor(
             repo_path=str(self.repo_path),
             callback=self._on_new_commit,
-            poll_interval=poll_interval
+            poll_interval=poll_interval,
+            max_interval=max_poll_interval
         )
 
+        self._change_queue: asyncio.Queue = asyncio.Queue()
+        self._batch_task: Optional[asyncio.Task] = None
+        self._git_task: Optional[asyncio.Task] = None
+        self._dirty_seeded = False
+        self._stop_event = asyncio.Event()
         self._running = False
         logger.info(f"Watcher service initialized for repo: {repo_id}")
         logger.info(f"Repository path: {self.repo_path}")
         logger.info(f"RAG API URL: {self.rag_api_url}")
 
-    def _on_file_changed(self, relative_path: str):
-        """Handle file change event.
+    def _schedule_file_changed(self, relative_path: str):
+        """Hand a file change from the watcher thread to the event loop.
 
         Args:
             relative_path: Path relative to repository root
         """
-        logger.info(f"File changed: {relative_path}")
+        if self.loop is None:
+            logger.warning(f"Event loop not running, dropping change: {relative_path}")
+            return
+
+        # File activity often precedes a commit; poll Git at full rate again
+        self.git_monitor.notify_activity()
+
+        self.loop.call_soon_threadsafe(self._change_queue.put_nowait, relative_path)
+
+    async def _coalesce_file_changes(self):
+        """Drain queued file changes and re-index them in batches.
+
+        A batch is sent once max_batch distinct paths are collected or
+        batch_interval has passed since the first change of the batch.
+        """
+        while True:
+            batch = {await self._change_queue.get()}
+            deadline = self.loop.time() + self.batch_interval
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.add(
+                        await asyncio.wait_for(self._change_queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            await self._on_files_changed(sorted(batch))
+
+    async def _on_files_changed(self, relative_paths: List[str]):
+        """Handle a batch of file change events.
+
+        Args:
+            relative_paths: Paths relative to repository root
+        """
+        logger.info(f"Files changed: {len(relative_paths)}")
 
         try:
-            # Call RAG pipeline API to re-index the file
-            url = f"{self.rag_api_url}/api/repos/{self.repo_id}/index/file"
-            params = {"file_path": relative_path}
+            # Call RAG pipeline API to re-index all files in one request
+            url = f"{self.rag_api_url}/api/repos/{self.repo_id}/index/files"
+            payload = {"file_paths": relative_paths}
 
             logger.debug(f"Calling API: POST {url}")
-            response = self.http_client.post(url, params=params)
+            response = await self.http_client.post(url, json=payload)
 
             if response.status_code == 200:
                 result = response.json()
                 chunks_added = result.get('chunks_added', 0)
-                logger.info(f"File re-indexed: {relative_path} ({chunks_added} chunks)")
+                logger.info(
+                    f"Files re-indexed: {result.get('indexed_files', 0)} "
+                    f"({chunks_added} chunks)"
+                )
             else:
                 logger.error(
                     f"API error: {response.status_code} - {response.text}"
@@ -99,9 +155,9 @@ class WatcherService:
         except httpx.RequestError as e:
             logger.error(f"Failed to call RAG API: {e}")
         except Exception as e:
-            logger.error(f"Error handling file change: {e}")
+            logger.error(f"Error handling file changes: {e}")
 
-    def _on_new_commit(self, commit_hash: str, changed_files: List[str]):
+    async def _on_new_commit(self, commit_hash: str, changed_files: List[str]):
         """Handle new commit event.
 
         Args:
@@ -110,14 +166,22 @@ class WatcherService:
         """
         logger.info(f"New commit: {commit_hash[:8]} ({len(changed_files)} files)")
 
+        # Committed paths are clean now; drop them from the watcher's dirty set
+        uncommitted = await self.get_uncommitted_files()
+        logger.info(f"Uncommitted files after commit: {len(uncommitted)}")
+
         try:
             # Call RAG pipeline API to trigger incremental indexing
             url = f"{self.rag_api_url}/api/repos/{self.repo_id}/index/incremental"
 
             logger.debug(f"Calling API: POST {url}")
-            response = self.http_client.post(url)
+            response = await self.http_client.post(url)
 
-            if response.status_code == 200:
+            if response.status_code == 202:
+                # Indexing runs in the background on the RAG pipeline
+                result = response.json()
+                logger.info(f"Incremental indexing queued (job {result.get('job_id')})")
+            elif response.status_code == 200:
                 result = response.json()
                 indexed_files = result.get('indexed_files', 0)
                 total_chunks = result.get('total_chunks', 0)
@@ -134,7 +198,30 @@ class WatcherService:
         except Exception as e:
             logger.error(f"Error handling new commit: {e}")
 
-    def start(self):
+    async def get_uncommitted_files(self) -> List[str]:
+        """Get files with uncommitted changes, using watcher events as a hint.
+
+        The first call (from start()) walks the whole working tree to seed
+        the watcher's dirty set; later calls (one per new commit) only check
+        paths seen in file events and drop the ones that came back clean.
+
+        Returns:
+            List of repo-relative paths with uncommitted changes
+        """
+        handler = self.file_watcher.event_handler
+
+        if not self._dirty_seeded:
+            files = await asyncio.to_thread(self.git_monitor.get_uncommitted_files)
+            handler.mark_dirty(set(files))
+            self._dirty_seeded = True
+            return files
+
+        hint = handler.get_dirty_paths()
+        files = await asyncio.to_thread(self.git_monitor.get_uncommitted_files, hint)
+        handler.mark_clean(hint.difference(files))
+        return files
+
+    async def start(self):
         """Start the watcher service."""
         if self._running:
             logger.warning("Watcher service already running")
@@ -142,18 +229,37 @@ class WatcherService:
 
         logger.info("Starting watcher service")
 
-        # Start file watcher
+        self.loop = asyncio.get_running_loop()
+        # Internal API: keep connections alive, retry failed connects once,
+        # and skip proxy environment lookups
+        self.http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=2.0, read=30.0, write=10.0, pool=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=16,
+                max_connections=32,
+                keepalive_expiry=60.0
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=1),
+            trust_env=False
+        )
+
+        # Start file watcher and the batch sender it feeds
+        self._batch_task = asyncio.create_task(self._coalesce_file_changes())
         self.file_watcher.start()
         logger.info("File watcher started")
 
+        # Seed the dirty set with changes made before the watcher started
+        uncommitted = await self.get_uncommitted_files()
+        logger.info(f"Uncommitted files at startup: {len(uncommitted)}")
+
         # Start Git monitor
-        self.git_monitor.start()
+        self._git_task = asyncio.create_task(self.git_monitor.run_async())
         logger.info("Git monitor started")
 
         self._running = True
         logger.info("Watcher service is now running")
 
-    def stop(self):
+    async def stop(self):
         """Stop the watcher service."""
         if not self._running:
             return
@@ -164,12 +270,26 @@ class WatcherService:
         self.file_watcher.stop()
         self.git_monitor.stop()
 
+        for task in (self._git_task, self._batch_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._git_task = None
+        self._batch_task = None
+
         # Close HTTP client
-        self.http_client.close()
+        await self.http_client.aclose()
 
         self._running = False
         logger.info("Watcher service stopped")
 
+    def request_stop(self):
+        """Ask run_forever() to shut the service down."""
+        self._stop_event.set()
+
     def is_running(self) -> bool:
         """Check if service is running.
 
@@ -178,18 +298,14 @@ class WatcherService:
         """
         return self._running
 
-    def run_forever(self):
-        """Run the service until interrupted."""
-        self.start()
+    async def run_forever(self):
+        """Run the service until request_stop() is called."""
+        await self.start()
 
         try:
-            # Keep main thread alive
-            while self._running:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            logger.info("Received keyboard interrupt")
+            await self._stop_event.wait()
         finally:
-            self.stop()
+            await self.stop()
 
 
 def get_env_var(name: str, default: Optional[str] = None, required: bool = False) -> Optional[str]:
@@ -227,6 +343,9 @@ def main():
         rag_api_url = get_env_var('RAG_API_URL', default='http://rag-pipeline:8001')
         debounce_seconds = float(get_env_var('DEBOUNCE_SECONDS', default='2.0'))
         poll_interval = float(get_env_var('POLL_INTERVAL', default='5.0'))
+        max_poll_interval = float(get_env_var('MAX_POLL_INTERVAL', default='300.0'))
+        max_batch = int(get_env_var('MAX_BATCH', default='100'))
+        batch_interval_ms = int(get_env_var('BATCH_INTERVAL_MS', default='250'))
 
         logger.info(f"Configuration:")
         logger.info(f"  REPO_PATH: {repo_path}")
@@ -234,6 +353,9 @@ def main():
         logger.info(f"  RAG_API_URL: {rag_api_url}")
         logger.info(f"  DEBOUNCE_SECONDS: {debounce_seconds}")
         logger.info(f"  POLL_INTERVAL: {poll_interval}")
+        logger.info(f"  MAX_POLL_INTERVAL: {max_poll_interval}")
+        logger.info(f"  MAX_BATCH: {max_batch}")
+        logger.info(f"  BATCH_INTERVAL_MS: {batch_interval_ms}")
 
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
@@ -246,20 +368,22 @@ def main():
             repo_id=repo_id,
             rag_api_url=rag_api_url,
             debounce_seconds=debounce_seconds,
-            poll_interval=poll_interval
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            max_batch=max_batch,
+            batch_interval_ms=batch_interval_ms
         )
 
-        # Setup signal handlers
-        def signal_handler(signum, frame):
-            logger.info(f"Received signal {signum}")
-            service.stop()
-            sys.exit(0)
+        async def run():
+            # Setup signal handlers
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, service.request_stop)
 
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+            await service.run_forever()
 
         # Run service
-        service.run_forever()
+        asyncio.run(run())
 
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
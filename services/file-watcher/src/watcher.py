@@ -1,24 +1,48 @@
 """File system watcher for monitoring uncommitted changes."""
 
+import functools
+import heapq
 import logging
+import os
+import queue
 import time
-from typing import Dict, Set, Optional, Callable
+from typing import Dict, List, Set, Optional, Callable, Tuple
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
+from watchdog.utils import UnsupportedLibc
 import threading
 
+from filters import EXTENSIONS, EXTENSION_SUFFIXES, IGNORE_RE
+
+# Raw inotify access (Linux only); other platforms use the watchdog Observer.
+# inotify_c is private to watchdog, which is pinned in requirements.txt.
+try:
+    from watchdog.observers.inotify_c import Inotify, InotifyConstants
+    _inotify_error: Optional[Exception] = None
+except (ImportError, UnsupportedLibc) as e:
+    Inotify = None
+    _inotify_error = e
+
 logger = logging.getLogger(__name__)
 
 
 class DebounceHandler(FileSystemEventHandler):
-    """File system event handler with debouncing."""
+    """File system event handler with debouncing.
+
+    The observer thread only enqueues raw paths; filtering, debouncing and
+    callbacks happen on a separate worker thread started by start().
+    """
+
+    # Maximum number of raw events buffered between observer and worker
+    QUEUE_SIZE = 10000
 
     def __init__(
         self,
         callback: Callable[[str], None],
         debounce_seconds: float = 2.0,
-        file_extensions: Optional[Set[str]] = None
+        file_extensions: Optional[Set[str]] = None,
+        repo_path: Optional[str] = None
     ):
         """Initialize debounce handler.
 
@@ -26,20 +50,40 @@ class DebounceHandler(FileSystemEventHandler):
             callback: Function to call with file path when debounce period expires
             debounce_seconds: Seconds to wait before triggering callback
             file_extensions: Set of file extensions to monitor (e.g., {'.py', '.js'})
+            repo_path: Repository root; enables tracking of repo-relative dirty paths
         """
         super().__init__()
         self.callback = callback
         self.debounce_seconds = debounce_seconds
-        self.file_extensions = file_extensions or {
-            '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.go', '.rs',
-            '.rb', '.c', '.cpp', '.h', '.hpp', '.md', '.txt', '.json',
-            '.yaml', '.yml', '.toml', '.ini', '.cfg'
-        }
+        self.file_extensions = file_extensions or EXTENSIONS
+
+        # Shared precompiled filters unless custom extensions were given
+        self._ignore_re = IGNORE_RE
+        self._ext_tuple = (
+            tuple(ext.lower() for ext in file_extensions)
+            if file_extensions else EXTENSION_SUFFIXES
+        )
 
-        # Track pending changes with their last modification time
+        # Cache decisions per path; editors save the same files repeatedly
+        self._should_monitor = functools.lru_cache(maxsize=8192)(self._should_monitor)
+
+        # Raw (path, immediate, event time) tuples from the observer thread
+        self._queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
+
+        # Latest debounce deadline per path; the heap may hold stale entries
+        # for a path, which are skipped unless they match this deadline.
+        # Only touched by the worker thread.
         self._pending_changes: Dict[str, float] = {}
-        self._lock = threading.Lock()
-        self._timer: Optional[threading.Timer] = None
+        self._deadlines: List[Tuple[float, str]] = []
+
+        # Repo-relative paths seen in events since they were last known clean
+        self._root_prefix = (
+            str(Path(repo_path).resolve()) + os.sep if repo_path else None
+        )
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
 
     def on_modified(self, event: FileSystemEvent):
         """Handle file modification event."""
@@ -64,107 +108,247 @@ class DebounceHandler(FileSystemEventHandler):
         self._handle_event(event.src_path, immediate=True)
 
     def _handle_event(self, file_path: str, immediate: bool = False):
-        """Handle a file system event with debouncing.
+        """Queue a file system event for the worker thread.
+
+        Never blocks: when the queue is full the event is dropped.
 
         Args:
             file_path: Path to the file that changed
             immediate: If True, trigger callback immediately without debouncing
         """
-        path = Path(file_path)
+        try:
+            self._queue.put_nowait((file_path, immediate, time.monotonic()))
+        except queue.Full:
+            logger.warning(f"Event queue full, dropping change: {file_path}")
+
+    def _accept_event(self, file_path: str, immediate: bool, event_time: float):
+        """Filter an event and schedule its callback (worker thread).
 
+        Args:
+            file_path: Path to the file that changed
+            immediate: If True, trigger callback immediately without debouncing
+            event_time: time.monotonic() when the event was received
+        """
         # Check if we should monitor this file
-        if not self._should_monitor(path):
+        if not self._should_monitor(file_path):
             return
 
         logger.debug(f"File change detected: {file_path}")
 
-        with self._lock:
-            if immediate:
-                # Trigger callback immediately
-                self.callback(file_path)
-            else:
-                # Update pending changes
-                current_time = time.time()
-                self._pending_changes[file_path] = current_time
-
-                # Cancel existing timer if any
-                if self._timer:
-                    self._timer.cancel()
-
-                # Start new timer
-                self._timer = threading.Timer(
-                    self.debounce_seconds,
-                    self._process_pending_changes
-                )
-                self._timer.daemon = True
-                self._timer.start()
-
-    def _should_monitor(self, path: Path) -> bool:
+        if self._root_prefix and file_path.startswith(self._root_prefix):
+            with self._dirty_lock:
+                self._dirty.add(file_path[len(self._root_prefix):])
+
+        if immediate:
+            # Trigger callback immediately
+            self._pending_changes.pop(file_path, None)
+            self._fire(file_path)
+            return
+
+        deadline = event_time + self.debounce_seconds
+        self._pending_changes[file_path] = deadline
+        heapq.heappush(self._deadlines, (deadline, file_path))
+
+    def _should_monitor(self, file_path: str) -> bool:
         """Check if a file should be monitored.
 
         Args:
-            path: File path
+            file_path: File path
 
         Returns:
             True if file should be monitored
         """
-        # Skip hidden files
-        if path.name.startswith('.'):
-            return False
-
-        # Skip files in common ignore directories
-        ignore_dirs = {
-            '__pycache__', 'node_modules', '.git', '.venv', 'venv',
-            'env', 'dist', 'build', 'target', '.pytest_cache',
-            '.mypy_cache', '.tox', 'coverage', 'htmlcov'
-        }
-        if any(part in ignore_dirs for part in path.parts):
+        # Skip hidden files and files in common ignore directories
+        if self._ignore_re.search(file_path):
             return False
 
         # Skip files without relevant extensions
-        if self.file_extensions and path.suffix.lower() not in self.file_extensions:
+        if self._ext_tuple and not file_path.lower().endswith(self._ext_tuple):
             return False
 
         return True
 
-    def _process_pending_changes(self):
-        """Process all pending changes after debounce period."""
-        with self._lock:
-            if not self._pending_changes:
-                return
+    def get_dirty_paths(self) -> Set[str]:
+        """Get a snapshot of repo-relative paths changed since last marked clean.
 
-            current_time = time.time()
-            files_to_process = []
+        Returns:
+            Set of repo-relative paths
+        """
+        with self._dirty_lock:
+            return set(self._dirty)
 
-            # Find files that have exceeded debounce period
-            for file_path, mod_time in list(self._pending_changes.items()):
-                if current_time - mod_time >= self.debounce_seconds:
-                    files_to_process.append(file_path)
-                    del self._pending_changes[file_path]
+    def mark_dirty(self, paths: Set[str]):
+        """Add repo-relative paths to the dirty set.
 
-            # Trigger callback for each file
-            for file_path in files_to_process:
+        Args:
+            paths: Paths known to have uncommitted changes
+        """
+        with self._dirty_lock:
+            self._dirty.update(paths)
+
+    def mark_clean(self, paths: Set[str]):
+        """Remove repo-relative paths that no longer have uncommitted changes.
+
+        Args:
+            paths: Paths known to be clean
+        """
+        with self._dirty_lock:
+            self._dirty.difference_update(paths)
+
+    def _fire(self, file_path: str):
+        """Invoke the callback for a file, logging any error.
+
+        Args:
+            file_path: Path to the file that changed
+        """
+        try:
+            logger.info(f"Processing change: {file_path}")
+            self.callback(file_path)
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {e}")
+
+    def _run_scheduler(self):
+        """Consume queued events and fire callbacks once their deadline passes.
+
+        Runs in a single worker thread, blocking on the queue until the
+        earliest pending deadline.
+        """
+        while not self._stopped:
+            timeout = None
+            if self._deadlines:
+                timeout = max(0.0, self._deadlines[0][0] - time.monotonic())
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            # Take everything queued so far in one pass
+            while item is not None:
+                if self._stopped:
+                    return
+                self._accept_event(*item)
                 try:
-                    logger.info(f"Processing change: {file_path}")
-                    self.callback(file_path)
-                except Exception as e:
-                    logger.error(f"Error processing file {file_path}: {e}")
-
-            # If there are still pending changes, schedule another check
-            if self._pending_changes:
-                self._timer = threading.Timer(
-                    self.debounce_seconds,
-                    self._process_pending_changes
-                )
-                self._timer.daemon = True
-                self._timer.start()
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            # Pop every ready entry, skipping ones superseded by a newer event
+            now = time.monotonic()
+            while self._deadlines and self._deadlines[0][0] <= now:
+                deadline, file_path = heapq.heappop(self._deadlines)
+                if self._pending_changes.get(file_path) == deadline:
+                    del self._pending_changes[file_path]
+                    self._fire(file_path)
+
+    def start(self):
+        """Start the worker thread."""
+        if self._worker is not None:
+            return
+
+        self._stopped = False
+        self._worker = threading.Thread(
+            target=self._run_scheduler,
+            daemon=True,
+            name="DebounceScheduler"
+        )
+        self._worker.start()
 
     def stop(self):
-        """Stop the debounce timer."""
-        with self._lock:
-            if self._timer:
-                self._timer.cancel()
-                self._timer = None
+        """Stop the worker thread, discarding pending changes."""
+        self._stopped = True
+
+        # Wake the worker if it is blocked on an empty queue
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
+            self._worker = None
+
+        self._pending_changes.clear()
+        self._deadlines.clear()
+
+
+class RawInotifyEmitter:
+    """Feed raw inotify events straight into a DebounceHandler (Linux only).
+
+    Bypasses watchdog's event queue, FileSystemEvent construction and
+    handler dispatch: each record's path is enqueued on the handler as is,
+    and filtering happens later on the handler's worker thread. Exposes the
+    same start/stop/join interface as a watchdog Observer.
+    """
+
+    EVENT_MASK = (
+        InotifyConstants.IN_MODIFY | InotifyConstants.IN_CREATE |
+        InotifyConstants.IN_DELETE | InotifyConstants.IN_MOVED_FROM |
+        InotifyConstants.IN_MOVED_TO | InotifyConstants.IN_DELETE_SELF
+    ) if Inotify is not None else 0
+
+    def __init__(self, handler: DebounceHandler, path: str, recursive: bool = True):
+        """Initialize raw inotify emitter.
+
+        Args:
+            handler: Debounce handler receiving file paths
+            path: Directory to watch
+            recursive: Whether to watch subdirectories
+        """
+        self.handler = handler
+        self.path = path
+        self.recursive = recursive
+        self._inotify = None
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        """Read inotify records until stopped."""
+        while not self._stopped:
+            try:
+                events = self._inotify.read_events()
+            except OSError:
+                # Descriptor closed by stop()
+                break
+
+            for event in events:
+                if event.is_directory or event.is_ignored:
+                    continue
+
+                file_path = os.fsdecode(event.src_path)
+                if event.is_delete or event.is_moved_from:
+                    self.handler._handle_event(file_path, immediate=True)
+                else:
+                    self.handler._handle_event(file_path)
+
+    def start(self):
+        """Start reading inotify events in a background thread."""
+        self._inotify = Inotify(
+            os.fsencode(self.path),
+            recursive=self.recursive,
+            event_mask=self.EVENT_MASK
+        )
+        self._thread = threading.Thread(
+            target=self._run,
+            daemon=True,
+            name="InotifyEmitter"
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop reading events; the blocked read returns once the watch is closed."""
+        self._stopped = True
+        if self._inotify is not None:
+            self._inotify.close()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the reader thread to exit.
+
+        Args:
+            timeout: Seconds to wait
+        """
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
 
 
 class FileWatcher:
@@ -193,19 +377,31 @@ class FileWatcher:
         if not self.repo_path.exists():
             raise ValueError(f"Repository path does not exist: {repo_path}")
 
+        # Event paths are made relative by slicing off this prefix
+        self._repo_prefix = str(self.repo_path) + os.sep
+
         # Create event handler
         self.event_handler = DebounceHandler(
             callback=self._on_file_changed,
-            debounce_seconds=debounce_seconds
+            debounce_seconds=debounce_seconds,
+            repo_path=str(self.repo_path)
         )
 
-        # Create observer
-        self.observer = Observer()
-        self.observer.schedule(
-            self.event_handler,
-            str(self.repo_path),
-            recursive=recursive
-        )
+        # Create observer: raw inotify on Linux, watchdog elsewhere
+        if Inotify is not None:
+            self.observer = RawInotifyEmitter(
+                self.event_handler,
+                str(self.repo_path),
+                recursive=recursive
+            )
+        else:
+            logger.info(f"Raw inotify unavailable ({_inotify_error}), using the watchdog Observer")
+            self.observer = Observer()
+            self.observer.schedule(
+                self.event_handler,
+                str(self.repo_path),
+                recursive=recursive
+            )
 
         self._running = False
         logger.info(f"File watcher initialized for: {self.repo_path}")
@@ -216,19 +412,19 @@ class FileWatcher:
         Args:
             file_path: Absolute path to changed file
         """
-        try:
-            # Convert to relative path
-            path = Path(file_path)
-            relative_path = path.relative_to(self.repo_path)
+        if not file_path.startswith(self._repo_prefix):
+            # Path is not relative to repo (shouldn't happen)
+            logger.warning(f"File outside repo: {file_path}")
+            return
 
-            logger.info(f"File changed: {relative_path}")
+        # Convert to relative path
+        relative_path = file_path[len(self._repo_prefix):]
 
-            # Call user callback with relative path
-            self.callback(str(relative_path))
+        logger.info(f"File changed: {relative_path}")
 
-        except ValueError:
-            # Path is not relative to repo (shouldn't happen)
-            logger.warning(f"File outside repo: {file_path}")
+        try:
+            # Call user callback with relative path
+            self.callback(relative_path)
         except Exception as e:
             logger.error(f"Error handling file change: {e}")
 
@@ -239,6 +435,7 @@ class FileWatcher:
             return
 
         logger.info(f"Starting file watcher for: {self.repo_path}")
+        self.event_handler.start()
         self.observer.start()
         self._running = True
 
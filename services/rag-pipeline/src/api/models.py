@@ -1,17 +1,34 @@
 """Pydantic models for API requests and responses."""
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 
-class RepositoryCreate(BaseModel):
+class APIModel(BaseModel):
+    """Base model with shared pydantic v2 configuration for API schemas."""
+    model_config = ConfigDict(
+        extra='ignore',
+        validate_assignment=False
+    )
+
+
+class RequestModel(APIModel):
+    """Base model for request bodies; strips surrounding whitespace from input.
+
+    Response models stay on APIModel so answers and code previews keep
+    their indentation.
+    """
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+
+class RepositoryCreate(RequestModel):
     """Request model for creating a repository."""
     path: str = Field(..., description="Absolute path to Git repository")
     name: Optional[str] = Field(None, description="Optional repository name")
 
 
-class RepositoryResponse(BaseModel):
+class RepositoryResponse(APIModel):
     """Response model for repository data."""
     id: str
     name: str
@@ -30,7 +47,7 @@ class RepositoryResponse(BaseModel):
     embedding_dimension: Optional[int] = Field(None, description="Embedding dimension")
 
 
-class RepositoryStats(BaseModel):
+class RepositoryStats(APIModel):
     """Repository statistics."""
     path: str
     branch: str
@@ -38,36 +55,53 @@ class RepositoryStats(BaseModel):
     total_files: int
     modified_files: int
     untracked_files: int
-    latest_commit: Optional[dict] = None
+    latest_commit: Optional[Dict[str, Any]] = None
 
 
-class IndexingRequest(BaseModel):
+class IndexingRequest(RequestModel):
     """Request model for triggering indexing."""
     force_reindex: bool = Field(False, description="Force full reindex even if already indexed")
     # NEW: Iteration 2 - Embedding selection
     embedding_provider: Optional[str] = Field(None, description="Embedding provider: 'local' or 'openai'")
     embedding_model: Optional[str] = Field(None, description="Specific embedding model name (optional)")
+    file_paths: Optional[List[str]] = Field(None, description="Files to re-index (relative to repo root) for batch indexing")
 
 
-class QueryRequest(BaseModel):
+class QueryRequest(RequestModel):
     """Request model for RAG query."""
     query: str = Field(..., description="User query")
     repo_id: Optional[str] = Field(None, description="Optional repository ID (uses active if not specified)")
-    n_results: Optional[int] = Field(10, description="Number of results to return")
+    # Web UI clients send 'top_k'; both names populate the same field
+    n_results: Optional[int] = Field(
+        10,
+        validation_alias=AliasChoices('n_results', 'top_k'),
+        description="Number of results to return (alias: top_k)"
+    )
     use_reranking: bool = Field(True, description="Whether to apply MMR reranking")
     language: Optional[str] = Field(None, description="Filter by programming language")
     file_path: Optional[str] = Field(None, description="Filter by file path")
 
 
-class QueryResponse(BaseModel):
+class Source(APIModel):
+    """Code chunk cited as a source in a query response."""
+    file_path: str
+    chunk_type: str
+    name: str
+    start_line: int
+    end_line: int
+    similarity: float
+    code_preview: str
+
+
+class QueryResponse(APIModel):
     """Response model for RAG query."""
     answer: str
-    sources: List[dict]
+    sources: List[Source]
     repo_id: str
-    metadata: Optional[dict] = None
+    metadata: Optional[Dict[str, Any]] = None
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(APIModel):
     """Health check response."""
     status: str
     version: str
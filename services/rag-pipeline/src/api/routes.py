@@ -1,12 +1,34 @@
 """API routes for RAG pipeline."""
 
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
-from typing import List, Optional
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from collections import OrderedDict, deque
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
 import logging
+import re
+import threading
+import time
+import uuid
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # noqa: F401  (required by ORJSONResponse)
+    DefaultJSONResponse = ORJSONResponse
+except ImportError:
+    DefaultJSONResponse = JSONResponse
 
 from ..config import get_settings, Settings
 from ..db.metadata_db import MetadataDB
+from ..db.embedding_cache import EmbeddingCache
 from ..core.git_ops import GitOperations
 from ..core.vector_store import VectorStore
 from ..core.embedder import BaseEmbedder, create_embedder
@@ -14,6 +36,7 @@ from ..indexing.indexer import RepositoryIndexer
 from ..retrieval.retriever import CodeRetriever
 from ..retrieval.reranker import Reranker
 from ..retrieval.context import ContextAssembler
+from ..retrieval.cache import SemanticQueryCache
 from ..llm.factory import LLMFactory
 from ..llm.base import LLMError
 from .models import (
@@ -28,17 +51,41 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=DefaultJSONResponse)
 
+# Recent query responses, shared across requests
+query_cache = SemanticQueryCache(max_entries=1024, threshold=0.97)
 
+# (collection, where clause) -> (checked_at, has_matches), least recently used first.
+# Keys come from client-supplied filters, so the cache is bounded.
+FILTER_MATCH_TTL = 60.0
+FILTER_MATCH_CACHE_SIZE = 1024
+_filter_match_cache: "OrderedDict[Tuple[str, str], Tuple[float, bool]]" = OrderedDict()
+
+
+def _invalidate_repo_caches(repo_id: str):
+    """Drop cached query results after a repository's index changes."""
+    query_cache.invalidate(repo_id)
+    _filter_match_cache.clear()
+
+
+@lru_cache(maxsize=None)
 def get_db() -> MetadataDB:
-    """Get database instance."""
+    """Get database instance (shared across requests)."""
     settings = get_settings()
     return MetadataDB(settings.metadata_db_path)
 
 
+@lru_cache(maxsize=None)
+def get_embedding_cache() -> EmbeddingCache:
+    """Get persistent embedding cache (shared across embedders)."""
+    settings = get_settings()
+    return EmbeddingCache(settings.embedding_cache_path)
+
+
+@lru_cache(maxsize=None)
 def get_vector_store() -> VectorStore:
-    """Get vector store instance."""
+    """Get vector store instance (shared across requests)."""
     settings = get_settings()
     # Don't pass embedding_model when using OpenAI or other pre-computed embeddings
     # ChromaDB's SentenceTransformer function is only needed for local embeddings
@@ -50,29 +97,108 @@ def get_vector_store() -> VectorStore:
     )
 
 
-def get_embedder() -> BaseEmbedder:
-    """Get embedder instance."""
+def get_cached_embedder(provider: str, model_name: Optional[str] = None) -> BaseEmbedder:
+    """Get a shared embedder for a provider/model combination.
+
+    The model is resolved before the cache lookup, so callers passing the
+    default model explicitly and callers passing None share one instance
+    (and with it one set of rate limits).
+
+    Args:
+        provider: Embedding provider ("openai" or "local")
+        model_name: Model name (None = provider default from settings)
+
+    Returns:
+        Embedder instance, created on first use
+    """
+    settings = get_settings()
+    provider = provider.lower()
+    if provider == "openai":
+        model_name = model_name or settings.openai_embedding_model
+    else:
+        model_name = model_name or settings.embedding_model
+    return _get_cached_embedder(provider, model_name)
+
+
+@lru_cache(maxsize=8)
+def _get_cached_embedder(provider: str, model_name: str) -> BaseEmbedder:
+    """Create the shared embedder for a resolved provider/model pair."""
     settings = get_settings()
     kwargs = {}
-    if settings.embedding_provider == "openai":
+    if provider == "openai":
         kwargs["api_key"] = settings.openai_api_key
-        model_name = settings.openai_embedding_model
-    else:
-        model_name = settings.embedding_model
+        kwargs["cache"] = get_embedding_cache()
+        kwargs["max_concurrency"] = settings.openai_embedding_max_concurrency
+        kwargs["tokens_per_minute"] = settings.openai_embedding_tokens_per_minute
+        kwargs["requests_per_minute"] = settings.openai_embedding_requests_per_minute
 
     return create_embedder(
-        provider=settings.embedding_provider,
+        provider=provider,
         model_name=model_name,
         **kwargs
     )
 
 
+def get_repo_embedder(repo: dict) -> BaseEmbedder:
+    """Get the shared embedder matching a repository's embedding provider.
+
+    Args:
+        repo: Repository row from MetadataDB
+
+    Returns:
+        Embedder instance
+
+    Raises:
+        ValueError: If the repository uses an unsupported provider
+    """
+    embedding_provider = repo.get('embedding_provider', 'local')
+    embedding_model = repo.get('embedding_model')
+
+    logger.debug("Query embedder: %s/%s", embedding_provider, embedding_model)
+
+    # Always use OpenAI embeddings (local embeddings no longer supported)
+    if embedding_provider == "local":
+        logger.warning("Repository was indexed with 'local' embeddings, but only 'openai' is supported now. Falling back to OpenAI.")
+        embedding_provider = "openai"
+
+    if embedding_provider != "openai":
+        # This shouldn't happen anymore, but just in case
+        raise ValueError(f"Unsupported embedding provider: {embedding_provider}. Only 'openai' is supported.")
+
+    return get_cached_embedder("openai", embedding_model)
+
+
+@lru_cache(maxsize=8)
+def _get_retriever(vector_store: VectorStore, embedder: BaseEmbedder) -> CodeRetriever:
+    """Get the shared retriever for a vector store/embedder pair."""
+    return CodeRetriever(
+        vector_store=vector_store,
+        embedder=embedder
+    )
+
+
+def get_embedder() -> BaseEmbedder:
+    """Get embedder instance for the configured provider."""
+    settings = get_settings()
+    return get_cached_embedder(settings.embedding_provider)
+
+
 def get_indexer(
     db: MetadataDB = Depends(get_db),
     vector_store: VectorStore = Depends(get_vector_store),
     embedder: BaseEmbedder = Depends(get_embedder)
 ) -> RepositoryIndexer:
     """Get indexer instance."""
+    return _get_indexer(db, vector_store, embedder)
+
+
+@lru_cache(maxsize=8)
+def _get_indexer(
+    db: MetadataDB,
+    vector_store: VectorStore,
+    embedder: BaseEmbedder
+) -> RepositoryIndexer:
+    """Get the shared indexer for a database/vector store/embedder triple."""
     return RepositoryIndexer(
         metadata_db=db,
         vector_store=vector_store,
@@ -85,25 +211,66 @@ def get_retriever(
     embedder: BaseEmbedder = Depends(get_embedder)
 ) -> CodeRetriever:
     """Get retriever instance."""
-    return CodeRetriever(
-        vector_store=vector_store,
-        embedder=embedder
-    )
+    return _get_retriever(vector_store, embedder)
 
 
 def get_reranker(embedder: BaseEmbedder = Depends(get_embedder)) -> Reranker:
     """Get reranker instance."""
+    return _get_reranker(embedder)
+
+
+@lru_cache(maxsize=8)
+def _get_reranker(embedder: BaseEmbedder) -> Reranker:
+    """Get the shared reranker for an embedder."""
     return Reranker(embedder=embedder)
 
 
+@lru_cache(maxsize=None)
 def get_context_assembler() -> ContextAssembler:
-    """Get context assembler instance."""
+    """Get context assembler instance (shared across requests)."""
     return ContextAssembler(max_tokens=4000)
 
 
-def get_llm_provider(settings: Settings = Depends(get_settings)):
-    """Get LLM provider instance."""
-    return LLMFactory.create_from_settings(settings)
+@lru_cache(maxsize=None)
+def get_llm_provider():
+    """Get LLM provider instance (shared across requests)."""
+    return LLMFactory.create_from_settings(get_settings())
+
+
+HEARTBEAT_TTL = 1.0
+_heartbeat_state = {'ok': True, 'ts': 0.0}
+_heartbeat_lock = asyncio.Lock()
+
+
+async def _chromadb_heartbeat(vector_store: VectorStore) -> bool:
+    """Check ChromaDB connectivity, caching the result briefly.
+
+    Frequent liveness probes share one heartbeat per HEARTBEAT_TTL, and
+    the blocking client call runs in a worker thread.
+
+    Args:
+        vector_store: Vector store instance
+
+    Returns:
+        True if ChromaDB answered the last heartbeat
+    """
+    if time.monotonic() - _heartbeat_state['ts'] < HEARTBEAT_TTL:
+        return _heartbeat_state['ok']
+
+    async with _heartbeat_lock:
+        # Another probe may have refreshed it while we waited
+        if time.monotonic() - _heartbeat_state['ts'] < HEARTBEAT_TTL:
+            return _heartbeat_state['ok']
+
+        try:
+            await asyncio.to_thread(vector_store.client.heartbeat)
+            _heartbeat_state['ok'] = True
+        except Exception as e:
+            logger.error("ChromaDB health check failed: %s", e)
+            _heartbeat_state['ok'] = False
+        _heartbeat_state['ts'] = time.monotonic()
+
+    return _heartbeat_state['ok']
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -112,13 +279,8 @@ async def health_check(
     vector_store: VectorStore = Depends(get_vector_store)
 ):
     """Health check endpoint."""
-    # Check ChromaDB connection
-    try:
-        vector_store.client.heartbeat()
-        chromadb_connected = True
-    except Exception as e:
-        logger.error(f"ChromaDB health check failed: {e}")
-        chromadb_connected = False
+    # Check ChromaDB connection (result reused for HEARTBEAT_TTL seconds)
+    chromadb_connected = await _chromadb_heartbeat(vector_store)
 
     return HealthResponse(
         status="healthy" if chromadb_connected else "degraded",
@@ -127,22 +289,56 @@ async def health_check(
     )
 
 
-@router.get("/codex/status")
-async def codex_status():
-    """Check Codex CLI availability and authentication status."""
-    import subprocess
-    import json as json_lib
+CODEX_STATUS_TTL = 30.0
+_codex_status_state: Dict[str, Any] = {'value': None, 'ts': 0.0}
+_codex_status_lock = asyncio.Lock()
+
 
+async def _run_codex(*args: str, timeout: float) -> Tuple[int, str, str]:
+    """Run the Codex CLI without blocking the event loop.
+
+    Args:
+        *args: Arguments passed to the codex executable
+        timeout: Seconds to wait before killing the process
+
+    Returns:
+        Tuple of (return code, stdout, stderr)
+
+    Raises:
+        FileNotFoundError: If the codex executable is missing
+        asyncio.TimeoutError: If the process did not finish in time
+    """
+    proc = await asyncio.create_subprocess_exec(
+        'codex', *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+
+    return (
+        proc.returncode,
+        stdout.decode(errors='replace'),
+        stderr.decode(errors='replace')
+    )
+
+
+async def _probe_codex_status() -> Dict[str, Any]:
+    """Probe Codex CLI installation and authentication.
+
+    Returns:
+        Status dictionary for the /codex/status endpoint
+    """
     try:
         # Check if codex is installed
-        version_result = subprocess.run(
-            ['codex', '--version'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        returncode, stdout, _ = await _run_codex('--version', timeout=5)
 
-        if version_result.returncode != 0:
+        if returncode != 0:
             return {
                 "installed": False,
                 "authenticated": False,
@@ -150,22 +346,20 @@ async def codex_status():
                 "error": "Codex CLI not found"
             }
 
-        version = version_result.stdout.strip()
+        version = stdout.strip()
 
         # Try a simple test to check authentication
         # Note: --dangerously-bypass-approvals-and-sandbox is required in Docker containers
-        test_result = subprocess.run(
-            ['codex', 'exec', '--skip-git-repo-check', '--dangerously-bypass-approvals-and-sandbox', '--json', 'echo test'],
-            capture_output=True,
-            text=True,
+        returncode, _, stderr = await _run_codex(
+            'exec', '--skip-git-repo-check', '--dangerously-bypass-approvals-and-sandbox',
+            '--json', 'echo test',
             timeout=15
         )
 
-        authenticated = test_result.returncode == 0
+        authenticated = returncode == 0
         error_msg = None
 
         if not authenticated:
-            stderr = test_result.stderr
             if "403" in stderr or "Unauthorized" in stderr:
                 error_msg = "Not authenticated. Please run 'codex' on host to login."
             else:
@@ -178,7 +372,7 @@ async def codex_status():
             "error": error_msg
         }
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {
             "installed": True,
             "authenticated": None,
@@ -201,48 +395,86 @@ async def codex_status():
         }
 
 
+@router.get("/codex/status")
+async def codex_status():
+    """Check Codex CLI availability and authentication status.
+
+    The probe spawns Codex processes, so its result is shared for
+    CODEX_STATUS_TTL seconds and concurrent callers wait on one refresh.
+    """
+    if time.monotonic() - _codex_status_state['ts'] < CODEX_STATUS_TTL:
+        return _codex_status_state['value']
+
+    async with _codex_status_lock:
+        # Another caller may have refreshed it while we waited
+        if time.monotonic() - _codex_status_state['ts'] < CODEX_STATUS_TTL:
+            return _codex_status_state['value']
+
+        _codex_status_state['value'] = await _probe_codex_status()
+        _codex_status_state['ts'] = time.monotonic()
+
+    return _codex_status_state['value']
+
+
 @router.post("/repos", response_model=RepositoryResponse)
-async def create_repository(
+def create_repository(
     repo_data: RepositoryCreate,
     db: MetadataDB = Depends(get_db)
 ):
     """Add a new repository to track."""
-    try:
-        # Validate Git repository
-        if not GitOperations.is_git_repository(repo_data.path):
-            raise HTTPException(status_code=400, detail="Path is not a valid Git repository")
-
-        # Check if repository already exists
-        existing = db.get_repository_by_path(repo_data.path)
-        if existing:
-            raise HTTPException(status_code=409, detail="Repository already exists")
+    # Validate Git repository
+    if not GitOperations.is_git_repository(repo_data.path):
+        raise HTTPException(status_code=400, detail="Path is not a valid Git repository")
 
-        # Add repository
-        repo_id = db.add_repository(repo_data.path, repo_data.name)
-        repo = db.get_repository(repo_id)
+    # Check if repository already exists
+    existing = db.get_repository_by_path(repo_data.path)
+    if existing:
+        raise HTTPException(status_code=409, detail="Repository already exists")
 
-        return RepositoryResponse(**repo)
+    # Add repository
+    repo_id = db.add_repository(repo_data.path, repo_data.name)
+    repo = db.get_repository(repo_id)
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating repository: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return RepositoryResponse(**repo)
 
 
 @router.get("/repos", response_model=List[RepositoryResponse])
-async def list_repositories(db: MetadataDB = Depends(get_db)):
+def list_repositories(db: MetadataDB = Depends(get_db)):
     """List all repositories."""
-    try:
-        repos = db.list_repositories()
-        return [RepositoryResponse(**repo) for repo in repos]
-    except Exception as e:
-        logger.error(f"Error listing repositories: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    repos = db.list_repositories()
+    return [RepositoryResponse(**repo) for repo in repos]
+
+
+@router.get("/repos/stats", response_model=Dict[str, RepositoryStats])
+async def get_all_repository_stats(db: MetadataDB = Depends(get_db)):
+    """Get statistics for all repositories, keyed by repository ID.
+
+    Git stats for each repository are collected concurrently in worker
+    threads. Repositories whose stats can't be read are left out.
+    """
+    repos = await asyncio.to_thread(db.list_repositories)
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_repo_stats, repo["path"]) for repo in repos),
+        return_exceptions=True
+    )
+
+    stats = {}
+    for repo, result in zip(repos, results):
+        if isinstance(result, Exception):
+            logger.error("Error getting stats for repository %s: %s", repo["id"], result)
+            continue
+        stats[repo["id"]] = result
+    return stats
+
+
+def _repo_stats(repo_path: str) -> RepositoryStats:
+    """Read Git statistics for a repository path."""
+    return RepositoryStats(**GitOperations(repo_path).get_repo_stats())
 
 
 @router.get("/repos/{repo_id}", response_model=RepositoryResponse)
-async def get_repository(repo_id: str, db: MetadataDB = Depends(get_db)):
+def get_repository(repo_id: str, db: MetadataDB = Depends(get_db)):
     """Get repository details."""
     repo = db.get_repository(repo_id)
     if not repo:
@@ -251,7 +483,7 @@ async def get_repository(repo_id: str, db: MetadataDB = Depends(get_db)):
 
 
 @router.put("/repos/{repo_id}/activate")
-async def activate_repository(repo_id: str, db: MetadataDB = Depends(get_db)):
+def activate_repository(repo_id: str, db: MetadataDB = Depends(get_db)):
     """Set a repository as active."""
     repo = db.get_repository(repo_id)
     if not repo:
@@ -262,7 +494,7 @@ async def activate_repository(repo_id: str, db: MetadataDB = Depends(get_db)):
 
 
 @router.delete("/repos/{repo_id}")
-async def delete_repository(
+def delete_repository(
     repo_id: str,
     db: MetadataDB = Depends(get_db),
     vector_store: VectorStore = Depends(get_vector_store)
@@ -276,175 +508,656 @@ async def delete_repository(
         # Delete from ChromaDB
         collection_name = repo['chroma_collection_name']
         vector_store.delete_collection(collection_name)
-        logger.info(f"Deleted ChromaDB collection: {collection_name}")
+        logger.info("Deleted ChromaDB collection: %s", collection_name)
     except Exception as e:
-        logger.error(f"Failed to delete ChromaDB collection: {e}")
+        logger.error("Failed to delete ChromaDB collection: %s", e)
 
     # Delete from metadata database
     db.delete_repository(repo_id)
+    _invalidate_repo_caches(repo_id)
     return {"message": "Repository deleted", "repo_id": repo_id}
 
 
 @router.get("/repos/{repo_id}/stats", response_model=RepositoryStats)
-async def get_repository_stats(repo_id: str, db: MetadataDB = Depends(get_db)):
+def get_repository_stats(repo_id: str, db: MetadataDB = Depends(get_db)):
     """Get repository statistics."""
     repo = db.get_repository(repo_id)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
 
-    try:
-        git_ops = GitOperations(repo["path"])
-        stats = git_ops.get_repo_stats()
-        return RepositoryStats(**stats)
-    except Exception as e:
-        logger.error(f"Error getting repository stats: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return _repo_stats(repo["path"])
+
+
+# In-memory registry of background indexing jobs (most recent last).
+# Routes and job workers touch it from different threads, so every access
+# goes through _JOBS_LOCK. Jobs wait in a per-repo queue and one worker
+# thread per busy repo runs them in order, so no thread sits blocked
+# behind another job.
+MAX_FINISHED_JOBS = 100
+_JOBS: Dict[str, Dict[str, Any]] = {}
+_JOBS_LOCK = threading.Lock()
+_REPO_JOB_QUEUES: Dict[str, deque] = {}
+
+
+def _create_job(repo_id: str, job_type: str, **details) -> Dict[str, Any]:
+    """Register a new background indexing job.
+
+    Must be called with _JOBS_LOCK held.
 
+    Args:
+        repo_id: Repository UUID
+        job_type: Job type ("full", "incremental", "file" or "files")
+        **details: Extra fields to expose in the job status
 
-@router.post("/repos/{repo_id}/index")
-async def trigger_indexing(
+    Returns:
+        Job dict
+    """
+    job = {
+        'job_id': str(uuid.uuid4()),
+        'repo_id': repo_id,
+        'job_type': job_type,
+        'status': 'pending',
+        'progress': {'processed_files': 0, 'total_files': 0},
+        'result': None,
+        'error': None,
+        'created_at': datetime.now().isoformat(),
+        'finished_at': None,
+        **details
+    }
+    _JOBS[job['job_id']] = job
+
+    # Forget the oldest finished jobs
+    finished = [j['job_id'] for j in _JOBS.values() if j['finished_at']]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _JOBS[job_id]
+
+    return job
+
+
+def _find_active_job(repo_id: str, job_type: str) -> Optional[Dict[str, Any]]:
+    """Find a pending or running job of the given type for a repository.
+
+    Must be called with _JOBS_LOCK held.
+    """
+    for job in reversed(list(_JOBS.values())):
+        if job['repo_id'] == repo_id and job['job_type'] == job_type and not job['finished_at']:
+            return job
+    return None
+
+
+def _get_or_create_job(
+    repo_id: str,
+    job_type: str,
+    pending_only: bool = False,
+    **details
+) -> Tuple[Dict[str, Any], bool]:
+    """Reuse an active job of the given type, or register a new one.
+
+    The lookup and registration happen under one lock, so concurrent
+    requests for the same repository cannot both start a job.
+
+    Args:
+        repo_id: Repository UUID
+        job_type: Job type ("full", "incremental", "file" or "files")
+        pending_only: Only reuse a job that has not started running yet
+        **details: Extra fields to expose in the job status
+
+    Returns:
+        Tuple of (job dict, whether it was newly created)
+    """
+    with _JOBS_LOCK:
+        job = _find_active_job(repo_id, job_type)
+        if job and (not pending_only or job['status'] == 'pending'):
+            return job, False
+        return _create_job(repo_id, job_type, **details), True
+
+
+def _get_job(repo_id: str, job_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Get a snapshot of a job, or of the most recent job for a repository.
+
+    Args:
+        repo_id: Repository UUID
+        job_id: Job ID; the latest job for the repository if omitted
+
+    Returns:
+        Copy of the job dict, or None if not found
+    """
+    with _JOBS_LOCK:
+        if job_id:
+            job = _JOBS.get(job_id)
+            if job is None or job['repo_id'] != repo_id:
+                return None
+            return dict(job)
+        for job in reversed(list(_JOBS.values())):
+            if job['repo_id'] == repo_id:
+                return dict(job)
+    return None
+
+
+def _submit_job(
+    job: Dict[str, Any],
+    work: Callable[[Callable[[int, int], None]], Dict[str, Any]],
+    on_done: Optional[Callable[[], None]] = None
+):
+    """Queue a job behind any earlier jobs for the same repository.
+
+    Starts a worker thread for the repository if none is running.
+
+    Args:
+        job: Job dict from _create_job()
+        work: Callable taking a progress callback and returning the result
+        on_done: Called from the worker thread once the job has finished
+    """
+    repo_id = job['repo_id']
+    with _JOBS_LOCK:
+        queue = _REPO_JOB_QUEUES.get(repo_id)
+        if queue is not None:
+            queue.append((job, work, on_done))
+            return
+        _REPO_JOB_QUEUES[repo_id] = deque([(job, work, on_done)])
+
+    threading.Thread(
+        target=_drain_repo_jobs,
+        args=(repo_id,),
+        daemon=True,
+        name=f"IndexJobs-{repo_id[:8]}"
+    ).start()
+
+
+def _drain_repo_jobs(repo_id: str):
+    """Run a repository's queued jobs one after another until the queue is empty."""
+    while True:
+        with _JOBS_LOCK:
+            queue = _REPO_JOB_QUEUES[repo_id]
+            if not queue:
+                del _REPO_JOB_QUEUES[repo_id]
+                return
+            job, work, on_done = queue.popleft()
+
+        _run_job(job, work)
+        if on_done is not None:
+            on_done()
+
+
+def _run_job(job: Dict[str, Any], work: Callable[[Callable[[int, int], None]], Dict[str, Any]]):
+    """Run an indexing job, recording progress and outcome in the registry.
+
+    Executed by the repository's worker thread; the job stays "pending"
+    while earlier jobs for the repository are still running.
+
+    Args:
+        job: Job dict from _create_job()
+        work: Callable taking a progress callback and returning the result
+    """
+    def update(**fields):
+        with _JOBS_LOCK:
+            job.update(fields)
+
+    def on_progress(processed: int, total: int):
+        update(progress={'processed_files': processed, 'total_files': total})
+
+    update(status='in_progress')
+    try:
+        result = work(on_progress)
+        update(result=result, status='completed')
+        logger.info("Indexing job %s (%s) completed", job['job_id'], job['job_type'])
+    except Exception as e:
+        logger.error("Indexing job %s (%s) failed: %s", job['job_id'], job['job_type'], e)
+        update(error=str(e), status='failed')
+    finally:
+        update(finished_at=datetime.now().isoformat())
+        _invalidate_repo_caches(job['repo_id'])
+
+
+def _job_accepted(job: Dict[str, Any], message: str, **extra) -> Dict[str, Any]:
+    """Build the 202 response body for a queued job."""
+    return {
+        "message": message,
+        "job_id": job['job_id'],
+        "repo_id": job['repo_id'],
+        "status": job['status'],
+        **extra
+    }
+
+
+@router.post("/repos/{repo_id}/index", status_code=202)
+def trigger_indexing(
     repo_id: str,
     request: Optional[IndexingRequest] = None,
     db: MetadataDB = Depends(get_db),
     vector_store: VectorStore = Depends(get_vector_store)
 ):
-    """Trigger repository indexing with optional embedding provider selection."""
+    """Start repository indexing in the background.
+
+    Returns immediately with a job ID; poll /repos/{repo_id}/index/status.
+    """
     repo = db.get_repository(repo_id)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
 
-    try:
-        settings = get_settings()
-        force_reindex = request.force_reindex if request else False
-
-        # Get embedding provider from request or use default from settings
-        embedding_provider = request.embedding_provider if request and request.embedding_provider else settings.embedding_provider
-        embedding_model = request.embedding_model if request and request.embedding_model else None
-
-        # Create embedder with specified provider
-        if embedding_provider == "openai":
-            embedder = create_embedder(
-                provider="openai",
-                model_name=embedding_model or settings.openai_embedding_model,
-                api_key=settings.openai_api_key
-            )
-        else:
-            embedder = create_embedder(
-                provider="local",
-                model_name=embedding_model or settings.embedding_model
-            )
-
-        logger.info(f"Using embedder: {embedding_provider}/{embedder.get_model_info()['model_name']}")
-
-        # Create indexer with custom embedder
-        indexer = RepositoryIndexer(
-            metadata_db=db,
-            vector_store=vector_store,
-            embedder=embedder
-        )
+    settings = get_settings()
+    force_reindex = request.force_reindex if request else False
+
+    # Get embedding provider from request or use default from settings
+    embedding_provider = request.embedding_provider if request and request.embedding_provider else settings.embedding_provider
+    embedding_model = request.embedding_model if request and request.embedding_model else None
 
+    # Get embedder for the specified provider
+    embedder = get_cached_embedder(
+        "openai" if embedding_provider == "openai" else "local",
+        embedding_model
+    )
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Using embedder: %s/%s", embedding_provider, embedder.get_model_info()['model_name'])
+
+    # Get indexer with custom embedder
+    indexer = _get_indexer(db, vector_store, embedder)
+
+    embedding_info = {
+        "embedding_provider": embedding_provider,
+        "embedding_model": embedder.get_model_info()['model_name'],
+        "embedding_dimension": embedder.get_embedding_dimension()
+    }
+
+    def work(progress_callback):
         # Run full indexing
         result = indexer.index_repository(
             repo_id=repo_id,
             repo_path=repo['path'],
-            force_reindex=force_reindex
+            force_reindex=force_reindex,
+            progress_callback=progress_callback
         )
 
         # Update repository with embedding info
-        db.update_repository_embedding_info(
-            repo_id=repo_id,
-            embedding_provider=embedding_provider,
-            embedding_model=embedder.get_model_info()['model_name'],
-            embedding_dimension=embedder.get_embedding_dimension()
-        )
+        db.update_repository_embedding_info(repo_id=repo_id, **embedding_info)
+        return result
 
-        return {
-            "message": "Indexing completed",
-            "repo_id": repo_id,
-            "indexed_files": result['indexed_files'],
-            "total_chunks": result['total_chunks'],
-            "status": result['status'],
-            "embedding_provider": embedding_provider,
-            "embedding_model": embedder.get_model_info()['model_name'],
-            "embedding_dimension": embedder.get_embedding_dimension()
-        }
-    except Exception as e:
-        logger.error(f"Error during indexing: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    job, created = _get_or_create_job(repo_id, 'full', embedding=embedding_info)
+    if not created:
+        return _job_accepted(job, "Indexing already in progress", **job['embedding'])
+    _submit_job(job, work)
+
+    return _job_accepted(job, "Indexing started", **embedding_info)
 
 
-@router.post("/repos/{repo_id}/index/file")
-async def index_file(
+@router.post("/repos/{repo_id}/index/file", status_code=202)
+def index_file(
     repo_id: str,
     file_path: str,
     indexer: RepositoryIndexer = Depends(get_indexer),
     db: MetadataDB = Depends(get_db)
 ):
-    """Index a specific file in the repository."""
+    """Index a specific file in the repository in the background."""
     repo = db.get_repository(repo_id)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
 
-    try:
+    def work(progress_callback):
         chunks_added = indexer.index_file(
             repo_id=repo_id,
             file_path=file_path,
             is_uncommitted=True
         )
+        return {"file_path": file_path, "chunks_added": chunks_added}
 
-        return {
-            "message": "File indexed successfully",
-            "file_path": file_path,
-            "chunks_added": chunks_added
-        }
-    except Exception as e:
-        logger.error(f"Error indexing file: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    with _JOBS_LOCK:
+        job = _create_job(repo_id, 'file', file_path=file_path)
+    _submit_job(job, work)
 
+    return _job_accepted(job, "File indexing started", file_path=file_path)
 
-@router.post("/repos/{repo_id}/index/incremental")
-async def incremental_index(
+
+@router.post("/repos/{repo_id}/index/files")
+async def index_files(
     repo_id: str,
+    request: IndexingRequest,
     indexer: RepositoryIndexer = Depends(get_indexer),
     db: MetadataDB = Depends(get_db)
 ):
-    """Perform incremental indexing (only modified files)."""
+    """Index a batch of files in the repository."""
     repo = db.get_repository(repo_id)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
 
-    try:
-        result = indexer.incremental_index(repo_id)
+    if not request.file_paths:
+        raise HTTPException(status_code=400, detail="file_paths is required")
 
-        return {
-            "message": "Incremental indexing completed",
-            "repo_id": repo_id,
-            "indexed_files": result['indexed_files'],
-            "total_chunks": result['total_chunks'],
-            "status": result['status']
-        }
-    except Exception as e:
-        logger.error(f"Error during incremental indexing: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    def work(progress_callback):
+        return indexer.index_files(
+            repo_id=repo_id,
+            file_paths=request.file_paths,
+            is_uncommitted=True
+        )
+
+    # Small batches stay synchronous for the watcher, but wait their turn
+    # behind any running job for the repository, off the event loop
+    loop = asyncio.get_running_loop()
+    finished = loop.create_future()
+
+    def on_done():
+        loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
+
+    with _JOBS_LOCK:
+        job = _create_job(repo_id, 'files', file_count=len(request.file_paths))
+    _submit_job(job, work, on_done)
+    await finished
+
+    with _JOBS_LOCK:
+        job = dict(job)
+    if job['status'] == 'failed':
+        raise HTTPException(status_code=500, detail=job['error'])
+
+    result = job['result']
+    return {
+        "message": "Files indexed successfully",
+        "indexed_files": result['indexed_files'],
+        "chunks_added": result['total_chunks'],
+        "failed_files": result['failed_files']
+    }
+
+
+@router.post("/repos/{repo_id}/index/incremental", status_code=202)
+def incremental_index(
+    repo_id: str,
+    indexer: RepositoryIndexer = Depends(get_indexer),
+    db: MetadataDB = Depends(get_db)
+):
+    """Start incremental indexing (only modified files) in the background."""
+    repo = db.get_repository(repo_id)
+    if not repo:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    # A queued run will pick up any further modifications when it starts;
+    # a new run queued behind a running one waits for it to finish
+    job, created = _get_or_create_job(repo_id, 'incremental', pending_only=True)
+    if not created:
+        return _job_accepted(job, "Incremental indexing already queued")
+
+    def work(progress_callback):
+        return indexer.incremental_index(repo_id, progress_callback=progress_callback)
+
+    _submit_job(job, work)
+
+    return _job_accepted(job, "Incremental indexing started")
 
 
 @router.get("/repos/{repo_id}/index/status")
 async def get_indexing_status(
     repo_id: str,
+    job_id: Optional[str] = None,
     indexer: RepositoryIndexer = Depends(get_indexer),
     db: MetadataDB = Depends(get_db)
 ):
-    """Get indexing status and statistics for a repository."""
+    """Get indexing status and statistics for a repository.
+
+    Includes the requested background job (or the latest one) under "job".
+    """
     repo = db.get_repository(repo_id)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
 
+    job = _get_job(repo_id, job_id)
+    if job_id and job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    stats = await asyncio.to_thread(indexer.get_indexing_stats, repo_id)
+    if job:
+        stats['job'] = job
+    return stats
+
+
+@router.get("/repos/{repo_id}/index/jobs/{job_id}")
+async def get_indexing_job(repo_id: str, job_id: str):
+    """Get the status of a background indexing job."""
+    job = _get_job(repo_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
+
+
+_GIT_RECORD_SEP = "\x1e"
+_GIT_FIELD_SEP = "\x1f"
+
+
+async def _fetch_git_context(repo_path: str, include_diff: bool) -> str:
+    """Build a Markdown summary of the latest commits.
+
+    Runs a single ``git log`` without blocking the event loop. When
+    include_diff is set, the same invocation also returns the message body
+    and ``--stat`` of each commit, and the latest one is appended.
+
+    Args:
+        repo_path: Path to the repository
+        include_diff: Whether to include details of the latest commit
+
+    Returns:
+        Markdown Git context, or an empty string if git produced nothing
+    """
+    header = f"{_GIT_RECORD_SEP}%H{_GIT_FIELD_SEP}%s{_GIT_FIELD_SEP}%an{_GIT_FIELD_SEP}%ar"
+    args = ['git', '-C', repo_path, 'log', '-5']
+    if include_diff:
+        args += ['--stat', f'--format={header}%n%B']
+    else:
+        args.append(f'--format={header}')
+
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
     try:
-        stats = indexer.get_indexing_stats(repo_id)
-        return stats
-    except Exception as e:
-        logger.error(f"Error getting indexing status: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        stdout, _ = await proc.communicate()
+    except asyncio.CancelledError:
+        # Timed out (or request cancelled); don't leave git running
+        if proc.returncode is None:
+            proc.kill()
+        raise
+
+    if proc.returncode != 0 or not stdout:
+        return ""
+
+    records = [r for r in stdout.decode('utf-8', errors='replace').split(_GIT_RECORD_SEP) if r.strip()]
+    if not records:
+        return ""
+
+    git_context = "\n\n# Actual Git History\n\nLatest 5 commits:\n\n"
+    commits = []
+    for record in records:
+        line, _, details = record.partition('\n')
+        hash_val, msg, author, date = line.split(_GIT_FIELD_SEP, 3)
+        git_context += f"- `{hash_val[:7]}` - {msg} (by {author}, {date})\n"
+        commits.append((hash_val[:7], details.strip('\n')))
+
+    if include_diff:
+        logger.info("Adding diff for latest commit")
+        latest, details = commits[0]
+        if details:
+            # Limit diff to first 1500 chars to avoid overwhelming the context
+            diff_text = details[:1500]
+            if len(details) > 1500:
+                diff_text += "\n... (diff truncated for brevity)"
+
+            git_context += f"\n\n## Latest Commit Details (`{latest}`)\n\n```diff\n{diff_text}\n```\n"
+
+    return git_context
+
+
+_GIT_KEYWORDS = {
+    'log': ('commit', 'git log', 'git history', 'latest change', 'recent change', 'what changed', 'changes in'),
+    'diff': ('latest commit', 'what changed', 'changes in', 'what did', 'functional improvement'),
+}
+
+
+def _build_git_keyword_matcher():
+    """Build a single-pass matcher for the Git keywords.
+
+    Each keyword is tagged with every category whose keywords it contains
+    (e.g. "latest commit" is also a "log" hit via "commit"), so reporting
+    only the longest keyword starting at each position still yields the
+    full set of tags.
+
+    Returns:
+        Function mapping a lowercased query to the set of matched tags
+    """
+    keywords = {kw for kws in _GIT_KEYWORDS.values() for kw in kws}
+    tags = {
+        kw: frozenset(
+            tag for tag, kws in _GIT_KEYWORDS.items()
+            if any(other in kw for other in kws)
+        )
+        for kw in keywords
+    }
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for kw, kw_tags in tags.items():
+            automaton.add_word(kw, kw_tags)
+        automaton.make_automaton()
+
+        def match(query_lower: str) -> set:
+            hits = set()
+            for _, kw_tags in automaton.iter(query_lower):
+                hits.update(kw_tags)
+            return hits
+    else:
+        # Longest keywords first so alternation prefers the tag-richest match;
+        # the lookahead tries every position, so overlapping keywords
+        # ("latest change" / "changes in") are all reported
+        pattern = re.compile('(?=(' + '|'.join(
+            re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)
+        ) + '))')
+
+        def match(query_lower: str) -> set:
+            hits = set()
+            for m in pattern.finditer(query_lower):
+                hits.update(tags[m.group(1)])
+            return hits
+
+    return match
+
+
+_match_git_keywords = _build_git_keyword_matcher()
+
+
+async def _git_context_for_query(repo_path: str, query: str) -> str:
+    """Fetch Git history context if the query is about Git history.
+
+    Args:
+        repo_path: Path to the repository
+        query: User query
+
+    Returns:
+        Markdown Git context, or an empty string if not relevant
+    """
+    hits = _match_git_keywords(query.lower())
+    if 'log' not in hits:
+        return ""
+
+    # If query asks about "latest commit" or "what changed", include the diff
+    include_diff = 'diff' in hits
+    git_context = await asyncio.wait_for(
+        _fetch_git_context(repo_path, include_diff),
+        timeout=10
+    )
+    if git_context:
+        logger.info("Added Git history context for query: %s", query[:50])
+    return git_context
+
+
+_SOURCE_FIELDS = ('file_path', 'chunk_type', 'name', 'start_line', 'end_line', 'similarity')
+_get_source_fields = itemgetter(*_SOURCE_FIELDS)
+_get_code = itemgetter('code')
+
+
+def _source_entry(fields: tuple, code_preview: str) -> dict:
+    """Zip one row of source fields back into a source dict."""
+    entry = dict(zip(_SOURCE_FIELDS, fields))
+    entry['code_preview'] = code_preview
+    return entry
+
+
+def _build_sources(chunks: List[dict]) -> List[dict]:
+    """Build the sources list for a query response.
+
+    Fields are pulled column-wise with itemgetter and zipped back per row.
+
+    Args:
+        chunks: Final retrieved chunks
+
+    Returns:
+        List of source dicts with a 200-char code preview
+    """
+    previews = [
+        code if len(code) <= 200 else code[:200] + '...'
+        for code in map(_get_code, chunks)
+    ]
+    return list(map(_source_entry, map(_get_source_fields, chunks), previews))
+
+
+def _build_where(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build a ChromaDB where clause from flat metadata filters.
+
+    ChromaDB only accepts one field per where dict, so several filters
+    are combined with $and.
+
+    Args:
+        filters: Flat field -> value filters
+
+    Returns:
+        Where clause, or None if there are no filters
+    """
+    if not filters:
+        return None
+    if len(filters) == 1:
+        return dict(filters)
+    return {'$and': [{field: value} for field, value in sorted(filters.items())]}
+
+
+async def _filter_has_matches(vector_store: VectorStore, collection_name: str, where: Dict[str, Any]) -> bool:
+    """Check (with a FILTER_MATCH_TTL cache) whether a filter matches any chunk.
+
+    Args:
+        vector_store: Vector store instance
+        collection_name: ChromaDB collection name
+        where: Where clause from _build_where()
+
+    Returns:
+        False only if the filter is known to match nothing
+    """
+    key = (collection_name, json.dumps(where, sort_keys=True))
+    cached = _filter_match_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < FILTER_MATCH_TTL:
+        _filter_match_cache.move_to_end(key)
+        return cached[1]
+
+    has_matches = await asyncio.to_thread(vector_store.has_matches, collection_name, where)
+    _filter_match_cache[key] = (time.monotonic(), has_matches)
+    _filter_match_cache.move_to_end(key)
+    while len(_filter_match_cache) > FILTER_MATCH_CACHE_SIZE:
+        _filter_match_cache.popitem(last=False)
+    return has_matches
+
+
+def _no_results_response(repo_id: str, collection_name: str) -> QueryResponse:
+    """Build the response for a query that retrieved nothing."""
+    return QueryResponse(
+        answer="No relevant code found for your query. The repository may not be indexed yet.",
+        sources=[],
+        repo_id=repo_id,
+        metadata={
+            'retrieved_chunks': 0,
+            'collection': collection_name
+        }
+    )
+
+
+def _mark_cache_hit(response: QueryResponse) -> QueryResponse:
+    """Return a copy of a cached response flagged as a cache hit."""
+    metadata = dict(response.metadata or {})
+    metadata['cache_hit'] = True
+    return response.model_copy(update={'metadata': metadata})
 
 
 @router.post("/query", response_model=QueryResponse)
@@ -463,181 +1176,136 @@ async def query(
         if not active_repo:
             raise HTTPException(status_code=400, detail="No active repository")
         repo_id = active_repo["id"]
+        repo = active_repo
     else:
         repo_id = query_data.repo_id
         repo = db.get_repository(repo_id)
         if not repo:
             raise HTTPException(status_code=404, detail="Repository not found")
 
-    try:
-        # Get repository info
-        repo = db.get_repository(repo_id)
-        collection_name = repo['chroma_collection_name']
+    collection_name = repo['chroma_collection_name']
+
+    # Get embedder (and retriever) matching the repository's embedding provider
+    embedder = get_repo_embedder(repo)
+    retriever = _get_retriever(vector_store, embedder)
+
+    # Build filters from query parameters
+    filters = {}
+    if query_data.language:
+        filters['language'] = query_data.language
+    if query_data.file_path:
+        filters['file_path'] = query_data.file_path
+
+    # Serve repeated or near-identical questions from the semantic cache
+    cache_scope = query_cache.make_scope(
+        repo_id,
+        collection_name,
+        query_data.n_results,
+        query_data.use_reranking,
+        filters=filters
+    )
+    cached = query_cache.get_by_text(cache_scope, query_data.query)
+    if cached is not None:
+        logger.info("Query cache hit (exact): %s", query_data.query[:100])
+        return _mark_cache_hit(cached)
 
-        # Create embedder matching the repository's embedding provider
-        settings = get_settings()
-        embedding_provider = repo.get('embedding_provider', 'local')
-        embedding_model = repo.get('embedding_model')
-
-        logger.info(f"Creating query embedder: {embedding_provider}/{embedding_model}")
-
-        # Always use OpenAI embeddings (local embeddings no longer supported)
-        if embedding_provider == "local":
-            logger.warning(f"Repository was indexed with 'local' embeddings, but only 'openai' is supported now. Falling back to OpenAI.")
-            embedding_provider = "openai"
-
-        if embedding_provider == "openai":
-            embedder = create_embedder(
-                provider="openai",
-                model_name=embedding_model if embedding_provider == "openai" else settings.openai_embedding_model,
-                api_key=settings.openai_api_key
-            )
-        else:
-            # This shouldn't happen anymore, but just in case
-            raise ValueError(f"Unsupported embedding provider: {embedding_provider}. Only 'openai' is supported.")
-
-        # Create retriever with matching embedder
-        retriever = CodeRetriever(
-            vector_store=vector_store,
-            embedder=embedder
-        )
+    # Skip embedding and retrieval when the filters match nothing
+    where = _build_where(filters)
+    if where and not await _filter_has_matches(vector_store, collection_name, where):
+        logger.info("Filters match no chunks: %s", where)
+        return _no_results_response(repo_id, collection_name)
 
-        # Build filters from query parameters
-        filters = {}
-        if query_data.language:
-            filters['language'] = query_data.language
-        if query_data.file_path:
-            filters['file_path'] = query_data.file_path
+    # Fetch Git history (if asked for) while the query is embedded and
+    # chunks are retrieved
+    git_task = asyncio.ensure_future(_git_context_for_query(repo['path'], query_data.query))
+
+    try:
+        query_embedding = await asyncio.to_thread(embedder.embed_text, query_data.query)
+    except BaseException:
+        git_task.cancel()
+        raise
 
-        # Retrieve relevant chunks
-        logger.info(f"Querying: {query_data.query[:100]}")
-        chunks = retriever.retrieve(
+    cached = query_cache.get_by_embedding(cache_scope, query_embedding)
+    if cached is not None:
+        git_task.cancel()
+        logger.info("Query cache hit (semantic): %s", query_data.query[:100])
+        return _mark_cache_hit(cached)
+
+    # Retrieve relevant chunks
+    logger.info("Querying: %s", query_data.query[:100])
+    chunks, git_context = await asyncio.gather(
+        asyncio.to_thread(
+            # MMR needs the stored chunk embeddings; fetch them in the same query
+            retriever.retrieve_with_embeddings if query_data.use_reranking else retriever.retrieve,
             collection_name=collection_name,
             query=query_data.query,
             n_results=query_data.n_results or 20,
-            filters=filters if filters else None
-        )
-
-        if not chunks:
-            return QueryResponse(
-                answer="No relevant code found for your query. The repository may not be indexed yet.",
-                sources=[],
-                repo_id=repo_id,
-                metadata={
-                    'retrieved_chunks': 0,
-                    'collection': collection_name
-                }
-            )
-
-        # Apply reranking if requested
-        if query_data.use_reranking:
-            logger.info("Applying MMR reranking")
-            chunks = reranker.mmr_rerank(
-                chunks=chunks,
-                lambda_param=0.5,
-                top_k=query_data.n_results or 10
-            )
-
-        # Limit to requested number
-        final_chunks = chunks[:query_data.n_results] if query_data.n_results else chunks
-
-        # Check if query is about Git history and augment with actual Git data
+            filters=where,
+            query_embedding=query_embedding
+        ),
+        git_task,
+        return_exceptions=True
+    )
+    if isinstance(chunks, BaseException):
+        raise chunks
+    chunk_embeddings = None
+    if query_data.use_reranking:
+        chunks, chunk_embeddings = chunks
+    if isinstance(git_context, BaseException):
+        logger.warning("Failed to get Git history: %s", git_context)
         git_context = ""
-        query_lower = query_data.query.lower()
-        if any(keyword in query_lower for keyword in ['commit', 'git log', 'git history', 'latest change', 'recent change', 'what changed', 'changes in']):
-            try:
-                # Get latest commits
-                import subprocess
-                result = subprocess.run(
-                    ['git', '-C', repo['path'], 'log', '-5', '--format=%H|%s|%an|%ar'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-
-                if result.returncode == 0 and result.stdout:
-                    git_context = "\n\n# Actual Git History\n\nLatest 5 commits:\n\n"
-                    commits = []
-                    for line in result.stdout.strip().split('\n'):
-                        hash_val, msg, author, date = line.split('|', 3)
-                        git_context += f"- `{hash_val[:7]}` - {msg} (by {author}, {date})\n"
-                        commits.append(hash_val[:7])
-
-                    # If query asks about "latest commit" or "what changed", include the diff
-                    if any(phrase in query_lower for phrase in ['latest commit', 'what changed', 'changes in', 'what did', 'functional improvement']):
-                        logger.info("Adding diff for latest commit")
-                        diff_result = subprocess.run(
-                            ['git', '-C', repo['path'], 'show', '--stat', '--format=%B', commits[0]],
-                            capture_output=True,
-                            text=True,
-                            timeout=10
-                        )
-
-                        if diff_result.returncode == 0 and diff_result.stdout:
-                            # Limit diff to first 1500 chars to avoid overwhelming the context
-                            diff_text = diff_result.stdout[:1500]
-                            if len(diff_result.stdout) > 1500:
-                                diff_text += "\n... (diff truncated for brevity)"
-
-                            git_context += f"\n\n## Latest Commit Details (`{commits[0]}`)\n\n```diff\n{diff_text}\n```\n"
-
-                    logger.info(f"Added Git history context for query: {query_data.query[:50]}")
-            except Exception as e:
-                logger.warning(f"Failed to get Git history: {e}")
-
-        # Assemble context for LLM
-        context = context_assembler.assemble_context(
-            chunks=final_chunks,
-            query=query_data.query,
-            max_chunks=10
+
+    if not chunks:
+        return _no_results_response(repo_id, collection_name)
+
+    # Apply reranking if requested
+    if query_data.use_reranking:
+        logger.info("Applying MMR reranking")
+        chunks = reranker.mmr_rerank(
+            chunks=chunks,
+            query_embedding=query_embedding,
+            chunk_embeddings=chunk_embeddings,
+            lambda_param=0.5,
+            top_k=query_data.n_results or 10
         )
 
-        # Add Git context if available
-        if git_context:
-            context = git_context + "\n\n" + context
+    # Limit to requested number
+    final_chunks = chunks[:query_data.n_results] if query_data.n_results else chunks
 
-        # Build prompt (for now, return context as answer)
-        # In Phase 6, this will call the actual LLM
-        prompt = context_assembler.assemble_prompt(
-            chunks=final_chunks,
-            query=query_data.query
-        )
+    # Assemble context, prompt and metadata summary in one pass
+    assembled = context_assembler.assemble_all(
+        chunks=final_chunks,
+        query=query_data.query,
+        max_context_chunks=10
+    )
+    context = assembled['context']
+    prompt = assembled['prompt']
+    metadata_summary = assembled['metadata_summary']
 
-        # Inject Git context into prompt if available
-        if git_context:
-            prompt = prompt.replace("# Relevant Code Context\n\n", f"# Relevant Code Context\n\n{git_context}\n\n")
-
-        # Build sources list
-        sources = [
-            {
-                'file_path': chunk['file_path'],
-                'chunk_type': chunk['chunk_type'],
-                'name': chunk['name'],
-                'start_line': chunk['start_line'],
-                'end_line': chunk['end_line'],
-                'similarity': chunk['similarity'],
-                'code_preview': chunk['code'][:200] + '...' if len(chunk['code']) > 200 else chunk['code']
-            }
-            for chunk in final_chunks
-        ]
+    # Add Git context if available
+    if git_context:
+        context = git_context + "\n\n" + context
+        prompt = prompt.replace("# Relevant Code Context\n\n", f"# Relevant Code Context\n\n{git_context}\n\n")
 
-        # Get metadata summary
-        metadata_summary = context_assembler.build_metadata_summary(final_chunks)
+    # Build sources list
+    sources = _build_sources(final_chunks)
 
-        # Call LLM to generate answer
-        try:
-            logger.info("Calling LLM to generate answer")
-            answer = await llm_provider.generate(
-                prompt=prompt,
-                temperature=0.1,
-                max_tokens=2000
-            )
-            logger.info(f"LLM generated {len(answer)} chars")
+    # Call LLM to generate answer
+    llm_failed = False
+    try:
+        logger.info("Calling LLM to generate answer")
+        answer = await llm_provider.generate(
+            prompt=prompt,
+            temperature=0.1,
+            max_tokens=2000
+        )
+        logger.info("LLM generated %d chars", len(answer))
 
-        except LLMError as e:
-            logger.error(f"LLM generation failed: {e}")
-            # Fallback to context only
-            answer = f"""# Error generating LLM response
+    except LLMError as e:
+        logger.error("LLM generation failed: %s", e)
+        llm_failed = True
+        # Fallback to context only
+        answer = f"""# Error generating LLM response
 
 {str(e)}
 
@@ -650,24 +1318,117 @@ async def query(
 Query: {query_data.query}
 Retrieved: {len(final_chunks)} relevant code chunks from {metadata_summary['unique_files']} file(s)."""
 
-        return QueryResponse(
-            answer=answer,
-            sources=sources,
-            repo_id=repo_id,
-            metadata={
-                'retrieved_chunks': len(chunks),
-                'final_chunks': len(final_chunks),
-                'collection': collection_name,
-                'reranking_applied': query_data.use_reranking,
-                'summary': metadata_summary,
-                'prompt_length': len(prompt),
-                'llm_provider': llm_provider.get_model_info()['provider']
-            }
-        )
+    response = QueryResponse(
+        answer=answer,
+        sources=sources,
+        repo_id=repo_id,
+        metadata={
+            'retrieved_chunks': len(chunks),
+            'final_chunks': len(final_chunks),
+            'collection': collection_name,
+            'reranking_applied': query_data.use_reranking,
+            'summary': metadata_summary,
+            'prompt_length': len(prompt),
+            'llm_provider': llm_provider.get_model_info()['provider']
+        }
+    )
 
-    except Exception as e:
-        logger.error(f"Query failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    # Don't cache fallback answers so the next attempt retries the LLM
+    if not llm_failed:
+        query_cache.put(cache_scope, query_data.query, query_embedding, response)
+
+    return response
+
+
+STREAM_FLUSH_BYTES = 512
+STREAM_FLUSH_SECONDS = 0.02
+
+
+async def _coalesce_stream(
+    tokens: AsyncIterator[str],
+    max_bytes: int = STREAM_FLUSH_BYTES,
+    max_delay: float = STREAM_FLUSH_SECONDS
+) -> AsyncIterator[str]:
+    """Merge small LLM tokens into larger chunks.
+
+    A chunk is emitted once it reaches max_bytes characters or max_delay
+    seconds after its first token, whichever comes first. The pending
+    ``__anext__`` is kept as a task across flushes so no token is lost to
+    a timeout.
+
+    Args:
+        tokens: Token stream from the LLM provider
+        max_bytes: Flush once this many characters are buffered
+        max_delay: Flush once the oldest buffered token is this old
+
+    Yields:
+        Coalesced text chunks
+    """
+    loop = asyncio.get_running_loop()
+    iterator = tokens.__aiter__()
+    buf: List[str] = []
+    size = 0
+    deadline = 0.0
+    pending = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            timeout = max(0.0, deadline - loop.time()) if buf else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                # Timer expired with a token still in flight
+                yield ''.join(buf)
+                buf.clear()
+                size = 0
+                continue
+
+            task, pending = pending, None
+            try:
+                token = task.result()
+            except StopAsyncIteration:
+                break
+            except Exception:
+                # Deliver what we have before surfacing the error
+                if buf:
+                    yield ''.join(buf)
+                    buf.clear()
+                raise
+
+            if not buf:
+                deadline = loop.time() + max_delay
+            buf.append(token)
+            size += len(token)
+
+            if size >= max_bytes:
+                yield ''.join(buf)
+                buf.clear()
+                size = 0
+
+        if buf:
+            yield ''.join(buf)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def _sse_event(text: str) -> str:
+    """Frame text as a Server-Sent Events data message."""
+    return f"data: {json.dumps(text)}\n\n"
+
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an SSE event stream, disabling proxy buffering."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 @router.post("/query/stream")
@@ -686,83 +1447,100 @@ async def query_stream(
         if not active_repo:
             raise HTTPException(status_code=400, detail="No active repository")
         repo_id = active_repo["id"]
+        repo = active_repo
     else:
         repo_id = query_data.repo_id
         repo = db.get_repository(repo_id)
         if not repo:
             raise HTTPException(status_code=404, detail="Repository not found")
 
-    try:
-        # Get repository info
-        repo = db.get_repository(repo_id)
-        collection_name = repo['chroma_collection_name']
-
-        # Create embedder matching the repository's embedding provider
-        settings = get_settings()
-        embedding_provider = repo.get('embedding_provider', 'local')
-        embedding_model = repo.get('embedding_model')
-
-        # Always use OpenAI embeddings (local embeddings no longer supported)
-        if embedding_provider == "local":
-            logger.warning(f"Repository was indexed with 'local' embeddings, but only 'openai' is supported now. Falling back to OpenAI.")
-            embedding_provider = "openai"
-
-        if embedding_provider == "openai":
-            embedder = create_embedder(
-                provider="openai",
-                model_name=embedding_model if embedding_provider == "openai" else settings.openai_embedding_model,
-                api_key=settings.openai_api_key
-            )
-        else:
-            # This shouldn't happen anymore, but just in case
-            raise ValueError(f"Unsupported embedding provider: {embedding_provider}. Only 'openai' is supported.")
-
-        # Create retriever with matching embedder
-        retriever = CodeRetriever(
-            vector_store=vector_store,
-            embedder=embedder
+    collection_name = repo['chroma_collection_name']
+
+    # Get embedder (and retriever) matching the repository's embedding provider
+    embedder = get_repo_embedder(repo)
+    retriever = _get_retriever(vector_store, embedder)
+
+    # Build filters
+    filters = {}
+    if query_data.language:
+        filters['language'] = query_data.language
+    if query_data.file_path:
+        filters['file_path'] = query_data.file_path
+
+    # Replay a cached answer from /query if one matches
+    cache_scope = query_cache.make_scope(
+        repo_id,
+        collection_name,
+        query_data.n_results,
+        query_data.use_reranking,
+        filters=filters
+    )
+    cached = query_cache.get_by_text(cache_scope, query_data.query)
+    query_embedding = None
+    collection_stats = None
+    where = _build_where(filters)
+    if cached is None and where and not await _filter_has_matches(vector_store, collection_name, where):
+        async def empty_stream():
+            yield _sse_event("No relevant code found for your query.")
+        return _sse_response(empty_stream())
+
+    if cached is None:
+        # Embed the query while the collection lookup warms up the Chroma connection
+        query_embedding, collection_stats = await asyncio.gather(
+            asyncio.to_thread(embedder.embed_text, query_data.query),
+            asyncio.to_thread(vector_store.get_collection_stats, collection_name)
         )
-
-        # Build filters
-        filters = {}
-        if query_data.language:
-            filters['language'] = query_data.language
-        if query_data.file_path:
-            filters['file_path'] = query_data.file_path
-
-        # Retrieve chunks
-        chunks = retriever.retrieve(
+        cached = query_cache.get_by_embedding(cache_scope, query_embedding)
+    if cached is not None:
+        logger.info("Query cache hit (stream): %s", query_data.query[:100])
+
+        async def cached_stream():
+            yield _sse_event(cached.answer)
+        return _sse_response(cached_stream())
+
+    # Retrieve chunks (skipped if the collection is known to be empty)
+    chunks = []
+    chunk_embeddings = None
+    if collection_stats.get('count', 0) or 'error' in collection_stats:
+        chunks = await asyncio.to_thread(
+            retriever.retrieve_with_embeddings if query_data.use_reranking else retriever.retrieve,
             collection_name=collection_name,
             query=query_data.query,
             n_results=query_data.n_results or 20,
-            filters=filters if filters else None
+            filters=where,
+            query_embedding=query_embedding
         )
-
-        if not chunks:
-            async def error_stream():
-                yield "No relevant code found for your query."
-            return StreamingResponse(error_stream(), media_type="text/plain")
-
-        # Apply reranking
         if query_data.use_reranking:
-            chunks = reranker.mmr_rerank(chunks, lambda_param=0.5, top_k=query_data.n_results or 10)
-
-        # Limit chunks
-        final_chunks = chunks[:query_data.n_results] if query_data.n_results else chunks
+            chunks, chunk_embeddings = chunks
+
+    if not chunks:
+        async def error_stream():
+            yield _sse_event("No relevant code found for your query.")
+        return _sse_response(error_stream())
+
+    # Apply reranking
+    if query_data.use_reranking:
+        chunks = reranker.mmr_rerank(
+            chunks,
+            query_embedding=query_embedding,
+            chunk_embeddings=chunk_embeddings,
+            lambda_param=0.5,
+            top_k=query_data.n_results or 10
+        )
 
-        # Assemble prompt
-        prompt = context_assembler.assemble_prompt(chunks=final_chunks, query=query_data.query)
+    # Limit chunks
+    final_chunks = chunks[:query_data.n_results] if query_data.n_results else chunks
 
-        # Stream LLM response
-        async def generate_stream():
-            try:
-                async for chunk in llm_provider.generate_stream(prompt=prompt, temperature=0.1, max_tokens=2000):
-                    yield chunk
-            except LLMError as e:
-                yield f"\n\n[Error: {str(e)}]"
+    # Assemble prompt
+    prompt = context_assembler.assemble_prompt(chunks=final_chunks, query=query_data.query)
 
-        return StreamingResponse(generate_stream(), media_type="text/plain")
+    # Stream LLM response
+    async def generate_stream():
+        try:
+            tokens = llm_provider.generate_stream(prompt=prompt, temperature=0.1, max_tokens=2000)
+            async for chunk in _coalesce_stream(tokens):
+                yield _sse_event(chunk)
+        except LLMError as e:
+            yield _sse_event(f"\n\n[Error: {str(e)}]")
 
-    except Exception as e:
-        logger.error(f"Streaming query failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    return _sse_response(generate_stream())
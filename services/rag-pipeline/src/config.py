@@ -1,9 +1,10 @@
 """Configuration management for RAG pipeline."""
 
 import os
+from functools import cached_property
 from typing import Optional
 from pydantic import BaseModel
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class ChromaDBConfig(BaseModel):
@@ -52,9 +53,14 @@ class Settings(BaseSettings):
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     openai_api_key: Optional[str] = None
     openai_embedding_model: str = "text-embedding-3-large"
+    # OpenAI embedding throughput; set the limits to your account's tier (0 = unlimited)
+    openai_embedding_max_concurrency: int = 8
+    openai_embedding_tokens_per_minute: int = 1_000_000
+    openai_embedding_requests_per_minute: int = 3_000
 
     # Database settings
     metadata_db_path: str = "/app/data/metadata/repos.db"
+    embedding_cache_path: str = "/app/data/metadata/embeddings.db"
 
     # Logging
     log_level: str = "INFO"
@@ -63,11 +69,11 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8001
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
-    @property
+    # Sub-configs are built on first access; settings are not mutated at runtime
+
+    @cached_property
     def chromadb_config(self) -> ChromaDBConfig:
         """Get ChromaDB configuration."""
         return ChromaDBConfig(
@@ -75,7 +81,7 @@ class Settings(BaseSettings):
             port=self.chroma_port
         )
 
-    @property
+    @cached_property
     def llm_config(self) -> LLMConfig:
         """Get LLM configuration."""
         return LLMConfig(
@@ -85,7 +91,7 @@ class Settings(BaseSettings):
             ollama_model=self.ollama_model
         )
 
-    @property
+    @cached_property
     def embedding_config(self) -> EmbeddingConfig:
         """Get embedding configuration."""
         return EmbeddingConfig(
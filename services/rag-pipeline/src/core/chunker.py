@@ -1,11 +1,52 @@
 """Chunking strategies for code and text."""
 
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 import logging
+import math
+import re
+
+from .tokens import get_encoding
 
 logger = logging.getLogger(__name__)
 
+# Complexity markers and their weights. 'elif ' also contains 'if ', so it
+# carries both weights; the scan is a single pass over the chunk.
+_COMPLEXITY_WEIGHTS = {
+    'if ': 2,
+    'elif ': 4,
+    'else:': 1,
+    'for ': 3,
+    'while ': 3,
+    'try:': 2,
+    'except ': 2,
+    'lambda ': 2,
+    'yield ': 2,
+}
+_COMPLEXITY_RE = re.compile(r'(?:el)?if |else:|for |while |try:|except |lambda |yield ')
+
+# Line shapes that make good split points
+_BEST_SPLIT_SCORE = 10
+_COMMENT_PREFIXES = ('#', '//', '/*')
+_CLOSERS = frozenset({'}', ')', ']'})
+_CLOSER_PREFIXES = ('return', '}')
+
+_NEWLINE_RE = re.compile('\n')
+
+# Markdown header line; group 1 is the text after the leading '#'s
+_MD_HEADER_RE = re.compile(r'\s*#+(.*)', re.DOTALL)
+
+# File admission rules for should_index_file()
+_BINARY_EXTENSIONS = frozenset({
+    '.pyc', '.pyo', '.so', '.dylib', '.dll', '.exe',
+    '.jpg', '.jpeg', '.png', '.gif', '.ico', '.pdf',
+    '.zip', '.tar', '.gz', '.bz2', '.xz',
+    '.db', '.sqlite', '.sqlite3'
+})
+_ALLOWED_HIDDEN_FILES = frozenset({'.gitignore', '.env.example'})
+_SKIP_DIRS = frozenset({'node_modules', '__pycache__', '.git', '.venv', 'venv', 'env', 'dist', 'build'})
+
 
 class CodeChunker:
     """Chunk code and text for embedding."""
@@ -14,7 +55,7 @@ class CodeChunker:
         """Initialize chunker.
 
         Args:
-            max_chunk_size: Maximum chunk size in tokens (approximate with chars/4)
+            max_chunk_size: Maximum chunk size in tokens (chars/4 without tiktoken)
             overlap: Overlap size in tokens for fixed-size chunks
         """
         self.max_chunk_size = max_chunk_size
@@ -22,6 +63,66 @@ class CodeChunker:
         self.max_chars = max_chunk_size * 4  # Rough estimate: 1 token ≈ 4 chars
         self.overlap_chars = overlap * 4
 
+    @property
+    def _encoding(self):
+        """BPE used for token counts, loaded on first use (None without tiktoken)."""
+        return get_encoding()
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Exact BPE token count, or chars/4 without tiktoken
+        """
+        if self._encoding is None:
+            return len(text) // 4
+        return len(self._encoding.encode_ordinary(text))
+
+    def _char_budget(self, text: str, token_count: int) -> Tuple[float, float]:
+        """Convert the token limits to character budgets for a text.
+
+        Splitting stays line based, so the token limits are scaled by the
+        text's own chars-per-token ratio.
+
+        Args:
+            text: Text being split
+            token_count: Token count of text
+
+        Returns:
+            Tuple of (max chars per chunk, overlap chars)
+        """
+        if self._encoding is None or token_count == 0:
+            return self.max_chars, self.overlap_chars
+
+        chars_per_token = len(text) / token_count
+        return self.max_chunk_size * chars_per_token, self.overlap * chars_per_token
+
+    def _window_params(self, text: str, num_lines: int, token_count: int) -> Tuple[int, int]:
+        """Work out line-based window sizes for splitting a text.
+
+        Args:
+            text: Text being split
+            num_lines: Number of lines in text
+            token_count: Token count of text
+
+        Returns:
+            Tuple of (lines per window, overlap lines); the window is at
+            least one line and the overlap always leaves it room to advance
+        """
+        max_chars, overlap_chars = self._char_budget(text, token_count)
+
+        # Mostly blank text averages under a character per line; treat it
+        # as one so the window doesn't balloon
+        avg_line_length = max(len(text) / max(num_lines, 1), 1.0)
+
+        # Very long lines (minified or generated files) still get one line
+        lines_per_chunk = max(int(max_chars / avg_line_length), 1)
+        overlap_lines = min(int(overlap_chars / avg_line_length), lines_per_chunk - 1)
+        return lines_per_chunk, overlap_lines
+
     def chunk_code(self, parsed_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Chunk parsed code, splitting large chunks if necessary.
 
@@ -31,22 +132,27 @@ class CodeChunker:
         Returns:
             List of processed chunks (may include sub-chunks)
         """
-        processed_chunks = []
+        return list(self.iter_chunks(parsed_chunks))
 
+    def iter_chunks(self, parsed_chunks: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield processed chunks one at a time, splitting large chunks.
+
+        Args:
+            parsed_chunks: Parsed code chunks from parser
+
+        Yields:
+            Finalized chunks (may include sub-chunks)
+        """
         for chunk in parsed_chunks:
-            code = chunk['code']
-            code_length = len(code)
+            token_count = self.count_tokens(chunk['code'])
 
             # If chunk is small enough, keep as-is
-            if code_length <= self.max_chars:
-                processed_chunks.append(self._finalize_chunk(chunk))
+            if token_count <= self.max_chunk_size:
+                yield self._finalize_chunk(chunk, token_count)
             else:
                 # Split large chunks with overlap
-                logger.debug(f"Splitting large chunk: {chunk['name']} ({code_length} chars)")
-                sub_chunks = self._split_with_overlap(chunk)
-                processed_chunks.extend(sub_chunks)
-
-        return processed_chunks
+                logger.debug(f"Splitting large chunk: {chunk['name']} ({token_count} tokens)")
+                yield from self._split_with_overlap(chunk, token_count)
 
     def chunk_text(self, content: str, file_path: Path) -> List[Dict[str, Any]]:
         """Chunk plain text files (markdown, documentation, etc.).
@@ -58,22 +164,34 @@ class CodeChunker:
         Returns:
             List of text chunks
         """
-        chunks = []
+        return [self._finalize_chunk(chunk) for chunk in self.iter_text_sections(content, file_path)]
+
+    def iter_text_sections(self, content: str, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield raw sections of a plain text file one at a time.
+
+        Sections are not finalized; pass them to iter_chunks(), which
+        finalizes (and if needed splits) each one exactly once.
+
+        Args:
+            content: Text content
+            file_path: File path
 
+        Yields:
+            Text sections
+        """
         # For markdown, try to split by sections (headers)
         if file_path.suffix.lower() in ['.md', '.markdown']:
-            chunks = self._chunk_markdown(content, file_path)
-        else:
-            # Generic text chunking with overlap
-            chunks = self._chunk_generic_text(content, file_path)
+            return self._iter_markdown_sections(content, file_path)
 
-        return chunks
+        # Generic text chunking with overlap
+        return self._iter_generic_text_sections(content, file_path)
 
-    def _split_with_overlap(self, chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _split_with_overlap(self, chunk: Dict[str, Any], token_count: int) -> List[Dict[str, Any]]:
         """Smart splitting at logical boundaries (empty lines, comments, block endings).
 
         Args:
             chunk: Original chunk
+            token_count: Token count of the chunk's code
 
         Returns:
             List of sub-chunks
@@ -81,36 +199,45 @@ class CodeChunker:
         code = chunk['code']
         lines = code.split('\n')
         sub_chunks = []
+        lines_per_chunk, overlap_lines = self._window_params(code, len(lines), token_count)
 
-        # Calculate lines per chunk (approximate)
-        avg_line_length = len(code) / len(lines) if lines else 100
-        lines_per_chunk = int(self.max_chars / avg_line_length) if avg_line_length > 0 else 50
+        # Spread the lines evenly over the fewest parts that fit, instead of
+        # filling parts greedily and leaving a short tail
+        num_parts = math.ceil(len(lines) / lines_per_chunk)
+        part_lines = math.ceil(len(lines) / num_parts)
 
         # Find logical split points
-        split_points = self._find_split_points(lines, lines_per_chunk)
+        split_points = self._find_split_points(lines, part_lines)
+
+        # Fields shared by every part are set once; each part copies this
+        # base and only fills in its own position
+        base = chunk.copy()
+        base['is_partial'] = True
+        base['parent_chunk'] = chunk['name']
+
+        # Preserve signature in split chunks
+        if 'signature' in chunk:
+            base['parent_signature'] = chunk['signature']
+
+        name = chunk['name']
+        start_line = chunk['start_line']
+        # Overlap only uses the room left in each part's window, so parts
+        # never grow past the budget
+        overlap_lines = min(overlap_lines, lines_per_chunk - part_lines)
 
         prev_end = 0
         for idx, split_point in enumerate(split_points, 1):
             # Add overlap from previous chunk
-            overlap_start = max(0, prev_end - int(self.overlap_chars / avg_line_length))
+            overlap_start = max(0, prev_end - overlap_lines)
             chunk_lines = lines[overlap_start:split_point]
 
-            sub_code = '\n'.join(chunk_lines)
-            sub_chunk = chunk.copy()
-            sub_chunk['code'] = sub_code
-            sub_chunk['name'] = f"{chunk['name']}_part{idx}"
-            sub_chunk['start_line'] = chunk['start_line'] + overlap_start
-            sub_chunk['end_line'] = chunk['start_line'] + split_point - 1
+            sub_chunk = base.copy()
+            sub_chunk['code'] = '\n'.join(chunk_lines)
+            sub_chunk['name'] = f"{name}_part{idx}"
+            sub_chunk['start_line'] = start_line + overlap_start
+            sub_chunk['end_line'] = start_line + split_point - 1
             sub_chunk['line_count'] = len(chunk_lines)
-            sub_chunk['is_partial'] = True
             sub_chunk['part_number'] = idx
-            sub_chunk['parent_chunk'] = chunk['name']
-
-            # Preserve signature in split chunks
-            if 'signature' in chunk:
-                sub_chunk['parent_signature'] = chunk['signature']
-            if 'docstring' in chunk and idx == 1:
-                sub_chunk['docstring'] = chunk['docstring']
 
             sub_chunks.append(self._finalize_chunk(sub_chunk))
             prev_end = split_point
@@ -129,23 +256,38 @@ class CodeChunker:
         """
         split_points = []
         current_pos = 0
+        num_lines = len(lines)
+        score_split_point = self._score_split_point
+
+        # Very long lines (minified or generated files) can give a target of
+        # zero lines; every split must still move forward
+        target_chunk_size = max(target_chunk_size, 1)
+
+        while current_pos < num_lines:
+            # The remaining lines fit in one part
+            if num_lines - current_pos <= target_chunk_size:
+                split_points.append(num_lines)
+                break
 
-        while current_pos < len(lines):
-            target_pos = min(current_pos + target_chunk_size, len(lines))
+            target_pos = current_pos + target_chunk_size
 
             # Search for best split point within a window around target position
             window = 10
-            search_start = max(current_pos + target_chunk_size - window, current_pos)
-            search_end = min(target_pos + window, len(lines))
+            search_start = max(current_pos + target_chunk_size - window, current_pos + 1)
+            search_end = min(target_pos + window, num_lines)
 
+            # A regular line is no better than the target itself
             best_split = target_pos
-            best_score = 0
+            best_score = 1
 
             for i in range(search_start, search_end):
-                score = self._score_split_point(lines, i)
+                score = score_split_point(lines, i)
                 if score > best_score:
                     best_score = score
                     best_split = i
+                    # An empty line is the best possible split
+                    if score == _BEST_SPLIT_SCORE:
+                        break
 
             split_points.append(best_split)
             current_pos = best_split
@@ -165,54 +307,59 @@ class CodeChunker:
         if idx >= len(lines):
             return 0
 
-        line = lines[idx].strip()
+        raw = lines[idx]
+        unindented = raw.lstrip()
+        line = unindented.rstrip()
 
         # Empty line - perfect split
         if not line:
-            return 10
+            return _BEST_SPLIT_SCORE
 
         # Comment - good split
-        if line.startswith('#') or line.startswith('//') or line.startswith('/*'):
+        if line.startswith(_COMMENT_PREFIXES):
             return 8
 
         # Check for dedent (block boundary)
         if idx + 1 < len(lines):
-            current_indent = len(lines[idx]) - len(lines[idx].lstrip())
-            next_indent = len(lines[idx + 1]) - len(lines[idx + 1].lstrip())
-            if next_indent < current_indent:
+            current_indent = len(raw) - len(unindented)
+            next_line = lines[idx + 1]
+            if len(next_line) - len(next_line.lstrip()) < current_indent:
                 return 7
 
         # Closing brace/bracket/return
-        if line in ['}', ')', ']'] or line.startswith('return') or line.startswith('}'):
+        if line in _CLOSERS or line.startswith(_CLOSER_PREFIXES):
             return 6
 
         # Regular line
         return 1
 
-    def _chunk_markdown(self, content: str, file_path: Path) -> List[Dict[str, Any]]:
-        """Chunk markdown content by sections (headers).
+    def _iter_markdown_sections(self, content: str, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield markdown content by sections (headers).
 
         Args:
             content: Markdown content
             file_path: File path
 
-        Returns:
-            List of markdown chunks
+        Yields:
+            Markdown chunks (not finalized)
         """
-        chunks = []
         lines = content.split('\n')
+        max_chars, _ = self._char_budget(content, self.count_tokens(content))
         current_section = []
+        # Length of '\n'.join(current_section) plus one, kept incrementally
+        current_len = 0
         section_header = None
         start_line = 1
 
         for i, line in enumerate(lines, 1):
             # Detect markdown headers (# Header)
-            if line.strip().startswith('#'):
+            header = _MD_HEADER_RE.match(line)
+            if header:
                 # Save previous section
                 if current_section:
                     section_text = '\n'.join(current_section)
-                    if len(section_text.strip()) > 0:
-                        chunks.append({
+                    if section_text and not section_text.isspace():
+                        yield {
                             'code': section_text,
                             'chunk_type': 'section',
                             'name': section_header or 'intro',
@@ -221,19 +368,21 @@ class CodeChunker:
                             'start_line': start_line,
                             'end_line': i - 1,
                             'line_count': len(current_section)
-                        })
+                        }
 
                 # Start new section
-                section_header = line.strip().lstrip('#').strip()
+                section_header = header.group(1).strip()
                 current_section = [line]
+                current_len = len(line) + 1
                 start_line = i
             else:
                 current_section.append(line)
+                current_len += len(line) + 1
 
             # Split if section gets too large
-            if len('\n'.join(current_section)) > self.max_chars and current_section:
+            if current_len - 1 > max_chars and current_section:
                 section_text = '\n'.join(current_section)
-                chunks.append({
+                yield {
                     'code': section_text,
                     'chunk_type': 'section',
                     'name': section_header or 'content',
@@ -242,15 +391,16 @@ class CodeChunker:
                     'start_line': start_line,
                     'end_line': i,
                     'line_count': len(current_section)
-                })
+                }
                 current_section = []
+                current_len = 0
                 start_line = i + 1
 
         # Add final section
         if current_section:
             section_text = '\n'.join(current_section)
-            if len(section_text.strip()) > 0:
-                chunks.append({
+            if section_text and not section_text.isspace():
+                yield {
                     'code': section_text,
                     'chunk_type': 'section',
                     'name': section_header or 'content',
@@ -259,56 +409,55 @@ class CodeChunker:
                     'start_line': start_line,
                     'end_line': len(lines),
                     'line_count': len(current_section)
-                })
-
-        return [self._finalize_chunk(chunk) for chunk in chunks]
+                }
 
-    def _chunk_generic_text(self, content: str, file_path: Path) -> List[Dict[str, Any]]:
-        """Chunk generic text with fixed-size and overlap.
+    def _iter_generic_text_sections(self, content: str, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield generic text in fixed-size parts with overlap.
 
         Args:
             content: Text content
             file_path: File path
 
-        Returns:
-            List of text chunks
+        Yields:
+            Text chunks (not finalized)
         """
-        chunks = []
-        lines = content.split('\n')
-
-        # Estimate lines per chunk
-        avg_line_length = len(content) / len(lines) if lines else 100
-        lines_per_chunk = int(self.max_chars / avg_line_length) if avg_line_length > 0 else 50
-        overlap_lines = int(self.overlap_chars / avg_line_length) if avg_line_length > 0 else 5
-
-        i = 0
-        part_num = 1
-        while i < len(lines):
-            end_idx = min(i + lines_per_chunk, len(lines))
-            chunk_lines = lines[i:end_idx]
-            chunk_text = '\n'.join(chunk_lines)
-
-            chunks.append({
-                'code': chunk_text,
+        # Line i starts at line_starts[i]; the sentinel puts one past the
+        # end of content, so every line ends at line_starts[i + 1] - 1 and
+        # chunks are sliced straight from content
+        line_starts = [0]
+        line_starts.extend(match.end() for match in _NEWLINE_RE.finditer(content))
+        num_lines = len(line_starts)
+        line_starts.append(len(content) + 1)
+
+        lines_per_chunk, overlap_lines = self._window_params(
+            content, num_lines, self.count_tokens(content)
+        )
+        step = lines_per_chunk - overlap_lines
+
+        path_str = str(file_path)
+        stem = file_path.stem
+
+        # Windows start every `step` lines; only the last one is clipped
+        for part_num, i in enumerate(range(0, num_lines, step), 1):
+            end_idx = min(i + lines_per_chunk, num_lines)
+
+            yield {
+                'code': content[line_starts[i]:line_starts[end_idx] - 1],
                 'chunk_type': 'text',
-                'name': f"{file_path.stem}_part{part_num}",
-                'file_path': str(file_path),
+                'name': f"{stem}_part{part_num}",
+                'file_path': path_str,
                 'language': 'text',
                 'start_line': i + 1,
                 'end_line': end_idx,
-                'line_count': len(chunk_lines)
-            })
-
-            i += lines_per_chunk - overlap_lines
-            part_num += 1
+                'line_count': end_idx - i
+            }
 
-        return [self._finalize_chunk(chunk) for chunk in chunks]
-
-    def _finalize_chunk(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+    def _finalize_chunk(self, chunk: Dict[str, Any], token_count: Optional[int] = None) -> Dict[str, Any]:
         """Finalize chunk by adding computed fields and complexity metrics (Phase 2).
 
         Args:
             chunk: Chunk dictionary
+            token_count: Token count of the chunk's code, if already known
 
         Returns:
             Finalized chunk with additional metadata
@@ -317,34 +466,26 @@ class CodeChunker:
 
         # Existing metrics
         chunk['char_count'] = len(code)
-        chunk['token_count_estimate'] = chunk['char_count'] // 4
+        chunk['token_count_estimate'] = (
+            token_count if token_count is not None else self.count_tokens(code)
+        )
         chunk['preview'] = code[:100] + '...' if len(code) > 100 else code
 
         # Phase 2: Complexity estimation
-        lines = [l for l in code.split('\n') if l.strip() and not l.strip().startswith('#')]
-
-        # Base complexity: lines of code
-        complexity = len(lines)
-
-        # Conditionals add complexity
-        complexity += code.count('if ') * 2
-        complexity += code.count('elif ') * 2
-        complexity += code.count('else:') * 1
-
-        # Loops add significant complexity
-        complexity += code.count('for ') * 3
-        complexity += code.count('while ') * 3
-
-        # Error handling adds complexity
-        complexity += code.count('try:') * 2
-        complexity += code.count('except ') * 2
-
-        # Function calls and complexity indicators
-        complexity += code.count('lambda ') * 2
-        complexity += code.count('yield ') * 2
+        loc = 0
+        for line in code.split('\n'):
+            stripped = line.strip()
+            if stripped and not stripped.startswith('#'):
+                loc += 1
+
+        # Base complexity: lines of code, plus weighted conditionals, loops,
+        # error handling and other complexity indicators
+        complexity = loc
+        for match in _COMPLEXITY_RE.finditer(code):
+            complexity += _COMPLEXITY_WEIGHTS[match.group()]
 
         chunk['complexity_estimate'] = min(complexity, 1000)  # Cap at 1000
-        chunk['loc'] = len(lines)  # Lines of code (non-comment, non-blank)
+        chunk['loc'] = loc  # Lines of code (non-comment, non-blank)
 
         # Phase 2: Function classification (if it's a function chunk)
         if chunk.get('chunk_type') == 'function':
@@ -367,24 +508,49 @@ class CodeChunker:
         Returns:
             True if file should be indexed
         """
-        # Skip binary files
-        binary_extensions = {
-            '.pyc', '.pyo', '.so', '.dylib', '.dll', '.exe',
-            '.jpg', '.jpeg', '.png', '.gif', '.ico', '.pdf',
-            '.zip', '.tar', '.gz', '.bz2', '.xz',
-            '.db', '.sqlite', '.sqlite3'
-        }
-
-        if file_path.suffix.lower() in binary_extensions:
+        name = file_path.name
+
+        # Skip binary files; like Path.suffix, a leading dot is not an
+        # extension, and names without one skip the lookup entirely
+        dot = name.rfind('.')
+        if dot > 0 and name[dot:].lower() in _BINARY_EXTENSIONS:
             return False
 
         # Skip hidden files (except .gitignore, etc.)
-        if file_path.name.startswith('.') and file_path.name not in {'.gitignore', '.env.example'}:
+        if name.startswith('.') and name not in _ALLOWED_HIDDEN_FILES:
             return False
 
         # Skip common non-code directories
-        skip_dirs = {'node_modules', '__pycache__', '.git', '.venv', 'venv', 'env', 'dist', 'build'}
-        if any(part in skip_dirs for part in file_path.parts):
-            return False
+        return name not in _SKIP_DIRS and not _dir_is_skipped(file_path.parent)
+
+
+@lru_cache(maxsize=4096)
+def _dir_is_skipped(directory: Path) -> bool:
+    """Check whether a directory lies inside a skipped directory.
+
+    Files of one directory share the answer, so it is cached per directory.
+
+    Args:
+        directory: Directory path
+
+    Returns:
+        True if any component of the path is a skipped directory name
+    """
+    return not _SKIP_DIRS.isdisjoint(directory.parts)
+
+
+@lru_cache(maxsize=8)
+def get_chunker(max_chunk_size: int = 1000, overlap: int = 50) -> CodeChunker:
+    """Get the shared chunker for a configuration.
+
+    CodeChunker holds no per-run state, so one instance per
+    (max_chunk_size, overlap) is reused across indexing runs.
+
+    Args:
+        max_chunk_size: Maximum chunk size in tokens
+        overlap: Overlap size in tokens for fixed-size chunks
 
-        return True
+    Returns:
+        CodeChunker instance
+    """
+    return CodeChunker(max_chunk_size, overlap)
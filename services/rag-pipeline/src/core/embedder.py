@@ -1,18 +1,121 @@
 """Embedding generation using OpenAI."""
 
+import base64
 import logging
 import os
+import re
+import threading
 import time
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
 from pathlib import Path
 from abc import ABC, abstractmethod
 import numpy as np
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
 import hashlib
-import pickle
+
+from ..db.embedding_cache import EmbeddingCache
+from .tokens import count_tokens, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Trailing whitespace on each line (what str.rstrip() removes, minus '\n')
+_TRAILING_WS_RE = re.compile(r'[^\S\n]+(?=\n|\Z)')
+
+
+def _decode_embedding(encoded: str) -> np.ndarray:
+    """Decode a base64 embedding from the OpenAI API.
+
+    With encoding_format="base64" the API sends raw little-endian float32
+    bytes, so decoding is one copy instead of boxing thousands of floats.
+
+    Args:
+        encoded: Base64 string from the response
+
+    Returns:
+        Read-only float32 embedding vector
+    """
+    return np.frombuffer(base64.b64decode(encoded), dtype='<f4')
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server-requested wait from a rate limit error.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Seconds from the retry-after-ms or retry-after header (delay in
+        seconds or an HTTP date), or None
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+    except (TypeError, ValueError):
+        pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        pass
+
+    # HTTP-date form, e.g. "Wed, 21 Oct 2026 07:28:00 GMT"
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Thread-safe token bucket enforcing a per-minute budget.
+
+    The bucket holds up to one minute of budget and refills continuously,
+    so short bursts are allowed while the average rate stays under the limit.
+    """
+
+    def __init__(self, per_minute: int):
+        """Initialize the bucket, full.
+
+        Args:
+            per_minute: Budget replenished per minute
+        """
+        self.capacity = float(per_minute)
+        self._rate = self.capacity / 60.0
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        """Block until amount can be taken from the bucket, then take it.
+
+        Args:
+            amount: Budget to consume (capped at the bucket capacity)
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._available = min(self.capacity, self._available + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._available >= amount:
+                    self._available -= amount
+                    return
+                wait = (amount - self._available) / self._rate
+            time.sleep(wait)
+
 
 class BaseEmbedder(ABC):
     """Abstract base class for embedders."""
@@ -33,7 +136,7 @@ class BaseEmbedder(ABC):
     def embed_batch(
         self,
         texts: List[str],
-        batch_size: int = 32,
+        batch_size: int = 2048,
         show_progress: bool = True
     ) -> np.ndarray:
         """Generate embeddings for a batch of texts.
@@ -60,7 +163,7 @@ class BaseEmbedder(ABC):
     def embed_code_chunks(
         self,
         chunks: List[dict],
-        batch_size: int = 32
+        batch_size: int = 2048
     ) -> List[np.ndarray]:
         """Generate embeddings for code chunks.
 
@@ -75,9 +178,7 @@ class BaseEmbedder(ABC):
         code_texts = [chunk.get('code', '') for chunk in chunks]
 
         # Generate embeddings
-        embeddings = self.embed_batch(code_texts, batch_size=batch_size)
-
-        return embeddings
+        return self.embed_batch(code_texts, batch_size=batch_size)
 
     def compute_similarity(
         self,
@@ -104,6 +205,56 @@ class BaseEmbedder(ABC):
         similarity = np.dot(embedding1, embedding2) / (norm1 * norm2)
         return float(similarity)
 
+    def compute_similarities(
+        self,
+        query_embedding: np.ndarray,
+        embeddings: np.ndarray
+    ) -> np.ndarray:
+        """Compute cosine similarity between a query and many embeddings.
+
+        Args:
+            query_embedding: Query embedding (dim,)
+            embeddings: Embeddings to score (n x dim)
+
+        Returns:
+            Array of similarity scores (n,); zero vectors score 0
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+
+        # One matrix-vector product instead of a similarity call per pair
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        dots = matrix @ query
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def cosine_topk(
+        self,
+        query_embedding: np.ndarray,
+        embeddings: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k embeddings most similar to a query.
+
+        Args:
+            query_embedding: Query embedding (dim,)
+            embeddings: Embeddings to search (n x dim)
+            k: Number of results
+
+        Returns:
+            Tuple of (indices, scores), best match first
+        """
+        scores = self.compute_similarities(query_embedding, embeddings)
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+
+        # Partial selection, then sort only the k survivors
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        order = top[np.argsort(-scores[top], kind='stable')]
+        return order, scores[order]
+
 
 # LocalEmbedder class removed - using OpenAI embeddings only
 # If you need local embeddings, add sentence-transformers to requirements.txt
@@ -112,12 +263,28 @@ class BaseEmbedder(ABC):
 class OpenAIEmbedder(BaseEmbedder):
     """Generate embeddings using OpenAI API."""
 
+    # Per-request limits of the embeddings endpoint; the token budget keeps
+    # a margin below the 300k API cap for estimated counts
+    MAX_BATCH_INPUTS = 2048
+    MAX_BATCH_TOKENS = 290_000
+    # Per-input limit of the embedding models
+    MAX_INPUT_TOKENS = 8191
+
+    # Rate-limited (429) requests get more attempts than other errors, and
+    # backoff without a Retry-After header is capped at this many seconds
+    MAX_RATE_LIMIT_RETRIES = 8
+    MAX_BACKOFF_SECONDS = 60
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: str = "text-embedding-3-large",
-        batch_size: int = 100,
-        max_retries: int = 3
+        batch_size: int = 2048,
+        max_retries: int = 3,
+        max_concurrency: int = 8,
+        tokens_per_minute: int = 1_000_000,
+        requests_per_minute: int = 3_000,
+        cache: Optional[EmbeddingCache] = None
     ):
         """Initialize the OpenAI embedder.
 
@@ -126,6 +293,10 @@ class OpenAIEmbedder(BaseEmbedder):
             model: OpenAI embedding model name
             batch_size: Batch size for API requests (OpenAI allows up to 2048)
             max_retries: Maximum number of retries for failed requests
+            max_concurrency: Maximum number of batch requests in flight at once
+            tokens_per_minute: Token budget per minute across all requests (0 = unlimited)
+            requests_per_minute: Request budget per minute (0 = unlimited)
+            cache: Persistent embedding cache (None = always call the API)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -134,9 +305,21 @@ class OpenAIEmbedder(BaseEmbedder):
         self.model_name = model
         self.batch_size = batch_size
         self.max_retries = max_retries
-
-        # Initialize OpenAI client
-        self.client = OpenAI(api_key=self.api_key)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.cache = cache
+
+        # Rate limiting shared by all worker threads; after a 429 every
+        # request waits until _resume_at (time.monotonic())
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._resume_at = 0.0
+        self._resume_lock = threading.Lock()
+
+        # OpenAI client, created on first API call
+        self._client: Optional[OpenAI] = None
+        self._client_lock = threading.Lock()
 
         # Set dimension based on model
         if model == "text-embedding-3-large":
@@ -150,6 +333,15 @@ class OpenAIEmbedder(BaseEmbedder):
 
         logger.info(f"Initialized OpenAI embedder with model: {model} ({self._dimension} dimensions)")
 
+    @property
+    def client(self) -> OpenAI:
+        """OpenAI client, built on first use so inspecting an embedder is cheap."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
     def embed_text(self, text: str) -> np.ndarray:
         """Generate embedding for a single text.
 
@@ -157,23 +349,26 @@ class OpenAIEmbedder(BaseEmbedder):
             text: Text to embed
 
         Returns:
-            Numpy array of embeddings
+            Numpy array of embeddings (float32)
         """
         try:
             response = self.client.embeddings.create(
                 input=text,
-                model=self.model_name
+                model=self.model_name,
+                encoding_format="base64"
             )
-            embedding = np.array(response.data[0].embedding)
-            return embedding
+            embedding = _decode_embedding(response.data[0].embedding)
         except Exception as e:
             logger.error(f"Failed to generate OpenAI embedding: {e}")
             raise
 
+        self._set_dimension(embedding.shape[0])
+        return embedding
+
     def embed_batch(
         self,
         texts: List[str],
-        batch_size: int = 32,
+        batch_size: int = 2048,
         show_progress: bool = True
     ) -> np.ndarray:
         """Generate embeddings for a batch of texts.
@@ -186,41 +381,232 @@ class OpenAIEmbedder(BaseEmbedder):
         Returns:
             Numpy array of embeddings (n_texts x embedding_dim)
         """
-        embeddings = []
-        batch_size = min(batch_size, self.batch_size)
+        if not texts:
+            return np.empty((0, self._dimension), dtype=np.float32)
+
+        # Only distinct texts without a cached embedding for this model go
+        # to the API; repeats (license headers, generated code) reuse them
+        if self.cache is None:
+            keys = texts
+            cached = {}
+        else:
+            keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+            cached = self.cache.get_many(keys)
 
-        logger.info(f"Generating OpenAI embeddings for {len(texts)} texts in batches of {batch_size}")
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        if self.cache is not None:
+            logger.info(f"Embedding cache: {len(texts) - len(missing)} of {len(texts)} texts cached")
 
+        if missing:
+            fresh = self._embed_uncached(list(missing.values()), batch_size, show_progress)
+            new_items = list(zip(missing.keys(), fresh))
+            if self.cache is not None:
+                self.cache.put_many(new_items)
+            cached.update(new_items)
+
+        return np.array([cached[key] for key in keys], dtype=np.float32)
+
+    def _embed_uncached(
+        self,
+        texts: List[str],
+        batch_size: int,
+        show_progress: bool
+    ) -> np.ndarray:
+        """Generate embeddings through the API, one request per batch.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Batch size for encoding (will be capped to self.batch_size)
+            show_progress: Whether to show progress (logged)
+
+        Returns:
+            Numpy array of embeddings (n_texts x embedding_dim)
+        """
+        batches = self._pack_batches(texts, min(batch_size, self.batch_size, self.MAX_BATCH_INPUTS))
+
+        logger.info(f"Generating OpenAI embeddings for {len(texts)} texts in {len(batches)} batches")
+
+        if not texts:
+            return np.empty((0, self._dimension), dtype=np.float32)
+
+        # The result is allocated when the first response arrives, sized by
+        # the dimension the model actually returns; each batch then decodes
+        # straight into its own rows
+        embeddings = None
+        embeddings_lock = threading.Lock()
+
+        def rows_for(offset: int, count: int, dimension: int) -> np.ndarray:
+            nonlocal embeddings
+            with embeddings_lock:
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+                    self._set_dimension(dimension)
+            return embeddings[offset:offset + count]
+
+        jobs = []
+        offset = 0
+        for number, (batch, tokens) in enumerate(batches, 1):
+            jobs.append((number, batch, tokens, offset))
+            offset += len(batch)
+
+        def embed(job):
+            number, batch, tokens, offset = job
             if show_progress:
-                logger.info(f"Processing batch {i // batch_size + 1}/{(len(texts) + batch_size - 1) // batch_size}")
-
-            # Retry logic with exponential backoff
-            for attempt in range(self.max_retries):
-                try:
-                    response = self.client.embeddings.create(
-                        input=batch,
-                        model=self.model_name
-                    )
-
-                    # Extract embeddings from response
-                    batch_embeddings = [np.array(data.embedding) for data in response.data]
-                    embeddings.extend(batch_embeddings)
-                    break  # Success, exit retry loop
-
-                except Exception as e:
-                    if attempt == self.max_retries - 1:
-                        logger.error(f"Failed to generate embeddings after {self.max_retries} attempts: {e}")
-                        raise
-                    else:
-                        wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                        logger.warning(f"Retry {attempt + 1}/{self.max_retries} after error: {e}. Waiting {wait_time}s...")
-                        time.sleep(wait_time)
+                logger.info(f"Processing batch {number}/{len(batches)}")
+            self._embed_one_batch(batch, tokens, lambda dimension: rows_for(offset, len(batch), dimension))
+
+        # Requests are I/O bound, so batches are sent concurrently
+        workers = min(self.max_concurrency, len(jobs))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(embed, jobs))
+        else:
+            for job in jobs:
+                embed(job)
 
         logger.info(f"Generated {len(embeddings)} OpenAI embeddings")
-        return np.array(embeddings)
+        return embeddings
+
+    def _pack_batches(self, texts: List[str], max_inputs: int) -> List[Tuple[List[str], int]]:
+        """Split texts into consecutive API batches.
+
+        A batch is closed when it reaches max_inputs texts or the next text
+        would push it over MAX_BATCH_TOKENS, so requests are as large as the
+        endpoint allows. Texts over MAX_INPUT_TOKENS (e.g. chunks of minified
+        code, which the chunker cannot split below one line) are truncated,
+        since a single oversized input makes the API reject its whole batch.
+
+        Args:
+            texts: Texts to embed, in order
+            max_inputs: Maximum number of texts per batch
+
+        Returns:
+            List of (batch texts, token count) preserving input order; texts
+            may be truncated
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+
+        for text in texts:
+            tokens = count_tokens(text)
+            if tokens > self.MAX_INPUT_TOKENS:
+                logger.warning(
+                    f"Truncating embedding input of {tokens} tokens to {self.MAX_INPUT_TOKENS}"
+                )
+                text = truncate_to_tokens(text, self.MAX_INPUT_TOKENS)
+                tokens = self.MAX_INPUT_TOKENS
+            if current and (len(current) >= max_inputs or current_tokens + tokens > self.MAX_BATCH_TOKENS):
+                batches.append((current, current_tokens))
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+
+        if current:
+            batches.append((current, current_tokens))
+
+        return batches
+
+    def _wait_for_rate_limit(self, tokens: int):
+        """Block until a request of this size fits the rate limits.
+
+        Args:
+            tokens: Token count of the request
+        """
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if self._request_bucket is not None:
+            self._request_bucket.acquire(1)
+        if self._token_bucket is not None:
+            self._token_bucket.acquire(tokens)
+
+    def _pause_requests(self, seconds: float):
+        """Hold back every worker after the API reported a rate limit.
+
+        Args:
+            seconds: How long to wait before the next request
+        """
+        with self._resume_lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def _embed_one_batch(
+        self,
+        batch: List[str],
+        tokens: int,
+        rows_for: Callable[[int], np.ndarray]
+    ):
+        """Embed one API batch, retrying with exponential backoff.
+
+        Rate limit errors wait for the Retry-After the API sends, pausing
+        all workers, and get MAX_RATE_LIMIT_RETRIES attempts; other errors
+        get max_retries.
+
+        Args:
+            batch: Texts for a single API request
+            tokens: Token count of the batch, charged to the token budget
+            rows_for: Called with the returned embedding dimension; gives the
+                rows (len(batch) x dimension) to write the embeddings into
+
+        Raises:
+            ValueError: If the API returns vectors of differing dimensions
+        """
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit(tokens)
+            try:
+                response = self.client.embeddings.create(
+                    input=batch,
+                    model=self.model_name,
+                    encoding_format="base64"
+                )
+                break
+
+            except Exception as e:
+                rate_limited = isinstance(e, RateLimitError)
+                max_attempts = self.MAX_RATE_LIMIT_RETRIES if rate_limited else self.max_retries
+                attempt += 1
+                if attempt >= max_attempts:
+                    logger.error(f"Failed to generate embeddings after {attempt} attempts: {e}")
+                    raise
+
+                wait_time = _retry_after_seconds(e) if rate_limited else None
+                if wait_time is None:
+                    # Exponential backoff: 1s, 2s, 4s, ...
+                    wait_time = min(2 ** (attempt - 1), self.MAX_BACKOFF_SECONDS)
+                if rate_limited:
+                    self._pause_requests(wait_time)
+                logger.warning(f"Retry {attempt}/{max_attempts - 1} after error: {e}. Waiting {wait_time}s...")
+                time.sleep(wait_time)
+
+        # Extract embeddings from response
+        vectors = [_decode_embedding(data.embedding) for data in response.data]
+        out = rows_for(vectors[0].shape[0])
+        for row, embedding in zip(out, vectors):
+            if embedding.shape[0] != out.shape[1]:
+                raise ValueError(
+                    f"Model {self.model_name} returned {embedding.shape[0]}-dimensional "
+                    f"embeddings, expected {out.shape[1]}"
+                )
+            row[:] = embedding
+
+    def _set_dimension(self, dimension: int):
+        """Record the embedding dimension the API actually returned.
+
+        Args:
+            dimension: Length of the returned vectors
+        """
+        if dimension != self._dimension:
+            logger.info(
+                f"Model {self.model_name} returns {dimension}-dimensional embeddings "
+                f"(expected {self._dimension}); using {dimension}"
+            )
+            self._dimension = dimension
 
     def get_embedding_dimension(self) -> int:
         """Get the embedding dimension.
@@ -241,13 +627,19 @@ class OpenAIEmbedder(BaseEmbedder):
             'model_name': self.model_name,
             'embedding_dimension': self._dimension,
             'batch_size': self.batch_size,
-            'max_retries': self.max_retries
+            'max_retries': self.max_retries,
+            'max_concurrency': self.max_concurrency,
+            'tokens_per_minute': self.tokens_per_minute,
+            'requests_per_minute': self.requests_per_minute
         }
 
 
 def create_embedder(
     provider: str = "openai",
     model_name: Optional[str] = None,
+    max_concurrency: int = 8,
+    tokens_per_minute: int = 1_000_000,
+    requests_per_minute: int = 3_000,
     **kwargs
 ) -> BaseEmbedder:
     """Factory function to create an embedder based on provider.
@@ -255,6 +647,9 @@ def create_embedder(
     Args:
         provider: Only 'openai' is supported
         model_name: Model name (optional, uses defaults)
+        max_concurrency: Maximum number of batch requests in flight at once
+        tokens_per_minute: Token budget per minute (0 = unlimited)
+        requests_per_minute: Request budget per minute (0 = unlimited)
         **kwargs: Additional arguments for embedder
 
     Returns:
@@ -269,6 +664,9 @@ def create_embedder(
         default_model = "text-embedding-3-large"
         return OpenAIEmbedder(
             model=model_name or default_model,
+            max_concurrency=max_concurrency,
+            tokens_per_minute=tokens_per_minute,
+            requests_per_minute=requests_per_minute,
             **kwargs
         )
     else:
@@ -284,13 +682,13 @@ def get_cache_key(text: str) -> str:
         text: Text to hash
 
     Returns:
-        MD5 hash of the text
+        SHA-256 hash of the text
     """
-    return hashlib.md5(text.encode('utf-8')).hexdigest()
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 
 def save_embeddings(embeddings: np.ndarray, file_path: str) -> bool:
-    """Save embeddings to disk.
+    """Save embeddings to disk in .npy format (float16).
 
     Args:
         embeddings: Numpy array of embeddings
@@ -302,8 +700,9 @@ def save_embeddings(embeddings: np.ndarray, file_path: str) -> bool:
     try:
         Path(file_path).parent.mkdir(parents=True, exist_ok=True)
 
+        # Write through a file object so np.save keeps file_path as given
         with open(file_path, 'wb') as f:
-            pickle.dump(embeddings, f)
+            np.save(f, np.asarray(embeddings, dtype=np.float16))
 
         logger.info(f"Saved embeddings to {file_path}")
         return True
@@ -316,15 +715,16 @@ def save_embeddings(embeddings: np.ndarray, file_path: str) -> bool:
 def load_embeddings(file_path: str) -> Optional[np.ndarray]:
     """Load embeddings from disk.
 
+    The file is memory-mapped read-only, so rows are read on access.
+
     Args:
-        file_path: Path to embeddings file
+        file_path: Path to .npy embeddings file
 
     Returns:
         Numpy array of embeddings or None if failed
     """
     try:
-        with open(file_path, 'rb') as f:
-            embeddings = pickle.load(f)
+        embeddings = np.load(file_path, mmap_mode='r')
 
         logger.info(f"Loaded embeddings from {file_path}")
         return embeddings
@@ -344,10 +744,8 @@ def preprocess_code(code: str, max_length: int = 512) -> str:
     Returns:
         Preprocessed code
     """
-    # Remove excessive whitespace
-    lines = code.split('\n')
-    lines = [line.rstrip() for line in lines]
-    code = '\n'.join(lines)
+    # Remove trailing whitespace from every line in one C-level pass
+    code = _TRAILING_WS_RE.sub('', code)
 
     # Truncate if too long (rough estimate: 1 token ≈ 4 chars)
     max_chars = max_length * 4
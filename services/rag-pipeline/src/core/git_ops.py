@@ -1,17 +1,95 @@
 """Git operations for repository management."""
 
 import git
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from datetime import datetime
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Commit timestamps are reported as UTC ISO-8601 strings, formatted from
+# the epoch seconds without building datetime objects
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _format_timestamp(epoch_seconds: int) -> str:
+    """Format a Unix timestamp as a UTC ISO-8601 string.
+
+    Args:
+        epoch_seconds: Seconds since the epoch
+
+    Returns:
+        Timestamp such as "2024-01-31T12:00:00Z"
+    """
+    return time.strftime(_ISO_FORMAT, time.gmtime(epoch_seconds))
+
+
+def _parse_log_output(output: str) -> List[Dict[str, Any]]:
+    """Parse `git log --numstat -z` output written with GitOperations._LOG_FORMAT.
+
+    Args:
+        output: Raw log output
+
+    Returns:
+        List of commit data dicts, in log order
+    """
+    commits = []
+    for record in output.split("\x1e")[1:]:
+        hexsha, author, email, timestamp, message, numstat = record.split("\x1f", 5)
+        commits.append({
+            "hash": hexsha,
+            "short_hash": hexsha[:8],
+            "message": message.strip(),
+            "author": author,
+            "author_email": email,
+            "committed_at": _format_timestamp(int(timestamp)),
+            # Each "added\tdeleted\tpath" entry is one changed file
+            "files_changed": sum(1 for entry in numstat.split("\0") if "\t" in entry)
+        })
+
+    return commits
+
+
+def _parse_status_output(output: str) -> Dict[str, List[str]]:
+    """Parse `git status --porcelain=v2 -z` output.
+
+    Args:
+        output: Raw status output
+
+    Returns:
+        Dict with 'modified' (staged or unstaged changes, renames and copies
+        under their new path), 'untracked' and 'unmerged' path lists;
+        ignored entries are skipped
+    """
+    status = {'modified': [], 'untracked': [], 'unmerged': []}
+    records = iter(output.split("\0"))
+    for record in records:
+        kind = record[:1]
+        if kind == "1":
+            # 1 XY sub mH mI mW hH hI path
+            status['modified'].append(record.split(" ", 8)[8])
+        elif kind == "2":
+            # 2 XY sub mH mI mW hH hI Xscore path, then original path
+            status['modified'].append(record.split(" ", 9)[9])
+            next(records, None)
+        elif kind == "u":
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            status['unmerged'].append(record.split(" ", 10)[10])
+        elif kind == "?":
+            status['untracked'].append(record[2:])
+
+    return status
+
 
 class GitOperations:
     """Handle Git operations for repository indexing."""
 
+    # Seconds a parsed `git status` result is reused
+    STATUS_CACHE_TTL = 2.0
+
     def __init__(self, repo_path: str):
         """Initialize Git operations.
 
@@ -23,6 +101,10 @@ class GitOperations:
         """
         self.repo_path = Path(repo_path).resolve()
         self.repo = git.Repo(self.repo_path)
+        # (HEAD hexsha, commit count) from the last get_commit_count() call
+        self._commit_count_cache: Optional[tuple] = None
+        # (monotonic time, status dict) from the last _get_status() call
+        self._status_cache: Optional[tuple] = None
         logger.info(f"Initialized Git operations for {self.repo_path}")
 
     def is_valid_repo(self) -> bool:
@@ -60,6 +142,38 @@ class GitOperations:
             logger.warning("No commits found in repository")
             return None
 
+    # One record per commit: fields split by \x1f, records by \x1e; the
+    # --numstat -z entries follow the last field
+    _LOG_FORMAT = "%x1e%H%x1f%an%x1f%ae%x1f%ct%x1f%B%x1f"
+
+    def _log_commits(self, *rev_args: str, max_count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read commit metadata and changed-file counts with one git log call.
+
+        Replaces per-commit ``commit.stats`` lookups, each of which runs its
+        own git diff. Like ``commit.stats``, merges are diffed against their
+        first parent and renames count as a delete plus an add.
+
+        Args:
+            *rev_args: Revision arguments for git log (e.g. "abc..HEAD")
+            max_count: Maximum number of commits to retrieve
+
+        Returns:
+            List of commit data dicts, newest first
+        """
+        args = [
+            f"--pretty=format:{self._LOG_FORMAT}",
+            "--numstat",
+            "-z",
+            "--no-renames",
+            "--diff-merges=first-parent",
+        ]
+        if max_count is not None:
+            args.append(f"--max-count={max_count}")
+        args.extend(rev_args)
+
+        output = self.repo.git.log(*args)
+        return _parse_log_output(output)
+
     def get_commit_history(self, max_count: int = 100) -> List[Dict[str, Any]]:
         """Get commit history.
 
@@ -69,22 +183,11 @@ class GitOperations:
         Returns:
             List of commit data dicts
         """
-        commits = []
         try:
-            for commit in self.repo.iter_commits(max_count=max_count):
-                commits.append({
-                    "hash": commit.hexsha,
-                    "short_hash": commit.hexsha[:8],
-                    "message": commit.message.strip(),
-                    "author": commit.author.name,
-                    "author_email": commit.author.email,
-                    "committed_at": datetime.fromtimestamp(commit.committed_date),
-                    "files_changed": len(commit.stats.files)
-                })
+            return self._log_commits(max_count=max_count)
         except Exception as e:
             logger.error(f"Error retrieving commit history: {e}")
-
-        return commits
+            return []
 
     def get_commits_since(self, since_hash: str) -> List[Dict[str, Any]]:
         """Get commits since a specific commit.
@@ -95,22 +198,32 @@ class GitOperations:
         Returns:
             List of commit data dicts
         """
-        commits = []
         try:
-            for commit in self.repo.iter_commits(f"{since_hash}..HEAD"):
-                commits.append({
-                    "hash": commit.hexsha,
-                    "short_hash": commit.hexsha[:8],
-                    "message": commit.message.strip(),
-                    "author": commit.author.name,
-                    "author_email": commit.author.email,
-                    "committed_at": datetime.fromtimestamp(commit.committed_date),
-                    "files_changed": len(commit.stats.files)
-                })
+            return self._log_commits(f"{since_hash}..HEAD")
         except Exception as e:
             logger.error(f"Error retrieving commits since {since_hash}: {e}")
+            return []
+
+    def get_commit_count(self) -> int:
+        """Count commits reachable from HEAD.
+
+        Uses ``git rev-list --count``, which reads the commit graph without
+        creating Python Commit objects, and remembers the result until HEAD
+        moves.
 
-        return commits
+        Returns:
+            Number of commits (0 for an empty repository)
+        """
+        latest_commit = self.get_latest_commit()
+        if latest_commit is None:
+            return 0
+
+        head = latest_commit.hexsha
+        if self._commit_count_cache is None or self._commit_count_cache[0] != head:
+            count = int(self.repo.git.rev_list(head, count=True))
+            self._commit_count_cache = (head, count)
+
+        return self._commit_count_cache[1]
 
     def get_changed_files(self, commit_hash: str) -> List[str]:
         """Get list of files changed in a commit.
@@ -150,6 +263,36 @@ class GitOperations:
             logger.warning(f"Could not read file {file_path}: {e}")
             return None
 
+    def read_working_tree_files(self, paths: List[str], max_workers: Optional[int] = None) -> Dict[str, bytes]:
+        """Read many working tree files concurrently.
+
+        Reads release the GIL, so a thread pool overlaps the open/read
+        syscalls of a large batch instead of waiting on each file in turn.
+
+        Args:
+            paths: File paths, relative to the repository root or absolute
+            max_workers: Reader threads (defaults to 4 per CPU)
+
+        Returns:
+            Mapping of each readable path to its bytes (unreadable paths are
+            logged and omitted)
+        """
+        def read(path: str) -> Optional[bytes]:
+            try:
+                return (self.repo_path / path).read_bytes()
+            except OSError as e:
+                logger.error(f"Failed to read file {path}: {e}")
+                return None
+
+        if len(paths) < 2:
+            results = [read(path) for path in paths]
+        else:
+            workers = max_workers or (os.cpu_count() or 1) * 4
+            with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+                results = list(pool.map(read, paths))
+
+        return {path: data for path, data in zip(paths, results) if data is not None}
+
     def get_tracked_files(self, extensions: Optional[List[str]] = None) -> List[Path]:
         """Get list of tracked files in the repository.
 
@@ -161,47 +304,83 @@ class GitOperations:
         """
         files = []
         try:
-            # Get all tracked files from the index
-            for item in self.repo.head.commit.tree.traverse():
-                if item.type == 'blob':  # It's a file
-                    file_path = Path(item.path)
-
-                    # Filter by extension if specified
-                    if extensions:
-                        if file_path.suffix.lower() in extensions:
-                            files.append(file_path)
-                    else:
-                        files.append(file_path)
+            # One ls-tree call lists every entry of the HEAD tree without
+            # building a GitPython object per file; -z output is
+            # "<mode> <type> <object>\t<path>" records split by NUL
+            output = self.repo.git.ls_tree("-r", "-z", "HEAD")
+            suffixes = frozenset(extensions) if extensions else None
+
+            for entry in output.split("\0"):
+                meta, _, path = entry.partition("\t")
+                if not path or meta.split(" ", 2)[1] != "blob":  # Skip submodules
+                    continue
+
+                # Filter by extension if specified; like Path.suffix, a
+                # leading dot is not an extension
+                if suffixes is not None:
+                    name = path[path.rfind("/") + 1:]
+                    dot = name.rfind(".")
+                    if dot <= 0 or name[dot:].lower() not in suffixes:
+                        continue
+
+                files.append(Path(path))
 
         except Exception as e:
             logger.error(f"Error getting tracked files: {e}")
 
         return files
 
-    def get_untracked_changes(self) -> List[str]:
+    def _parse_porcelain_v2(self) -> Dict[str, List[str]]:
+        """Read working tree status with one `git status --porcelain=v2 -z` call.
+
+        Returns:
+            Status dict from _parse_status_output()
+        """
+        output = self.repo.git.status("--porcelain=v2", "-z", "--untracked-files=all")
+        return _parse_status_output(output)
+
+    def _get_status(self, refresh: bool = False) -> Dict[str, List[str]]:
+        """Get working tree status, reusing a result younger than STATUS_CACHE_TTL.
+
+        Args:
+            refresh: Run `git status` even if a cached result is fresh
+
+        Returns:
+            Status dict from _parse_porcelain_v2()
+        """
+        now = time.monotonic()
+        if (refresh or self._status_cache is None
+                or now - self._status_cache[0] > self.STATUS_CACHE_TTL):
+            self._status_cache = (now, self._parse_porcelain_v2())
+        return self._status_cache[1]
+
+    def get_untracked_changes(self, refresh: bool = False) -> List[str]:
         """Get list of untracked files.
 
+        Args:
+            refresh: Bypass the short-lived status cache
+
         Returns:
             List of untracked file paths
         """
         try:
-            return self.repo.untracked_files
+            return list(self._get_status(refresh)['untracked'])
         except Exception as e:
             logger.error(f"Error getting untracked files: {e}")
             return []
 
-    def get_modified_files(self) -> List[str]:
+    def get_modified_files(self, refresh: bool = False) -> List[str]:
         """Get list of modified but not committed files.
 
+        Args:
+            refresh: Bypass the short-lived status cache
+
         Returns:
-            List of modified file paths
+            List of modified file paths (staged, unstaged and unmerged)
         """
         try:
-            # Get modified files (both staged and unstaged)
-            modified = [item.a_path for item in self.repo.index.diff(None)]
-            # Add staged files
-            staged = [item.a_path for item in self.repo.index.diff("HEAD")]
-            return list(set(modified + staged))
+            status = self._get_status(refresh)
+            return list(dict.fromkeys(status['modified'] + status['unmerged']))
         except Exception as e:
             logger.error(f"Error getting modified files: {e}")
             return []
@@ -221,12 +400,12 @@ class GitOperations:
             return {
                 "path": str(self.repo_path),
                 "branch": self.get_current_branch(),
-                "total_commits": len(list(self.repo.iter_commits(max_count=10000))),
+                "total_commits": self.get_commit_count(),
                 "latest_commit": {
                     "hash": latest_commit.hexsha if latest_commit else None,
                     "message": latest_commit.message.strip() if latest_commit else None,
                     "author": latest_commit.author.name if latest_commit else None,
-                    "date": datetime.fromtimestamp(latest_commit.committed_date) if latest_commit else None,
+                    "date": _format_timestamp(latest_commit.committed_date) if latest_commit else None,
                 } if latest_commit else None,
                 "total_files": len(tracked_files),
                 "modified_files": len(modified_files),
@@ -2,12 +2,93 @@
 
 import tree_sitter
 from tree_sitter import Language, Parser
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
+import multiprocessing
+import os
+import re
 
 logger = logging.getLogger(__name__)
 
+# Python def/class line: a newline, optional whitespace, then "def " or
+# "class " followed by more than whitespace (the lines that
+# str.strip().startswith() selected). The leading literal newline lets the
+# regex engine skip ahead between candidates; scan '\n' + content so the
+# first line matches too, and match.start() is then the line's offset
+# in content.
+_PY_DEFN_RE = re.compile(r'\n[^\S\n]*(def|class) (?![^\S\n]*(?:\n|\Z))')
+
+# JavaScript chunk triggers, matching the per-line checks on the stripped
+# line: "=>" or "function " anywhere, "class " at the start of the line.
+# A token's trailing space must not be trailing whitespace of its line.
+# Each pattern starts with a literal so the regex engine can skip ahead
+# between candidates; a "class" match includes the preceding newline, so
+# scanning '\n' + content puts it at its line's offset in content.
+_JS_ANYWHERE_RES = (
+    re.compile(r'=>'),
+    re.compile(r'function (?![^\S\n]*(?:\n|\Z))'),
+)
+_JS_CLASS_RE = re.compile(r'\n[^\S\n]*class (?![^\S\n]*(?:\n|\Z))')
+
+# Import lines per language: the lines whose stripped text starts with
+# "import ", "from " (Python) or "require(" (JavaScript/TypeScript).
+# Scanned over '\n' + code, so a match starts at its line's offset in code.
+_JS_IMPORT_RE = re.compile(r'\n[^\S\n]*(?:import (?![^\S\n]*(?:\n|\Z))|require\()')
+_IMPORT_LINE_RES = {
+    'python': re.compile(r'\n[^\S\n]*(?:import|from) (?![^\S\n]*(?:\n|\Z))'),
+    'javascript': _JS_IMPORT_RE,
+    'typescript': _JS_IMPORT_RE,
+}
+
+# Parsers owned by a pool worker process, keyed by extract_imports
+_worker_parsers: Dict[bool, "CodeParser"] = {}
+
+
+def _parse_one(item: Tuple[Path, str, bool]) -> List[Dict[str, Any]]:
+    """Parse one file inside a pool worker.
+
+    Module-level so it pickles without a CodeParser instance.
+
+    Args:
+        item: (file path, file content, extract_imports) tuple
+
+    Returns:
+        Parsed chunks for the file
+    """
+    file_path, content, extract_imports = item
+    parser = _worker_parsers.get(extract_imports)
+    if parser is None:
+        parser = _worker_parsers[extract_imports] = CodeParser(extract_imports=extract_imports)
+    return parser.parse_file(file_path, content)
+
+
+@lru_cache(maxsize=None)
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Get the process pool shared by all parse_files() calls.
+
+    Workers come from a forkserver rather than being forked from the
+    multi-threaded API process, where another thread may hold a lock
+    (logging, HTTP clients) that the child would inherit locked. Workers
+    start on first use and live until shutdown_parse_pool().
+
+    Returns:
+        Shared ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context('forkserver')
+    )
+
+
+def shutdown_parse_pool():
+    """Stop the shared parse pool's workers, if the pool was created."""
+    if get_parse_pool.cache_info().currsize:
+        get_parse_pool().shutdown(wait=True, cancel_futures=True)
+        get_parse_pool.cache_clear()
+
 
 class CodeParser:
     """Parse code files using tree-sitter to extract semantic chunks."""
@@ -29,13 +110,24 @@ class CodeParser:
         '.hpp': 'cpp',
     }
 
-    def __init__(self):
+    # Below this many files, sending contents to the workers and chunks
+    # back costs more than parsing in-process saves
+    PARALLEL_MIN_FILES = 64
+    PARALLEL_CHUNKSIZE = 32
+
+    def __init__(self, extract_imports: bool = True):
         """Initialize code parser.
 
         Note: For initial implementation, we'll use a simplified approach.
         Full tree-sitter integration requires building language libraries.
+
+        Args:
+            extract_imports: Add the import lines of each chunk as
+                chunk['imports']; disable to skip that per-chunk scan when
+                the metadata is not stored
         """
         self.parsers = {}
+        self.extract_imports = extract_imports
         logger.info("Code parser initialized")
 
     def detect_language(self, file_path: Path) -> Optional[str]:
@@ -71,10 +163,29 @@ class CodeParser:
         if language == 'python':
             return self._parse_python_simple(content, file_path)
         elif language in ['javascript', 'typescript']:
-            return self._parse_javascript_simple(content, file_path)
+            return self._parse_javascript_simple(content, file_path, language)
         else:
             return self._parse_generic(content, file_path, language)
 
+    def parse_files(self, items: List[Tuple[Path, str]]) -> List[List[Dict[str, Any]]]:
+        """Parse many files, across CPU cores when the batch is large enough.
+
+        Parsing is pure Python string work, so the shared process pool
+        from get_parse_pool() sidesteps the GIL. Small batches are parsed
+        in-process.
+
+        Args:
+            items: (file path, file content) tuples
+
+        Returns:
+            Parsed chunks per file, in input order
+        """
+        if len(items) < self.PARALLEL_MIN_FILES or (os.cpu_count() or 1) < 2:
+            return [self.parse_file(file_path, content) for file_path, content in items]
+
+        jobs = [(file_path, content, self.extract_imports) for file_path, content in items]
+        return list(get_parse_pool().map(_parse_one, jobs, chunksize=self.PARALLEL_CHUNKSIZE))
+
     def _parse_python_simple(self, content: str, file_path: Path) -> List[Dict[str, Any]]:
         """Simple Python parser (line-based) with enhanced metadata extraction.
 
@@ -88,130 +199,163 @@ class CodeParser:
             List of code chunks
         """
         chunks = []
-        lines = content.split('\n')
-        current_chunk = []
         chunk_type = None
         chunk_name = None
         chunk_signature = None
         chunk_decorators = []
         chunk_docstring = None
+        chunk_start = None
         start_line = 0
-
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-
-            # Detect function or class definitions
-            if stripped.startswith('def ') or stripped.startswith('class '):
-                # Save previous chunk if exists
-                if current_chunk:
-                    chunks.append(self._create_chunk(
-                        '\n'.join(current_chunk),
-                        chunk_type or 'code',
-                        chunk_name or 'unknown',
-                        file_path,
-                        start_line,
-                        i - 1,
-                        signature=chunk_signature,
-                        decorators=chunk_decorators,
-                        docstring=chunk_docstring
-                    ))
-
-                # Extract signature info for new chunk
-                sig_info = self._extract_function_signature(lines, i - 1)
-
-                # Start new chunk
-                current_chunk = [line]
-                start_line = i
-                chunk_decorators = sig_info['decorators']
-                chunk_signature = sig_info['signature']
-                chunk_docstring = sig_info['docstring']
-
-                if stripped.startswith('def '):
-                    chunk_type = 'function'
-                    chunk_name = stripped.split('(')[0].replace('def ', '').strip()
-                else:
-                    chunk_type = 'class'
-                    chunk_name = stripped.split('(')[0].replace('class ', '').replace(':', '').strip()
-            elif current_chunk:
-                current_chunk.append(line)
+        line_no = 1
+        pos = 0
+
+        # Jump between definition lines with one regex scan; code before
+        # the first definition is not part of any chunk
+        for match in _PY_DEFN_RE.finditer('\n' + content):
+            line_start = match.start()
+            line_no += content.count('\n', pos, line_start)
+            pos = line_start
+
+            # Save previous chunk if exists
+            if chunk_start is not None:
+                chunks.append(self._create_chunk(
+                    content[chunk_start:line_start - 1],
+                    chunk_type or 'code',
+                    chunk_name or 'unknown',
+                    file_path,
+                    start_line,
+                    line_no - 1,
+                    signature=chunk_signature,
+                    decorators=chunk_decorators,
+                    docstring=chunk_docstring,
+                    language='python'
+                ))
+
+            # Extract signature info for new chunk
+            sig_info = self._extract_function_signature(content, line_start)
+
+            # Start new chunk
+            chunk_start = line_start
+            start_line = line_no
+            chunk_decorators = sig_info['decorators']
+            chunk_signature = sig_info['signature']
+            chunk_docstring = sig_info['docstring']
+
+            line_end = content.find('\n', line_start)
+            stripped = content[line_start:line_end if line_end != -1 else len(content)].strip()
+            if match.group(1) == 'def':
+                chunk_type = 'function'
+                chunk_name = stripped.split('(')[0].replace('def ', '').strip()
+            else:
+                chunk_type = 'class'
+                chunk_name = stripped.split('(')[0].replace('class ', '').replace(':', '').strip()
 
         # Add final chunk
-        if current_chunk:
+        if chunk_start is not None:
             chunks.append(self._create_chunk(
-                '\n'.join(current_chunk),
+                content[chunk_start:],
                 chunk_type or 'code',
                 chunk_name or 'unknown',
                 file_path,
                 start_line,
-                len(lines),
+                content.count('\n') + 1,
                 signature=chunk_signature,
                 decorators=chunk_decorators,
-                docstring=chunk_docstring
+                docstring=chunk_docstring,
+                language='python'
             ))
 
         return chunks
 
-    def _parse_javascript_simple(self, content: str, file_path: Path) -> List[Dict[str, Any]]:
+    def _parse_javascript_simple(self, content: str, file_path: Path,
+                                 language: str = 'javascript') -> List[Dict[str, Any]]:
         """Simple JavaScript/TypeScript parser (line-based).
 
         Args:
             content: JavaScript/TypeScript code
             file_path: File path
+            language: 'javascript' or 'typescript'
 
         Returns:
             List of code chunks
         """
         chunks = []
-        lines = content.split('\n')
-        current_chunk = []
+        num_lines = content.count('\n') + 1
         chunk_type = None
         chunk_name = None
         start_line = 0
+
+        # Chunks begin at the first non-blank line; blank leading lines
+        # carry no braces, so brace depth is a running count over content
+        first_content = len(content) - len(content.lstrip())
+        if first_content == len(content):
+            return chunks
+        chunk_start = content.rfind('\n', 0, first_content) + 1
+
+        # Start offsets of the lines holding a trigger token
+        trigger_lines = {match.start() for match in _JS_CLASS_RE.finditer('\n' + content)}
+        for pattern in _JS_ANYWHERE_RES:
+            scanned = 0
+            line_start = 0
+            for match in pattern.finditer(content):
+                # Find line starts incrementally; long minified lines hold
+                # many matches
+                newline = content.rfind('\n', scanned, match.start())
+                if newline != -1:
+                    line_start = newline + 1
+                scanned = match.start()
+                trigger_lines.add(line_start)
+
+        line_no = 1
+        pos = 0
         brace_count = 0
 
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
+        for line_start in sorted(trigger_lines):
+            line_end = content.find('\n', line_start)
+            stripped = content[line_start:line_end if line_end != -1 else len(content)].strip()
+
+            line_no += content.count('\n', pos, line_start)
+            brace_count += content.count('{', pos, line_start) - content.count('}', pos, line_start)
+            pos = line_start
 
-            # Detect function definitions
-            if 'function ' in stripped or '=>' in stripped or stripped.startswith('class '):
-                if current_chunk and brace_count == 0:
+            if line_start > first_content:
+                if brace_count == 0:
                     # Save previous chunk
                     chunks.append(self._create_chunk(
-                        '\n'.join(current_chunk),
+                        content[chunk_start:line_start - 1],
                         chunk_type or 'code',
                         chunk_name or 'unknown',
                         file_path,
                         start_line,
-                        i - 1
+                        line_no - 1,
+                        language=language
                     ))
-                    current_chunk = []
-
-                start_line = i if not current_chunk else start_line
-                if 'function' in stripped:
-                    chunk_type = 'function'
-                    # Extract function name
-                    if 'function ' in stripped:
-                        chunk_name = stripped.split('function ')[1].split('(')[0].strip()
-                    else:
-                        chunk_name = stripped.split('=')[0].strip()
-                elif 'class ' in stripped:
-                    chunk_type = 'class'
-                    chunk_name = stripped.split('class ')[1].split('{')[0].strip()
-
-            if current_chunk or stripped:
-                current_chunk.append(line)
-                brace_count += stripped.count('{') - stripped.count('}')
+                    chunk_start = line_start
+                    start_line = line_no
+            else:
+                start_line = line_no
+
+            if 'function' in stripped:
+                chunk_type = 'function'
+                # Extract function name
+                if 'function ' in stripped:
+                    chunk_name = stripped.split('function ')[1].split('(')[0].strip()
+                else:
+                    chunk_name = stripped.split('=')[0].strip()
+            elif 'class ' in stripped:
+                chunk_type = 'class'
+                chunk_name = stripped.split('class ')[1].split('{')[0].strip()
 
         # Add final chunk
-        if current_chunk:
-            chunks.append(self._create_chunk(
-                '\n'.join(current_chunk),
-                chunk_type or 'code',
-                chunk_name or 'unknown',
-                file_path,
-                start_line,
-                len(lines)
-            ))
+        chunks.append(self._create_chunk(
+            content[chunk_start:],
+            chunk_type or 'code',
+            chunk_name or 'unknown',
+            file_path,
+            start_line,
+            num_lines,
+            language=language
+        ))
 
         return chunks
 
@@ -232,15 +376,19 @@ class CodeParser:
             file_path.stem,
             file_path,
             1,
-            len(content.split('\n'))
+            content.count('\n') + 1,
+            language=language
         )]
 
-    def _extract_function_signature(self, lines: List[str], start_idx: int) -> Dict[str, str]:
+    def _extract_function_signature(self, content: str, line_start: int) -> Dict[str, str]:
         """Extract complete function signature with decorators and docstring.
 
+        Works on line offsets into content rather than a list of lines, so
+        parsing a file never copies it line by line.
+
         Args:
-            lines: All lines of code
-            start_idx: Index of the function/class definition line (0-based)
+            content: Full file content
+            line_start: Offset of the function/class definition line
 
         Returns:
             Dictionary with signature, decorators, and docstring
@@ -252,42 +400,56 @@ class CodeParser:
         }
 
         # Look backward for decorators (@decorator)
-        i = start_idx - 1
-        while i >= 0 and lines[i].strip().startswith('@'):
-            result['decorators'].insert(0, lines[i].strip())
-            i -= 1
+        pos = line_start
+        while pos > 0:
+            prev_start = content.rfind('\n', 0, pos - 1) + 1
+            stripped = content[prev_start:pos - 1].strip()
+            if not stripped.startswith('@'):
+                break
+            result['decorators'].insert(0, stripped)
+            pos = prev_start
 
         # Get function signature (may span multiple lines for long params)
         sig_lines = []
         paren_count = 0
-        i = start_idx
-        while i < len(lines):
-            line = lines[i]
+        pos = line_start
+        while True:
+            end = content.find('\n', pos)
+            line = content[pos:end] if end != -1 else content[pos:]
             sig_lines.append(line)
             paren_count += line.count('(') - line.count(')')
             if paren_count == 0 and ':' in line:
                 break
-            i += 1
+            if end == -1:
+                break
+            pos = end + 1
         result['signature'] = '\n'.join(sig_lines)
 
-        # Extract docstring (if follows immediately)
-        next_idx = i + 1
-        if next_idx < len(lines):
-            next_line = lines[next_idx].strip()
-            if next_line.startswith('"""') or next_line.startswith("'''"):
-                quote = '"""' if '"""' in next_line else "'''"
-                # Handle single-line and multi-line docstrings
-                if next_line.count(quote) >= 2:
-                    result['docstring'] = next_line.strip(quote).strip()
-                else:
-                    docstring_lines = [next_line.strip(quote)]
-                    i = next_idx + 1
-                    while i < len(lines) and quote not in lines[i]:
-                        docstring_lines.append(lines[i].strip())
-                        i += 1
-                    if i < len(lines):
-                        docstring_lines.append(lines[i].strip(quote))
-                    result['docstring'] = ' '.join(docstring_lines).strip()
+        # Extract docstring (if follows immediately); none if the signature
+        # ends on the last line
+        if end == -1:
+            return result
+
+        next_start = end + 1
+        next_end = content.find('\n', next_start)
+        next_line = (content[next_start:next_end] if next_end != -1 else content[next_start:]).strip()
+        if next_line.startswith('"""') or next_line.startswith("'''"):
+            quote = '"""' if '"""' in next_line else "'''"
+            # Handle single-line and multi-line docstrings
+            if next_line.count(quote) >= 2:
+                result['docstring'] = next_line.strip(quote).strip()
+            else:
+                docstring_lines = [next_line.strip(quote)]
+                pos = next_end + 1 if next_end != -1 else -1
+                while pos != -1:
+                    end = content.find('\n', pos)
+                    line = content[pos:end] if end != -1 else content[pos:]
+                    if quote in line:
+                        docstring_lines.append(line.strip(quote))
+                        break
+                    docstring_lines.append(line.strip())
+                    pos = end + 1 if end != -1 else -1
+                result['docstring'] = ' '.join(docstring_lines).strip()
 
         return result
 
@@ -332,17 +494,14 @@ class CodeParser:
         Returns:
             List of import statements
         """
-        imports = []
-        lines = code.split('\n')
+        pattern = _IMPORT_LINE_RES.get(language)
+        if pattern is None:
+            return []
 
-        for line in lines:
-            stripped = line.strip()
-            if language == 'python':
-                if stripped.startswith('import ') or stripped.startswith('from '):
-                    imports.append(stripped)
-            elif language in ['javascript', 'typescript']:
-                if stripped.startswith('import ') or stripped.startswith('require('):
-                    imports.append(stripped)
+        imports = []
+        for match in pattern.finditer('\n' + code):
+            line_end = code.find('\n', match.start())
+            imports.append(code[match.start():line_end if line_end != -1 else len(code)].strip())
 
         return imports
 
@@ -350,7 +509,8 @@ class CodeParser:
                       file_path: Path, start_line: int, end_line: int,
                       signature: Optional[str] = None,
                       decorators: Optional[List[str]] = None,
-                      docstring: Optional[str] = None) -> Dict[str, Any]:
+                      docstring: Optional[str] = None,
+                      language: Optional[str] = None) -> Dict[str, Any]:
         """Create a code chunk with enhanced metadata (Phase 2).
 
         Args:
@@ -363,11 +523,13 @@ class CodeParser:
             signature: Function/class signature (optional)
             decorators: List of decorators (optional)
             docstring: Docstring content (optional)
+            language: Language of the file (detected from file_path if omitted)
 
         Returns:
             Chunk dictionary with enhanced metadata
         """
-        language = self.detect_language(file_path)
+        if language is None:
+            language = self.detect_language(file_path)
 
         chunk = {
             'code': code,
@@ -397,9 +559,10 @@ class CodeParser:
             chunk['has_docstring'] = True
 
         # Extract imports from chunk
-        imports = self._extract_imports_from_chunk(code, language)
-        if imports:
-            chunk['imports'] = imports
+        if self.extract_imports:
+            imports = self._extract_imports_from_chunk(code, language)
+            if imports:
+                chunk['imports'] = imports
 
         return chunk
 
@@ -413,19 +576,4 @@ class CodeParser:
         Returns:
             List of import statements
         """
-        imports = []
-        lines = content.split('\n')
-
-        if language == 'python':
-            for line in lines:
-                stripped = line.strip()
-                if stripped.startswith('import ') or stripped.startswith('from '):
-                    imports.append(stripped)
-
-        elif language in ['javascript', 'typescript']:
-            for line in lines:
-                stripped = line.strip()
-                if stripped.startswith('import ') or stripped.startswith('require('):
-                    imports.append(stripped)
-
-        return imports
+        return self._extract_imports_from_chunk(content, language)
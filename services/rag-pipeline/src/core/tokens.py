@@ -0,0 +1,64 @@
+"""Token counting for OpenAI models."""
+
+import logging
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# BPE used by the OpenAI embedding models
+TOKEN_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding():
+    """Load the tiktoken BPE once per process.
+
+    Returns:
+        tiktoken Encoding, or None to fall back to chars/4
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception as e:
+        logger.warning(f"Could not load {TOKEN_ENCODING} encoding, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Exact BPE token count, or chars/4 without tiktoken
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode_ordinary(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most max_tokens tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+
+    Returns:
+        Leading part of text within the limit (chars/4 estimate without tiktoken)
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
@@ -1,18 +1,47 @@
 """ChromaDB vector store interface for code embeddings."""
 
 import logging
+import threading
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import chromadb
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
 from chromadb.config import Settings as ChromaSettings
-from chromadb.utils import embedding_functions
 
 logger = logging.getLogger(__name__)
 
 
+class _LazySentenceTransformerFunction(EmbeddingFunction):
+    """SentenceTransformer embedding function that loads its model on first use.
+
+    Chunks and queries normally arrive with pre-computed embeddings, so
+    ChromaDB never calls this and sentence_transformers is never imported.
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._function = None
+        self._lock = threading.Lock()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        if self._function is None:
+            with self._lock:
+                if self._function is None:
+                    from chromadb.utils import embedding_functions
+
+                    logger.info(f"Loading embedding function model: {self.model_name}")
+                    self._function = embedding_functions.SentenceTransformerEmbeddingFunction(
+                        model_name=self.model_name
+                    )
+        return self._function(input)
+
+
 class VectorStore:
     """Interface to ChromaDB for storing and retrieving code embeddings."""
 
+    # Keep-alive pool for the ChromaDB HTTP client (requests defaults to 10)
+    HTTP_POOL_SIZE = 64
+
     def __init__(self, host: str = "chromadb", port: int = 8000, embedding_model: Optional[str] = None):
         """Initialize ChromaDB client.
 
@@ -25,12 +54,18 @@ class VectorStore:
         self.port = port
         self.embedding_model = embedding_model
 
+        # Collection handles by name, so each operation is one HTTP call
+        self._collections: Dict[str, Any] = {}
+        self._collections_lock = threading.Lock()
+
         # Initialize ChromaDB client
         try:
             self.client = chromadb.HttpClient(
                 host=host,
-                port=port
+                port=port,
+                settings=ChromaSettings(anonymized_telemetry=False)
             )
+            self._http_session = self._configure_http_pool(self.HTTP_POOL_SIZE)
             logger.info(f"Connected to ChromaDB at {host}:{port}")
 
             # Test connection
@@ -42,16 +77,60 @@ class VectorStore:
             raise
 
         # Initialize embedding function (optional - for backward compatibility)
-        # When embeddings are pre-computed, this won't be used
+        # When embeddings are pre-computed, its model is never loaded
         self.embedding_function = None
         if embedding_model:
-            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=embedding_model
-            )
-            logger.info(f"Initialized embedding function: {embedding_model}")
+            self.embedding_function = _LazySentenceTransformerFunction(embedding_model)
+            logger.info(f"Initialized embedding function: {embedding_model} (model loads on first use)")
         else:
             logger.info("No embedding function initialized - will use pre-computed embeddings")
 
+    def _configure_http_pool(self, pool_size: int):
+        """Enlarge the keep-alive connection pool of the ChromaDB client.
+
+        chromadb 0.4's HttpClient talks to the server through a private
+        requests.Session whose default pool holds 10 connections, so
+        concurrent queries beyond that reopen TCP connections. Mount a larger
+        adapter on it when the session is reachable.
+
+        Args:
+            pool_size: Maximum pooled connections to the ChromaDB host
+
+        Returns:
+            The client's requests.Session, or None if it isn't accessible
+        """
+        try:
+            from requests.adapters import HTTPAdapter
+
+            session = getattr(getattr(self.client, '_server', None), '_session', None)
+            if session is None or not hasattr(session, 'mount'):
+                logger.debug("ChromaDB client session not accessible; using default pool")
+                return None
+
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            return session
+
+        except Exception as e:
+            logger.debug(f"Could not configure ChromaDB connection pool: {e}")
+            return None
+
+    def close(self):
+        """Close pooled HTTP connections to ChromaDB."""
+        if self._http_session is not None:
+            self._http_session.close()
+            self._http_session = None
+            logger.info("Closed ChromaDB connection pool")
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
     def create_collection(self, collection_name: str, metadata: Optional[Dict[str, Any]] = None) -> Any:
         """Create or get a ChromaDB collection.
 
@@ -62,6 +141,10 @@ class VectorStore:
         Returns:
             ChromaDB collection object
         """
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+
         try:
             # ChromaDB requires non-empty metadata dict, provide default
             collection_metadata = metadata if metadata else {"description": "Code repository collection"}
@@ -71,12 +154,42 @@ class VectorStore:
                 embedding_function=self.embedding_function,
                 metadata=collection_metadata
             )
+            with self._collections_lock:
+                self._collections[collection_name] = collection
             logger.info(f"Created/retrieved collection: {collection_name}")
             return collection
         except Exception as e:
             logger.error(f"Failed to create collection {collection_name}: {e}")
             raise
 
+    def _get_collection(self, collection_name: str) -> Any:
+        """Get an existing collection, reusing the handle after the first lookup.
+
+        Args:
+            collection_name: Name of the collection
+
+        Returns:
+            ChromaDB collection object
+        """
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            collection = self.client.get_collection(
+                name=collection_name,
+                embedding_function=self.embedding_function
+            )
+            with self._collections_lock:
+                self._collections[collection_name] = collection
+        return collection
+
+    def _forget_collection(self, collection_name: str):
+        """Drop a cached collection handle (deleted, or failed an operation).
+
+        Args:
+            collection_name: Name of the collection
+        """
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
+
     def delete_collection(self, collection_name: str) -> bool:
         """Delete a ChromaDB collection.
 
@@ -86,6 +199,7 @@ class VectorStore:
         Returns:
             True if successful
         """
+        self._forget_collection(collection_name)
         try:
             self.client.delete_collection(name=collection_name)
             logger.info(f"Deleted collection: {collection_name}")
@@ -211,6 +325,7 @@ class VectorStore:
 
             except Exception as e:
                 logger.error(f"Failed to add batch to {collection_name}: {e}")
+                self._forget_collection(collection_name)
                 raise
 
         logger.info(f"Successfully added {total_added} chunks to {collection_name}")
@@ -223,7 +338,8 @@ class VectorStore:
         query_embeddings: Optional[List[float]] = None,
         n_results: int = 10,
         where: Optional[Dict[str, Any]] = None,
-        where_document: Optional[Dict[str, Any]] = None
+        where_document: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False
     ) -> Dict[str, Any]:
         """Query a collection for similar code chunks.
 
@@ -234,15 +350,17 @@ class VectorStore:
             n_results: Number of results to return
             where: Metadata filter (e.g., {"language": "python"})
             where_document: Document content filter
+            include_embeddings: Also return the stored chunk embeddings
 
         Returns:
             Dictionary with query results
         """
         try:
-            collection = self.client.get_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function
-            )
+            collection = self._get_collection(collection_name)
+
+            include = ['documents', 'metadatas', 'distances']
+            if include_embeddings:
+                include.append('embeddings')
 
             # Use pre-computed embeddings if provided, otherwise use query_text
             if query_embeddings is not None:
@@ -251,7 +369,7 @@ class VectorStore:
                     n_results=n_results,
                     where=where,
                     where_document=where_document,
-                    include=['documents', 'metadatas', 'distances']
+                    include=include
                 )
             elif query_text is not None:
                 results = collection.query(
@@ -259,7 +377,7 @@ class VectorStore:
                     n_results=n_results,
                     where=where,
                     where_document=where_document,
-                    include=['documents', 'metadatas', 'distances']
+                    include=include
                 )
             else:
                 raise ValueError("Either query_text or query_embeddings must be provided")
@@ -269,8 +387,29 @@ class VectorStore:
 
         except Exception as e:
             logger.error(f"Failed to query collection {collection_name}: {e}")
+            self._forget_collection(collection_name)
             raise
 
+    def has_matches(self, collection_name: str, where: Dict[str, Any]) -> bool:
+        """Check whether any chunk in a collection matches a metadata filter.
+
+        Args:
+            collection_name: Name of the collection
+            where: Metadata filter
+
+        Returns:
+            True if at least one chunk matches (or the check failed)
+        """
+        try:
+            collection = self._get_collection(collection_name)
+            result = collection.get(where=where, limit=1, include=[])
+            return bool(result['ids'])
+
+        except Exception as e:
+            logger.warning(f"Filter match check failed for {collection_name}: {e}")
+            self._forget_collection(collection_name)
+            return True
+
     def get_collection_stats(self, collection_name: str) -> Dict[str, Any]:
         """Get statistics for a collection.
 
@@ -281,10 +420,7 @@ class VectorStore:
             Dictionary with collection statistics
         """
         try:
-            collection = self.client.get_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function
-            )
+            collection = self._get_collection(collection_name)
 
             count = collection.count()
 
@@ -296,6 +432,7 @@ class VectorStore:
 
         except Exception as e:
             logger.error(f"Failed to get stats for {collection_name}: {e}")
+            self._forget_collection(collection_name)
             return {'name': collection_name, 'count': 0, 'error': str(e)}
 
     def update_chunk(
@@ -317,10 +454,7 @@ class VectorStore:
             True if successful
         """
         try:
-            collection = self.client.get_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function
-            )
+            collection = self._get_collection(collection_name)
 
             update_data = {'ids': [chunk_id]}
 
@@ -337,6 +471,7 @@ class VectorStore:
 
         except Exception as e:
             logger.error(f"Failed to update chunk {chunk_id} in {collection_name}: {e}")
+            self._forget_collection(collection_name)
             return False
 
     def delete_chunks(
@@ -356,10 +491,7 @@ class VectorStore:
             True if successful
         """
         try:
-            collection = self.client.get_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function
-            )
+            collection = self._get_collection(collection_name)
 
             if chunk_ids:
                 collection.delete(ids=chunk_ids)
@@ -375,6 +507,7 @@ class VectorStore:
 
         except Exception as e:
             logger.error(f"Failed to delete chunks from {collection_name}: {e}")
+            self._forget_collection(collection_name)
             return False
 
     def list_collections(self) -> List[str]:
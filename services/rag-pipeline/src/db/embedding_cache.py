@@ -0,0 +1,118 @@
+"""Persistent SQLite cache of text embeddings."""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store keyed by (model, SHA-256 of text).
+
+    Embeddings are stored as float16 blobs (half the size of float32, with
+    negligible effect on cosine similarity), so re-indexing unchanged code
+    reuses earlier API results across restarts.
+    """
+
+    # Keep IN (...) lists below SQLite's bound-parameter limit
+    QUERY_BATCH = 500
+
+    def __init__(self, db_path: str = "/app/data/metadata/embeddings.db"):
+        """Initialize embedding cache.
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection shared by embedder worker threads
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key BLOB PRIMARY KEY,
+                    embedding BLOB NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self._conn.commit()
+
+        logger.info(f"Embedding cache initialized at {self.db_path}")
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> bytes:
+        """Build the cache key for a text embedded with a model.
+
+        Args:
+            model_name: Embedding model name
+            text: Embedded text
+
+        Returns:
+            SHA-256 digest of model name and text
+        """
+        return hashlib.sha256(f"{model_name}\0{text}".encode('utf-8')).digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Look up cached embeddings.
+
+        Args:
+            keys: Cache keys from make_key()
+
+        Returns:
+            Mapping of found keys to float32 embeddings (missing keys are omitted)
+        """
+        found = {}
+        unique = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for i in range(0, len(unique), self.QUERY_BATCH):
+                batch = unique[i:i + self.QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+        return found
+
+    def put_many(self, items: List[Tuple[bytes, np.ndarray]]):
+        """Store embeddings.
+
+        Args:
+            items: (key, embedding) pairs
+        """
+        if not items:
+            return
+
+        rows = [
+            (key, np.asarray(embedding, dtype=np.float16).tobytes())
+            for key, embedding in items
+        ]
+
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.error(f"Failed to store embeddings in cache: {e}")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
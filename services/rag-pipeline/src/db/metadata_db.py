@@ -1,6 +1,8 @@
 """SQLite metadata database for multi-repository tracking."""
 
 import sqlite3
+import threading
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +16,10 @@ logger = logging.getLogger(__name__)
 class MetadataDB:
     """Manage SQLite database for repository metadata."""
 
+    # Short-lived cache for get_repository(); writes invalidate it
+    REPO_CACHE_SIZE = 256
+    REPO_CACHE_TTL = 5.0
+
     def __init__(self, db_path: str = "/app/data/metadata/repos.db"):
         """Initialize metadata database.
 
@@ -22,8 +28,22 @@ class MetadataDB:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._repo_cache: Dict[str, tuple] = {}
+        self._repo_cache_lock = threading.Lock()
         self._init_database()
 
+    def _invalidate_repository(self, repo_id: Optional[str] = None):
+        """Drop cached repository rows.
+
+        Args:
+            repo_id: Repository to drop (None = all)
+        """
+        with self._repo_cache_lock:
+            if repo_id is None:
+                self._repo_cache.clear()
+            else:
+                self._repo_cache.pop(repo_id, None)
+
     @contextmanager
     def _get_connection(self):
         """Context manager for database connections."""
@@ -184,11 +204,27 @@ class MetadataDB:
         Returns:
             Repository data dict or None
         """
+        now = time.monotonic()
+        with self._repo_cache_lock:
+            cached = self._repo_cache.get(repo_id)
+            if cached is not None and now - cached[0] < self.REPO_CACHE_TTL:
+                return dict(cached[1])
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM repositories WHERE id = ?", (repo_id,))
             row = cursor.fetchone()
-            return dict(row) if row else None
+            repo = dict(row) if row else None
+
+        if repo is not None:
+            with self._repo_cache_lock:
+                self._repo_cache.pop(repo_id, None)
+                self._repo_cache[repo_id] = (now, repo)
+                if len(self._repo_cache) > self.REPO_CACHE_SIZE:
+                    # Dicts keep insertion order: drop the oldest entry
+                    del self._repo_cache[next(iter(self._repo_cache))]
+            return dict(repo)
+        return None
 
     def get_repository_by_path(self, path: str) -> Optional[Dict[str, Any]]:
         """Get repository by path.
@@ -230,6 +266,7 @@ class MetadataDB:
             # Activate specified
             cursor.execute("UPDATE repositories SET is_active = 1 WHERE id = ?", (repo_id,))
             logger.info(f"Set active repository: {repo_id}")
+        self._invalidate_repository()
 
     def get_active_repository(self) -> Optional[Dict[str, Any]]:
         """Get the currently active repository.
@@ -261,6 +298,7 @@ class MetadataDB:
             cursor = conn.cursor()
             cursor.execute(f"UPDATE repositories SET {set_clause} WHERE id = ?", values)
             logger.debug(f"Updated repository {repo_id}: {fields}")
+        self._invalidate_repository(repo_id)
 
     def update_repository(self, repo_id: str, **kwargs):
         """Update repository fields.
@@ -291,6 +329,7 @@ class MetadataDB:
             cursor = conn.cursor()
             cursor.execute(f"UPDATE repositories SET {set_clause} WHERE id = ?", values)
             logger.debug(f"Updated repository {repo_id}: {kwargs}")
+        self._invalidate_repository(repo_id)
 
     def update_repository_embedding_info(
         self,
@@ -315,6 +354,7 @@ class MetadataDB:
                 WHERE id = ?
             """, (embedding_provider, embedding_model, embedding_dimension, repo_id))
             logger.info(f"Updated embedding info for repository {repo_id}: {embedding_provider}/{embedding_model} ({embedding_dimension}D)")
+        self._invalidate_repository(repo_id)
 
     def delete_repository(self, repo_id: str):
         """Delete a repository and all associated data.
@@ -326,6 +366,7 @@ class MetadataDB:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM repositories WHERE id = ?", (repo_id,))
             logger.info(f"Deleted repository: {repo_id}")
+        self._invalidate_repository(repo_id)
 
     # File tracking methods
     def upsert_file(self, repo_id: str, file_path: str, file_hash: str,
@@ -335,7 +376,7 @@ class MetadataDB:
         Args:
             repo_id: Repository UUID
             file_path: Relative file path
-            file_hash: SHA256 hash of file content
+            file_hash: Hash of file content
             chunk_count: Number of chunks created
             language: Programming language
         """
@@ -370,6 +411,29 @@ class MetadataDB:
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    def get_file_manifest(self, repo_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get content hash and chunk count of all indexed files in one query.
+
+        Args:
+            repo_id: Repository UUID
+
+        Returns:
+            Dictionary mapping file path to {'file_hash', 'chunk_count'}
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT file_path, file_hash, chunk_count FROM indexed_files
+                WHERE repo_id = ?
+            """, (repo_id,))
+            return {
+                row['file_path']: {
+                    'file_hash': row['file_hash'],
+                    'chunk_count': row['chunk_count']
+                }
+                for row in cursor.fetchall()
+            }
+
     def list_files(self, repo_id: str) -> List[Dict[str, Any]]:
         """List all indexed files for a repository.
 
@@ -1,19 +1,28 @@
 """Main indexing orchestration for Git repositories."""
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Set, Tuple
 from pathlib import Path
 import hashlib
 
+try:
+    from blake3 import blake3 as _file_hasher
+except ImportError:
+    _file_hasher = hashlib.blake2b
+
 from ..core.git_ops import GitOperations
 from ..core.parser import CodeParser
-from ..core.chunker import CodeChunker
+from ..core.chunker import CodeChunker, get_chunker
 from ..core.embedder import BaseEmbedder
 from ..core.vector_store import VectorStore
 from ..db.metadata_db import MetadataDB
 
 logger = logging.getLogger(__name__)
 
+# Chunks from consecutive files are embedded and stored together until a
+# batch holds at least this many
+EMBED_BATCH_CHUNKS = 64
+
 
 class RepositoryIndexer:
     """Orchestrates the indexing of Git repositories into ChromaDB."""
@@ -39,7 +48,7 @@ class RepositoryIndexer:
         self.vector_store = vector_store
         self.embedder = embedder
         self.parser = parser or CodeParser()
-        self.chunker = chunker or CodeChunker()
+        self.chunker = chunker or get_chunker()
 
         logger.info("Repository indexer initialized")
 
@@ -47,7 +56,8 @@ class RepositoryIndexer:
         self,
         repo_id: str,
         repo_path: str,
-        force_reindex: bool = False
+        force_reindex: bool = False,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, Any]:
         """Index an entire repository.
 
@@ -55,6 +65,7 @@ class RepositoryIndexer:
             repo_id: Repository UUID
             repo_path: Path to the repository
             force_reindex: If True, reindex all files even if unchanged
+            progress_callback: Optional callback(processed_files, total_files)
 
         Returns:
             Dictionary with indexing results
@@ -90,12 +101,22 @@ class RepositoryIndexer:
             commits = git_ops.get_commit_history(max_count=1)
             latest_commit = commits[0]['hash'] if commits else None
 
+            # Stored content hashes, fetched in one query
+            manifest = {} if force_reindex else self.metadata_db.get_file_manifest(repo_id)
+
             # Process files
             total_chunks = 0
             indexed_files = 0
             skipped_files = 0
+            unchanged_files = 0
+            unchanged_chunks = 0
+            pending = []
+            pending_chunks = 0
+
+            for processed, file_path in enumerate(tracked_files):
+                if progress_callback:
+                    progress_callback(processed, len(tracked_files))
 
-            for file_path in tracked_files:
                 # Convert to absolute path
                 absolute_file_path = Path(repo_path) / file_path
 
@@ -104,40 +125,49 @@ class RepositoryIndexer:
                     skipped_files += 1
                     continue
 
-                # Check if file has changed (unless force_reindex)
-                if not force_reindex:
-                    file_hash = self._compute_file_hash(absolute_file_path)
-                    existing_file = self.metadata_db.get_file(repo_id, str(file_path))
-
-                    if existing_file and existing_file['file_hash'] == file_hash:
-                        logger.debug(f"Skipping unchanged file: {file_path}")
-                        skipped_files += 1
-                        continue
+                # Check if file has changed (the manifest is empty with force_reindex)
+                unchanged, file_hash = self._check_unchanged(absolute_file_path, manifest)
+                if unchanged:
+                    logger.debug(f"Skipping unchanged file: {file_path}")
+                    skipped_files += 1
+                    unchanged_files += 1
+                    unchanged_chunks += manifest[str(absolute_file_path)]['chunk_count'] or 0
+                    continue
 
-                # Index the file
+                # Chunk the file; embedding and storage happen per batch
                 try:
-                    chunks_added = self._index_file(
-                        repo_id=repo_id,
-                        collection_name=collection_name,
-                        file_path=absolute_file_path,
+                    chunks, language, file_hash = self._prepare_file(
+                        absolute_file_path,
                         commit_hash=latest_commit,
-                        is_uncommitted=False
+                        is_uncommitted=False,
+                        file_hash=file_hash
                     )
-
-                    total_chunks += chunks_added
-                    indexed_files += 1
-
                 except Exception as e:
                     logger.error(f"Failed to index file {file_path}: {e}")
                     continue
 
-            # Update repository metadata
+                pending.append((absolute_file_path, chunks, language, file_hash))
+                pending_chunks += len(chunks)
+
+                if pending_chunks >= EMBED_BATCH_CHUNKS:
+                    stored, chunks_added = self._store_batch(repo_id, collection_name, pending)
+                    indexed_files += len(stored)
+                    total_chunks += chunks_added
+                    pending = []
+                    pending_chunks = 0
+
+            if pending:
+                stored, chunks_added = self._store_batch(repo_id, collection_name, pending)
+                indexed_files += len(stored)
+                total_chunks += chunks_added
+
+            # Update repository metadata (unchanged files remain indexed)
             self.metadata_db.update_repository(
                 repo_id,
                 last_indexed_at='CURRENT_TIMESTAMP',
                 last_commit_hash=latest_commit,
-                total_chunks=total_chunks,
-                total_files=indexed_files,
+                total_chunks=total_chunks + unchanged_chunks,
+                total_files=indexed_files + unchanged_files,
                 indexing_status='completed'
             )
 
@@ -220,13 +250,113 @@ class RepositoryIndexer:
             logger.error(f"Failed to index file {file_path}: {e}")
             raise
 
+    def index_files(
+        self,
+        repo_id: str,
+        file_paths: List[str],
+        is_uncommitted: bool = False
+    ) -> Dict[str, Any]:
+        """Index a batch of files.
+
+        Repository info and the latest commit are looked up once for the
+        whole batch. A failing file is logged and skipped.
+
+        Args:
+            repo_id: Repository UUID
+            file_paths: Paths to the files (relative or absolute)
+            is_uncommitted: Whether these are uncommitted changes
+
+        Returns:
+            Dictionary with indexing results
+        """
+        logger.info(f"Indexing {len(file_paths)} files")
+
+        repo_info = self.metadata_db.get_repository(repo_id)
+        if not repo_info:
+            raise ValueError(f"Repository not found: {repo_id}")
+
+        collection_name = repo_info['chroma_collection_name']
+        repo_path = Path(repo_info['path'])
+
+        # Get latest commit hash
+        git_ops = GitOperations(str(repo_path))
+        commits = git_ops.get_commit_history(max_count=1)
+        latest_commit = commits[0]['hash'] if commits else None
+
+        failed_files = []
+        pending = []
+        requested = {}
+        readable = []
+
+        paths = []
+        for file_path in file_paths:
+            path = Path(file_path)
+            if not path.is_absolute():
+                path = repo_path / path
+            paths.append(path)
+
+        # Read the whole batch concurrently
+        file_data = git_ops.read_working_tree_files([str(path) for path in paths])
+
+        for file_path, path in zip(file_paths, paths):
+            data = file_data.get(str(path))
+            content = self._decode_content(path, data) if data is not None else None
+            if content is None:
+                # Unreadable files are recorded with no chunks, as before
+                pending.append((path, [], 'unknown', ''))
+                requested[path] = file_path
+                continue
+            readable.append((file_path, path, content, _file_hasher(data).hexdigest()))
+
+        # Parse the whole batch at once so large batches use every core
+        try:
+            parsed = self.parser.parse_files([(path, content) for _, path, content, _ in readable])
+        except Exception as e:
+            logger.warning(f"Batch parsing failed, parsing files one by one: {e}")
+            parsed = [None] * len(readable)
+
+        for (file_path, path, content, file_hash), parsed_chunks in zip(readable, parsed):
+            try:
+                if parsed_chunks is None:
+                    parsed_chunks = self.parser.parse_file(path, content)
+                chunks, language = self._chunk_parsed(
+                    path,
+                    content,
+                    parsed_chunks,
+                    commit_hash=latest_commit,
+                    is_uncommitted=is_uncommitted
+                )
+            except Exception as e:
+                logger.error(f"Failed to index file {file_path}: {e}")
+                failed_files.append(file_path)
+                continue
+
+            pending.append((path, chunks, language, file_hash))
+            requested[path] = file_path
+
+        # Embed and store the chunks of all files together
+        stored, total_chunks = self._store_batch(repo_id, collection_name, pending)
+        indexed_files = len(stored)
+        failed_files.extend(
+            requested[path] for path, _, _, _ in pending if path not in stored
+        )
+
+        logger.info(f"Batch indexed: {indexed_files} files, {total_chunks} chunks")
+
+        return {
+            'indexed_files': indexed_files,
+            'total_chunks': total_chunks,
+            'failed_files': failed_files
+        }
+
     def _index_file(
         self,
         repo_id: str,
         collection_name: str,
         file_path: Path,
         commit_hash: Optional[str] = None,
-        is_uncommitted: bool = False
+        is_uncommitted: bool = False,
+        file_hash: Optional[str] = None
     ) -> int:
         """Internal method to index a single file.
 
@@ -236,60 +366,192 @@ class RepositoryIndexer:
             file_path: Path to the file
             commit_hash: Commit hash (if committed)
             is_uncommitted: Whether this is an uncommitted change
+            file_hash: Content hash if already computed
 
         Returns:
             Number of chunks indexed
         """
-        # Read file content
+        chunks, language, file_hash = self._prepare_file(file_path, commit_hash, is_uncommitted, file_hash)
+        return self._store_files(repo_id, collection_name, [(file_path, chunks, language, file_hash)])
+
+    def _prepare_file(
+        self,
+        file_path: Path,
+        commit_hash: Optional[str] = None,
+        is_uncommitted: bool = False,
+        file_hash: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], str, str]:
+        """Read, parse and chunk a file without embedding it.
+
+        Args:
+            file_path: Path to the file
+            commit_hash: Commit hash (if committed)
+            is_uncommitted: Whether this is an uncommitted change
+            file_hash: Content hash from the unchanged check, if computed;
+                otherwise the bytes read here are hashed
+
+        Returns:
+            Tuple of (final chunks, language, file hash); no chunks if the
+            file can't be read
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            logger.warning(f"Skipping binary file: {file_path}")
-            return 0
+            data = file_path.read_bytes()
         except Exception as e:
             logger.error(f"Failed to read file {file_path}: {e}")
-            return 0
+            return [], 'unknown', ''
+
+        file_hash = file_hash or _file_hasher(data).hexdigest()
+        content = self._decode_content(file_path, data)
+        if content is None:
+            return [], 'unknown', file_hash
 
         # Parse file into chunks
         parsed_chunks = self.parser.parse_file(file_path, content)
+        chunks, language = self._chunk_parsed(file_path, content, parsed_chunks, commit_hash, is_uncommitted)
+        return chunks, language, file_hash
 
-        # If parser doesn't support this file type, try text chunking
-        if not parsed_chunks:
-            parsed_chunks = self.chunker.chunk_text(content, file_path)
+    def _decode_content(self, file_path: Path, data: bytes) -> Optional[str]:
+        """Decode file bytes as UTF-8 text with universal newlines.
 
-        # Apply chunking strategy (may split large chunks)
-        final_chunks = self.chunker.chunk_code(parsed_chunks)
+        Args:
+            file_path: Path the bytes were read from
+            data: Raw file content
 
-        # Add metadata to chunks
-        for chunk in final_chunks:
+        Returns:
+            Text as a text-mode open() would return it, or None for binary files
+        """
+        try:
+            content = data.decode('utf-8')
+        except UnicodeDecodeError:
+            logger.warning(f"Skipping binary file: {file_path}")
+            return None
+
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+    def _chunk_parsed(
+        self,
+        file_path: Path,
+        content: str,
+        parsed_chunks: List[Dict[str, Any]],
+        commit_hash: Optional[str] = None,
+        is_uncommitted: bool = False
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """Chunk the parser output of a file and add indexing metadata.
+
+        Args:
+            file_path: Path to the file
+            content: File content
+            parsed_chunks: Chunks from CodeParser (empty for unsupported types)
+            commit_hash: Commit hash (if committed)
+            is_uncommitted: Whether this is an uncommitted change
+
+        Returns:
+            Tuple of (final chunks, language)
+        """
+        # If parser doesn't support this file type, fall back to text
+        # sections, produced lazily and finalized once by iter_chunks()
+        if not parsed_chunks:
+            parsed_chunks = self.chunker.iter_text_sections(content, file_path)
+
+        # Apply chunking strategy (may split large chunks) and add metadata
+        final_chunks = []
+        for chunk in self.chunker.iter_chunks(parsed_chunks):
             chunk['commit_hash'] = commit_hash or ''
             chunk['is_uncommitted'] = is_uncommitted
+            final_chunks.append(chunk)
+
+        language = final_chunks[0].get('language', 'unknown') if final_chunks else 'unknown'
+        return final_chunks, language
+
+    def _store_files(
+        self,
+        repo_id: str,
+        collection_name: str,
+        prepared: List[Tuple[Path, List[Dict[str, Any]], str, str]]
+    ) -> int:
+        """Embed and store chunks of prepared files with one embedding and one vector store call.
+
+        Args:
+            repo_id: Repository UUID
+            collection_name: ChromaDB collection name
+            prepared: (file path, chunks, language, file hash) tuples from _prepare_file()
+
+        Returns:
+            Number of chunks indexed
+        """
+        all_chunks = [chunk for _, chunks, _, _ in prepared for chunk in chunks]
 
         # Generate embeddings and add chunks to vector store
-        if final_chunks:
+        if all_chunks:
             # Extract code texts for embedding
-            chunk_texts = [chunk['code'] for chunk in final_chunks]
+            chunk_texts = [chunk['code'] for chunk in all_chunks]
 
             # Generate embeddings using the embedder
-            logger.debug(f"Generating embeddings for {len(chunk_texts)} chunks from {file_path}")
+            logger.debug(f"Generating embeddings for {len(chunk_texts)} chunks from {len(prepared)} files")
+            # Repeated chunk texts are embedded once by the embedder's cache
             embeddings = self.embedder.embed_batch(chunk_texts, show_progress=False)
             logger.debug(f"Generated {len(embeddings)} embeddings with dimension {embeddings.shape[1] if len(embeddings.shape) > 1 else 'N/A'}")
 
             # Add chunks with pre-computed embeddings to vector store
-            self.vector_store.add_chunks(collection_name, final_chunks, embeddings=embeddings)
+            self.vector_store.add_chunks(collection_name, all_chunks, embeddings=embeddings)
 
-            # Update file tracking in metadata DB
-            file_hash = self._compute_file_hash(file_path)
+        # Update file tracking in metadata DB
+        for file_path, chunks, language, file_hash in prepared:
+            if not chunks:
+                continue
             self.metadata_db.upsert_file(
                 repo_id=repo_id,
                 file_path=str(file_path),
                 file_hash=file_hash,
-                chunk_count=len(final_chunks),
-                language=parsed_chunks[0].get('language', 'unknown') if parsed_chunks else 'unknown'
+                chunk_count=len(chunks),
+                language=language
             )
 
-        return len(final_chunks)
+        return len(all_chunks)
+
+    def _store_batch(
+        self,
+        repo_id: str,
+        collection_name: str,
+        prepared: List[Tuple[Path, List[Dict[str, Any]], str, str]]
+    ) -> Tuple[Set[Path], int]:
+        """Store a batch of prepared files, isolating failures per file.
+
+        If storing the whole batch fails, its files are retried one at a
+        time so a single bad file doesn't fail the others.
+
+        Args:
+            repo_id: Repository UUID
+            collection_name: ChromaDB collection name
+            prepared: (file path, chunks, language, file hash) tuples from _prepare_file()
+
+        Returns:
+            Tuple of (set of stored file paths, number of chunks indexed)
+        """
+        if not prepared:
+            return set(), 0
+
+        try:
+            chunks_added = self._store_files(repo_id, collection_name, prepared)
+            return {file_path for file_path, _, _, _ in prepared}, chunks_added
+        except Exception as e:
+            if len(prepared) == 1:
+                logger.error(f"Failed to index file {prepared[0][0]}: {e}")
+                return set(), 0
+            logger.warning(f"Failed to index batch of {len(prepared)} files, retrying one by one: {e}")
+
+        stored = set()
+        chunks_added = 0
+        for entry in prepared:
+            try:
+                chunks_added += self._store_files(repo_id, collection_name, [entry])
+                stored.add(entry[0])
+            except Exception as e:
+                logger.error(f"Failed to index file {entry[0]}: {e}")
+
+        return stored, chunks_added
 
     def delete_file_chunks(
         self,
@@ -334,12 +596,14 @@ class RepositoryIndexer:
 
     def incremental_index(
         self,
-        repo_id: str
+        repo_id: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, Any]:
         """Perform incremental indexing (only modified files).
 
         Args:
             repo_id: Repository UUID
+            progress_callback: Optional callback(processed_files, total_files)
 
         Returns:
             Dictionary with indexing results
@@ -362,15 +626,27 @@ class RepositoryIndexer:
             modified_files = git_ops.get_modified_files()
             logger.info(f"Found {len(modified_files)} modified files")
 
+            # Stored content hashes, fetched in one query
+            manifest = self.metadata_db.get_file_manifest(repo_id)
+
             total_chunks = 0
             indexed_files = 0
 
-            for file_path_str in modified_files:
+            for processed, file_path_str in enumerate(modified_files):
+                if progress_callback:
+                    progress_callback(processed, len(modified_files))
+
                 file_path = Path(repo_path) / file_path_str
 
                 if not self.chunker.should_index_file(file_path):
                     continue
 
+                # Still-modified files already indexed in this state stay as they are
+                unchanged, file_hash = self._check_unchanged(file_path, manifest)
+                if unchanged:
+                    logger.debug(f"Skipping unchanged file: {file_path}")
+                    continue
+
                 try:
                     # Delete old chunks for this file
                     self.delete_file_chunks(repo_id, str(file_path))
@@ -381,7 +657,8 @@ class RepositoryIndexer:
                         collection_name=collection_name,
                         file_path=file_path,
                         commit_hash=None,
-                        is_uncommitted=True
+                        is_uncommitted=True,
+                        file_hash=file_hash
                     )
 
                     total_chunks += chunks_added
@@ -405,21 +682,42 @@ class RepositoryIndexer:
             logger.error(f"Incremental indexing failed: {e}")
             raise
 
+    def _check_unchanged(
+        self,
+        file_path: Path,
+        manifest: Dict[str, Dict[str, Any]]
+    ) -> Tuple[bool, Optional[str]]:
+        """Check a file's content against its stored hash.
+
+        Args:
+            file_path: Absolute path to the file
+            manifest: Indexed files from MetadataDB.get_file_manifest()
+
+        Returns:
+            Tuple of (True if the file was indexed with identical content,
+            current content hash or None if the file has no stored hash)
+        """
+        entry = manifest.get(str(file_path))
+        if not entry or not entry['file_hash']:
+            return False, None
+        file_hash = self._compute_file_hash(file_path)
+        return file_hash == entry['file_hash'], file_hash or None
+
     def _compute_file_hash(self, file_path: Path) -> str:
-        """Compute SHA256 hash of a file.
+        """Compute the content hash of a file (BLAKE3, or BLAKE2b without blake3).
 
         Args:
             file_path: Path to the file
 
         Returns:
-            SHA256 hash as hex string
+            Hash as hex string
         """
         try:
-            sha256 = hashlib.sha256()
+            hasher = _file_hasher()
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    sha256.update(chunk)
-            return sha256.hexdigest()
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(chunk)
+            return hasher.hexdigest()
         except Exception as e:
             logger.error(f"Failed to compute hash for {file_path}: {e}")
             return ''
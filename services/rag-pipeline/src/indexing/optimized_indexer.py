@@ -10,7 +10,7 @@ import time
 
 from ..core.git_ops import GitOperations
 from ..core.parser import CodeParser
-from ..core.chunker import CodeChunker
+from ..core.chunker import CodeChunker, get_chunker
 from ..core.embedder import BaseEmbedder
 from ..core.vector_store import VectorStore
 from ..db.metadata_db import MetadataDB
@@ -46,7 +46,7 @@ class OptimizedRepositoryIndexer:
         self.vector_store = vector_store
         self.embedder = embedder
         self.parser = parser or CodeParser()
-        self.chunker = chunker or CodeChunker()
+        self.chunker = chunker or get_chunker()
         self.max_workers = max_workers
         self.batch_size = batch_size
 
@@ -254,9 +254,10 @@ class OptimizedRepositoryIndexer:
         # Parse file into chunks
         parsed_chunks = self.parser.parse_file(file_path, content)
 
-        # If parser doesn't support this file type, try text chunking
+        # If parser doesn't support this file type, fall back to text
+        # sections (finalized by chunk_code)
         if not parsed_chunks:
-            parsed_chunks = self.chunker.chunk_text(content, file_path)
+            parsed_chunks = self.chunker.iter_text_sections(content, file_path)
 
         # Apply chunking strategy
         final_chunks = self.chunker.chunk_code(parsed_chunks)
@@ -273,7 +274,7 @@ class OptimizedRepositoryIndexer:
             'file_path': str(file_path),
             'file_hash': file_hash,
             'chunk_count': len(final_chunks),
-            'language': parsed_chunks[0].get('language', 'unknown') if parsed_chunks else 'unknown'
+            'language': final_chunks[0].get('language', 'unknown') if final_chunks else 'unknown'
         }
 
         return final_chunks, file_metadata
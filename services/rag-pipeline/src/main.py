@@ -1,11 +1,22 @@
 """Main FastAPI application entry point."""
 
+import asyncio
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .config import get_settings
-from .api.routes import router
+from .api.routes import (
+    router,
+    get_db,
+    get_vector_store,
+    get_cached_embedder,
+    get_embedding_cache,
+    get_llm_provider,
+    _chromadb_heartbeat
+)
+from .core.parser import get_parse_pool, shutdown_parse_pool
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +51,17 @@ app.add_middleware(
 app.include_router(router, prefix="/api")
 
 
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected route errors and return them as a 500 response.
+
+    Routes only raise HTTPException for expected client errors; anything
+    else ends up here instead of being wrapped in every handler.
+    """
+    logger.error(f"Error handling {request.method} {request.url.path}: {exc}", exc_info=True)
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup."""
@@ -48,12 +70,58 @@ async def startup_event():
     logger.info(f"ChromaDB: {settings.chroma_host}:{settings.chroma_port}")
     logger.info(f"Metadata DB: {settings.metadata_db_path}")
 
+    # One long-lived parse pool; its workers start on first use
+    get_parse_pool()
+
+    await warm_up()
+
+
+async def warm_up():
+    """Build shared clients before the first request arrives.
+
+    Failures are logged and left for the first request to surface.
+    """
+    try:
+        _, vector_store, embedder, _ = await asyncio.gather(
+            asyncio.to_thread(get_db),
+            asyncio.to_thread(get_vector_store),
+            asyncio.to_thread(
+                get_cached_embedder, "openai", settings.openai_embedding_model
+            ),
+            asyncio.to_thread(get_llm_provider)
+        )
+
+        # Open the ChromaDB and OpenAI connections so they are reused later
+        warmups = [_chromadb_heartbeat(vector_store)]
+        if settings.openai_api_key:
+            warmups.append(asyncio.to_thread(embedder.embed_text, "warmup"))
+        await asyncio.gather(*warmups)
+
+        logger.info("Warm-up complete")
+    except Exception as e:
+        logger.warning(f"Warm-up failed: {e}")
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown."""
     logger.info("Shutting down Git RAG Pipeline service...")
 
+    # Close the shared ChromaDB client if one was created
+    if get_vector_store.cache_info().currsize:
+        get_vector_store().close()
+
+    if get_embedding_cache.cache_info().currsize:
+        get_embedding_cache().close()
+
+    await asyncio.to_thread(shutdown_parse_pool)
+
+    # Close the shared LLM provider's HTTP client, if it has one
+    if get_llm_provider.cache_info().currsize:
+        close = getattr(get_llm_provider(), 'close', None)
+        if close is not None:
+            await close()
+
 
 @app.get("/")
 async def root():
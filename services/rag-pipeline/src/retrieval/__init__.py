@@ -3,5 +3,6 @@
 from .retriever import CodeRetriever
 from .reranker import Reranker
 from .context import ContextAssembler
+from .cache import SemanticQueryCache
 
-__all__ = ['CodeRetriever', 'Reranker', 'ContextAssembler']
+__all__ = ['CodeRetriever', 'Reranker', 'ContextAssembler', 'SemanticQueryCache']
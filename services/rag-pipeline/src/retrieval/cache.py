@@ -0,0 +1,253 @@
+"""Semantic cache for query responses."""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+try:
+    import xxhash
+
+    def _hash64(data: bytes) -> int:
+        return xxhash.xxh3_64_intdigest(data)
+except ImportError:
+    def _hash64(data: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticQueryCache:
+    """Serve repeated or near-duplicate queries from memory.
+
+    Entries are grouped by a scope (repository, collection, filters and any
+    other parameter that changes the answer) so results never leak across
+    repositories. Within a scope, normalized query embeddings are stacked in
+    a matrix and looked up with a single dot product. Exact repeats of a
+    normalized query string are served without computing an embedding,
+    keyed by a stable 64-bit hash of the scope and query text.
+    """
+
+    def __init__(self, max_entries: int = 1024, threshold: float = 0.97):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached responses (LRU eviction)
+            threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # entry id -> (scope, text key), oldest first
+        self._lru: "OrderedDict[int, Tuple[Tuple, int]]" = OrderedDict()
+        # scope -> {'ids': [...], 'matrix': (k, d) array, 'responses': [...]}
+        self._scopes: Dict[Tuple, Dict[str, Any]] = {}
+        # text key -> entry id
+        self._texts: Dict[int, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize query text for exact-match lookups.
+
+        Args:
+            query: Raw query string
+
+        Returns:
+            Lowercased query with collapsed whitespace
+        """
+        return " ".join(query.lower().split())
+
+    @classmethod
+    def make_key(cls, scope: Tuple, query: str) -> int:
+        """Hash a scope and normalized query into an exact-match key.
+
+        Args:
+            scope: Cache scope from make_scope()
+            query: Raw query string
+
+        Returns:
+            64-bit integer key, stable across processes
+        """
+        data = f"{scope!r}\x00{cls.normalize_query(query)}".encode()
+        return _hash64(data)
+
+    @staticmethod
+    def make_scope(repo_id: str, collection_name: str, *parts: Hashable,
+                   filters: Optional[Dict[str, Any]] = None) -> Tuple:
+        """Build a hashable cache scope.
+
+        Args:
+            repo_id: Repository ID
+            collection_name: ChromaDB collection name
+            *parts: Additional parameters that affect the response
+            filters: Metadata filters used for retrieval
+
+        Returns:
+            Scope tuple
+        """
+        filter_key = tuple(sorted((filters or {}).items()))
+        return (repo_id, collection_name, filter_key) + parts
+
+    def get_by_text(self, scope: Tuple, query: str) -> Optional[Any]:
+        """Look up an exact (normalized) query repeat.
+
+        Args:
+            scope: Cache scope from make_scope()
+            query: Raw query string
+
+        Returns:
+            Cached response or None
+        """
+        key = self.make_key(scope, query)
+        with self._lock:
+            entry_id = self._texts.get(key)
+            if entry_id is None:
+                return None
+            bucket = self._scopes[scope]
+            response = bucket['responses'][bucket['ids'].index(entry_id)]
+            self._lru.move_to_end(entry_id)
+            self.hits += 1
+            return response
+
+    def get_by_embedding(self, scope: Tuple, embedding: np.ndarray) -> Optional[Any]:
+        """Look up a semantically similar cached query.
+
+        Args:
+            scope: Cache scope from make_scope()
+            embedding: Query embedding vector
+
+        Returns:
+            Cached response or None
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            bucket = self._scopes.get(scope)
+            if bucket is None or bucket['matrix'].shape[1] != vector.shape[0]:
+                self.misses += 1
+                return None
+
+            scores = bucket['matrix'] @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._lru.move_to_end(bucket['ids'][best])
+            self.hits += 1
+            logger.debug(f"Semantic cache hit (similarity={scores[best]:.4f})")
+            return bucket['responses'][best]
+
+    def put(self, scope: Tuple, query: str, embedding: np.ndarray, response: Any):
+        """Store a response.
+
+        Args:
+            scope: Cache scope from make_scope()
+            query: Raw query string
+            embedding: Query embedding vector
+            response: Response to cache
+        """
+        vector = self._normalize(embedding)
+        text_key = self.make_key(scope, query)
+
+        with self._lock:
+            if text_key in self._texts:
+                self._remove(self._texts[text_key])
+
+            entry_id = self._next_id
+            self._next_id += 1
+
+            bucket = self._scopes.get(scope)
+            if bucket is None or bucket['matrix'].shape[1] != vector.shape[0]:
+                bucket = {
+                    'ids': [],
+                    'matrix': np.empty((0, vector.shape[0]), dtype=np.float32),
+                    'responses': []
+                }
+                self._scopes[scope] = bucket
+
+            bucket['ids'].append(entry_id)
+            bucket['matrix'] = np.vstack([bucket['matrix'], vector[np.newaxis, :]])
+            bucket['responses'].append(response)
+            self._texts[text_key] = entry_id
+            self._lru[entry_id] = (scope, text_key)
+
+            while len(self._lru) > self.max_entries:
+                self._remove(next(iter(self._lru)))
+
+    def invalidate(self, repo_id: Optional[str] = None):
+        """Drop cached responses.
+
+        Args:
+            repo_id: Only drop entries for this repository (None = all)
+        """
+        with self._lock:
+            if repo_id is None:
+                self._lru.clear()
+                self._scopes.clear()
+                self._texts.clear()
+                return
+
+            stale = [
+                entry_id for entry_id, (scope, _) in self._lru.items()
+                if scope[0] == repo_id
+            ]
+            for entry_id in stale:
+                self._remove(entry_id)
+
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached queries for repo {repo_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry count and hit/miss counters
+        """
+        with self._lock:
+            return {
+                'entries': len(self._lru),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _remove(self, entry_id: int):
+        """Remove an entry. Caller must hold the lock.
+
+        Args:
+            entry_id: Entry to remove
+        """
+        scope, text_key = self._lru.pop(entry_id)
+        self._texts.pop(text_key, None)
+
+        bucket = self._scopes[scope]
+        row = bucket['ids'].index(entry_id)
+        del bucket['ids'][row]
+        del bucket['responses'][row]
+        if bucket['ids']:
+            bucket['matrix'] = np.delete(bucket['matrix'], row, axis=0)
+        else:
+            del self._scopes[scope]
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector.
+
+        Args:
+            embedding: Embedding vector
+
+        Returns:
+            Normalized 1D vector
+        """
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -116,6 +116,96 @@ class ContextAssembler:
         logger.info(f"Assembled prompt: {len(prompt)} chars")
         return prompt
 
+    def assemble_all(
+        self,
+        chunks: List[Dict[str, Any]],
+        query: str,
+        max_context_chunks: Optional[int] = 10
+    ) -> Dict[str, Any]:
+        """Build context, prompt and metadata summary in one pass over chunks.
+
+        Equivalent to calling assemble_context(chunks, query,
+        max_chunks=max_context_chunks), assemble_prompt(chunks, query) and
+        build_metadata_summary(chunks), but each chunk is formatted once.
+
+        Args:
+            chunks: Retrieved chunks
+            query: User's query
+            max_context_chunks: Maximum chunks in the returned context
+
+        Returns:
+            Dict with 'context', 'prompt', 'metadata_summary',
+            'context_tokens' and 'prompt_tokens'
+        """
+        context_parts = []
+        total_chars = 0
+        truncated = False
+
+        languages = {}
+        chunk_types = {}
+        files = set()
+        total_similarity = 0.0
+
+        for idx, chunk in enumerate(chunks, 1):
+            lang = chunk.get('language', 'unknown')
+            languages[lang] = languages.get(lang, 0) + 1
+
+            ctype = chunk.get('chunk_type', 'unknown')
+            chunk_types[ctype] = chunk_types.get(ctype, 0) + 1
+
+            files.add(chunk.get('file_path', 'unknown'))
+            total_similarity += chunk.get('similarity', 0)
+
+            if truncated:
+                continue
+
+            chunk_text = self._format_chunk(chunk, idx, True, True)
+
+            # Check if we exceed max chars
+            if total_chars + len(chunk_text) > self.max_chars:
+                logger.info(f"Reached max chars, stopping at chunk {idx-1}")
+                truncated = True
+                continue
+
+            context_parts.append(chunk_text)
+            total_chars += len(chunk_text)
+
+        # The prompt uses every chunk that fits; the standalone context is a
+        # prefix of the same parts
+        prompt_context = "\n\n".join(context_parts)
+        if max_context_chunks:
+            context = "\n\n".join(context_parts[:max_context_chunks])
+        else:
+            context = prompt_context
+
+        sections = [self._get_default_system_prompt()]
+        if prompt_context:
+            sections.append(f"# Relevant Code Context\n\n{prompt_context}")
+        sections.append(self._get_query_instructions())
+        sections.append(f"# User Query\n\n{query}")
+        prompt = "\n\n".join(sections)
+
+        metadata_summary = {}
+        if chunks:
+            metadata_summary = {
+                'total_chunks': len(chunks),
+                'unique_files': len(files),
+                'languages': languages,
+                'chunk_types': chunk_types,
+                'avg_similarity': total_similarity / len(chunks),
+                'files': sorted(files)
+            }
+
+        logger.info(f"Assembled context and prompt: {len(context_parts)} chunks, {len(prompt)} chars")
+
+        return {
+            'context': context,
+            'prompt': prompt,
+            'metadata_summary': metadata_summary,
+            'context_tokens': self.estimate_token_count(context),
+            'prompt_tokens': self.estimate_token_count(prompt)
+        }
+
     def assemble_chat_context(
         self,
         chunks: List[Dict[str, Any]],
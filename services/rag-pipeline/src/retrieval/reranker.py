@@ -24,7 +24,8 @@ class Reranker:
         chunks: List[Dict[str, Any]],
         query_embedding: Optional[np.ndarray] = None,
         lambda_param: float = 0.5,
-        top_k: Optional[int] = None
+        top_k: Optional[int] = None,
+        chunk_embeddings: Optional[np.ndarray] = None
     ) -> List[Dict[str, Any]]:
         """Rerank using Maximal Marginal Relevance (MMR).
 
@@ -38,6 +39,8 @@ class Reranker:
             lambda_param: Trade-off between relevance and diversity (0-1)
                          1.0 = pure relevance, 0.0 = pure diversity
             top_k: Number of results to return (None = all)
+            chunk_embeddings: Pre-computed chunk embeddings (n_chunks x dim),
+                              e.g. from CodeRetriever.retrieve_with_embeddings
 
         Returns:
             Reranked list of chunks
@@ -47,22 +50,27 @@ class Reranker:
 
         logger.info(f"MMR reranking {len(chunks)} chunks (λ={lambda_param})")
 
-        # If we don't have embeddings, fall back to similarity scores
-        if query_embedding is None and 'similarity' in chunks[0]:
+        have_embeddings = chunk_embeddings is not None and len(chunk_embeddings) == len(chunks)
+
+        # If we don't have embeddings (or were handed unusable ones), fall back to similarity scores
+        if 'similarity' in chunks[0] and (
+            query_embedding is None or (chunk_embeddings is not None and not have_embeddings)
+        ):
             return self._mmr_rerank_by_similarity(chunks, lambda_param, top_k)
 
         # Need embedder to compute new embeddings
-        if self.embedder is None:
+        if not have_embeddings and self.embedder is None:
             logger.warning("No embedder available, returning original order")
             return chunks[:top_k] if top_k else chunks
 
         try:
-            # Generate embeddings for all chunks
-            chunk_texts = [chunk['code'] for chunk in chunks]
-            chunk_embeddings = self.embedder.embed_batch(
-                chunk_texts,
-                show_progress=False
-            )
+            if not have_embeddings:
+                # Generate embeddings for all chunks
+                chunk_texts = [chunk['code'] for chunk in chunks]
+                chunk_embeddings = self.embedder.embed_batch(
+                    chunk_texts,
+                    show_progress=False
+                )
 
             # Compute MMR
             selected_indices = self._mmr_select(
@@ -171,48 +179,40 @@ class Reranker:
         Returns:
             List of selected document indices
         """
-        # Compute similarities to query
-        query_sims = self._cosine_similarity_batch(
-            query_embedding,
-            document_embeddings
-        )
+        # Normalize once so every similarity below is a plain dot product
+        docs = np.asarray(document_embeddings, dtype=np.float32)
+        if docs.ndim == 1:
+            docs = docs.reshape(1, -1)
+        docs = docs / (np.linalg.norm(docs, axis=1, keepdims=True) + 1e-8)
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        query = query / (np.linalg.norm(query) + 1e-8)
 
-        # Initialize
-        selected_indices = []
-        remaining_indices = list(range(len(document_embeddings)))
+        # Relevance to query and pairwise document similarity in two GEMMs
+        query_sims = docs @ query
+        pairwise = docs @ docs.T
+
+        n_docs = len(docs)
+        k = min(k, n_docs)
 
         # Select first document (most relevant)
         first_idx = int(np.argmax(query_sims))
-        selected_indices.append(first_idx)
-        remaining_indices.remove(first_idx)
+        selected_indices = [first_idx]
 
-        # Iteratively select remaining documents
-        while len(selected_indices) < k and remaining_indices:
-            mmr_scores = []
-
-            for idx in remaining_indices:
-                # Relevance: similarity to query
-                relevance = query_sims[idx]
-
-                # Diversity: max similarity to selected documents
-                if selected_indices:
-                    selected_embeddings = document_embeddings[selected_indices]
-                    doc_sims = self._cosine_similarity_batch(
-                        document_embeddings[idx],
-                        selected_embeddings
-                    )
-                    max_sim = np.max(doc_sims)
-                else:
-                    max_sim = 0.0
+        # Max similarity of each document to anything selected so far
+        max_sim = pairwise[first_idx].copy()
+        available = np.ones(n_docs, dtype=bool)
+        available[first_idx] = False
 
-                # MMR score
-                mmr_score = lambda_param * relevance - (1 - lambda_param) * max_sim
-                mmr_scores.append(mmr_score)
+        # Iteratively select remaining documents
+        while len(selected_indices) < k:
+            mmr_scores = lambda_param * query_sims - (1 - lambda_param) * max_sim
+            mmr_scores[~available] = -np.inf
 
-            # Select document with highest MMR score
-            best_idx = remaining_indices[int(np.argmax(mmr_scores))]
+            best_idx = int(np.argmax(mmr_scores))
             selected_indices.append(best_idx)
-            remaining_indices.remove(best_idx)
+            available[best_idx] = False
+            np.maximum(max_sim, pairwise[best_idx], out=max_sim)
 
         return selected_indices
 
@@ -1,7 +1,7 @@
 """RAG retrieval module for semantic code search."""
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 
 from ..core.vector_store import VectorStore
@@ -35,7 +35,8 @@ class CodeRetriever:
         query: str,
         n_results: int = 10,
         filters: Optional[Dict[str, Any]] = None,
-        min_similarity: float = 0.0
+        min_similarity: float = 0.0,
+        query_embedding: Optional[np.ndarray] = None
     ) -> List[Dict[str, Any]]:
         """Retrieve relevant code chunks for a query.
 
@@ -45,6 +46,7 @@ class CodeRetriever:
             n_results: Maximum number of results to return
             filters: Metadata filters (e.g., {"language": "python"})
             min_similarity: Minimum similarity threshold (0-1)
+            query_embedding: Pre-computed query embedding (skips embedding the query)
 
         Returns:
             List of retrieved chunks with metadata and scores
@@ -52,18 +54,8 @@ class CodeRetriever:
         logger.info(f"Retrieving {n_results} chunks for query: {query[:100]}")
 
         try:
-            # Generate query embedding
-            query_embedding = self.embedder.embed_text(query)
-
-            # Convert numpy array to list for ChromaDB
-            query_embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
-
-            # Query vector store with pre-computed embedding
-            results = self.vector_store.query(
-                collection_name=collection_name,
-                query_embeddings=query_embedding_list,
-                n_results=n_results,
-                where=filters
+            results = self._query_vector_store(
+                collection_name, query, n_results, filters, query_embedding
             )
 
             # Format results
@@ -76,6 +68,96 @@ class CodeRetriever:
             logger.error(f"Retrieval failed: {e}")
             raise
 
+    def retrieve_with_embeddings(
+        self,
+        collection_name: str,
+        query: str,
+        n_results: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        min_similarity: float = 0.0,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Retrieve chunks together with their stored embeddings.
+
+        The embeddings come back from ChromaDB in the same query, so MMR
+        reranking can run on the (N, d) matrix without re-embedding chunks.
+
+        Args:
+            collection_name: ChromaDB collection name
+            query: Natural language query
+            n_results: Maximum number of results to return
+            filters: Metadata filters (e.g., {"language": "python"})
+            min_similarity: Minimum similarity threshold (0-1)
+            query_embedding: Pre-computed query embedding (skips embedding the query)
+
+        Returns:
+            Tuple of (chunks, embeddings) where row i of embeddings belongs to chunks[i]
+        """
+        logger.info(f"Retrieving {n_results} chunks with embeddings for query: {query[:100]}")
+
+        try:
+            results = self._query_vector_store(
+                collection_name, query, n_results, filters, query_embedding,
+                include_embeddings=True
+            )
+
+            chunks = self._format_results(results, min_similarity)
+
+            raw_embeddings = results.get('embeddings')
+            embeddings = np.asarray(
+                raw_embeddings[0] if raw_embeddings else [],
+                dtype=np.float32
+            )
+            if min_similarity > 0.0 and len(embeddings):
+                # Apply the same threshold _format_results used
+                distances = np.asarray(results.get('distances', [[]])[0], dtype=np.float32)
+                embeddings = embeddings[1.0 / (1.0 + distances) >= min_similarity]
+
+            logger.info(f"Retrieved {len(chunks)} relevant chunks")
+            return chunks, embeddings
+
+        except Exception as e:
+            logger.error(f"Retrieval failed: {e}")
+            raise
+
+    def _query_vector_store(
+        self,
+        collection_name: str,
+        query: str,
+        n_results: int,
+        filters: Optional[Dict[str, Any]],
+        query_embedding: Optional[np.ndarray],
+        include_embeddings: bool = False
+    ) -> Dict[str, Any]:
+        """Embed the query (if needed) and run it against the vector store.
+
+        Args:
+            collection_name: ChromaDB collection name
+            query: Natural language query
+            n_results: Maximum number of results to return
+            filters: Metadata filters
+            query_embedding: Pre-computed query embedding (optional)
+            include_embeddings: Also return the stored chunk embeddings
+
+        Returns:
+            Raw ChromaDB query results
+        """
+        # Generate query embedding unless the caller already has one
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_text(query)
+
+        # Convert numpy array to list for ChromaDB
+        query_embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
+
+        # Query vector store with pre-computed embedding
+        return self.vector_store.query(
+            collection_name=collection_name,
+            query_embeddings=query_embedding_list,
+            n_results=n_results,
+            where=filters,
+            include_embeddings=include_embeddings
+        )
+
     def retrieve_with_context(
         self,
         collection_name: str,
@@ -319,13 +401,10 @@ class CodeRetriever:
         Returns:
             List of relevance scores (cosine similarity)
         """
-        scores = []
-
-        for chunk_emb in chunk_embeddings:
-            score = self.embedder.compute_similarity(query_embedding, chunk_emb)
-            scores.append(score)
+        if len(chunk_embeddings) == 0:
+            return []
 
-        return scores
+        return self.embedder.compute_similarities(query_embedding, chunk_embeddings).tolist()
 
     def hybrid_search(
         self,
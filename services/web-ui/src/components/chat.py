@@ -1,5 +1,6 @@
 """Chat interface component with code syntax highlighting."""
 
+import json
 import logging
 from typing import List, Tuple, Optional, AsyncIterator
 import httpx
@@ -145,9 +146,13 @@ class ChatInterface:
                     if not line:
                         continue
 
-                    # Remove "data: " prefix if present (SSE format)
+                    # SSE events carry a JSON-encoded text chunk
                     if line.startswith("data: "):
                         line = line[6:]
+                        try:
+                            line = json.loads(line)
+                        except json.JSONDecodeError:
+                            pass
 
                     # Accumulate response
                     accumulated_response += line
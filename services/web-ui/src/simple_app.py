@@ -1,6 +1,7 @@
 """Simplified Gradio web UI for Git RAG Chat - Gradio 6.x compatible."""
 
 import os
+import time
 import logging
 import gradio as gr
 import httpx
@@ -24,6 +25,46 @@ GRADIO_SERVER_PORT = int(os.getenv('GRADIO_SERVER_PORT', '7860'))
 # Simple HTTP client with extended timeout for large repository indexing
 client = httpx.Client(timeout=600.0)
 
+# Indexing runs as a background job on the RAG pipeline; poll until it finishes
+INDEX_POLL_SECONDS = 2.0
+INDEX_WAIT_SECONDS = 3600.0
+
+
+def wait_for_index_job(repo_id: str, index_response: httpx.Response) -> dict:
+    """Resolve an indexing response to its final result.
+
+    Args:
+        repo_id: Repository ID
+        index_response: Response from POST /repos/{repo_id}/index
+
+    Returns:
+        Indexing result merged with the embedding info from the response
+
+    Raises:
+        RuntimeError: If the background job failed or did not finish in time
+    """
+    data = index_response.json()
+    if index_response.status_code != 202:
+        return data
+
+    job_id = data.get('job_id')
+    deadline = time.monotonic() + INDEX_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(INDEX_POLL_SECONDS)
+        status = client.get(
+            f"{RAG_API_URL}/api/repos/{repo_id}/index/status",
+            params={"job_id": job_id}
+        )
+        status.raise_for_status()
+        job = status.json().get('job') or {}
+
+        if job.get('status') == 'completed':
+            return {**data, **(job.get('result') or {})}
+        if job.get('status') == 'failed':
+            raise RuntimeError(job.get('error') or 'indexing failed')
+
+    raise RuntimeError(f"Indexing job {job_id} did not finish within {int(INDEX_WAIT_SECONDS)}s")
+
 
 def add_repository(repo_path: str, emb_provider: str, emb_model: str):
     """Add a repository to the system with embedding selection."""
@@ -58,8 +99,8 @@ def add_repository(repo_path: str, emb_provider: str, emb_model: str):
                 json=index_payload
             )
 
-            if index_response.status_code == 200:
-                index_data = index_response.json()
+            if index_response.status_code in (200, 202):
+                index_data = wait_for_index_job(repo_id, index_response)
                 indexed_files = index_data.get('indexed_files', 0)
                 total_chunks = index_data.get('total_chunks', 0)
                 emb_info = f"{index_data.get('embedding_provider', 'unknown')}/{index_data.get('embedding_model', 'unknown')}"
@@ -142,8 +183,8 @@ def reindex_repository(repo_selection: str, emb_provider: str, emb_model: str):
             json=index_payload
         )
 
-        if response.status_code == 200:
-            data = response.json()
+        if response.status_code in (200, 202):
+            data = wait_for_index_job(repo_id, response)
             indexed_files = data.get('indexed_files', 0)
             total_chunks = data.get('total_chunks', 0)
             emb_info = f"{data.get('embedding_provider', 'unknown')}/{data.get('embedding_model', 'unknown')}"
@@ -0,0 +1,37 @@
+import express from 'express';
+const { Router } = require('./router');
+
+/**
+ * API server setup.
+ */
+class ApiServer {
+  constructor(port) {
+    this.port = port;
+    this.app = express();
+  }
+
+  start() {
+    return this.app.listen(this.port);
+  }
+}
+
+function createRouter(routes) {
+  const router = new Router();
+  for (const route of routes) {
+    router.add(route.path, route.handler);
+  }
+  return router;
+}
+
+const authenticate = async function (req, res, next) {
+  if (!req.headers.authorization) {
+    return res.status(401).end();
+  }
+  next();
+};
+
+const formatUser = (user) => {
+  return { id: user.id, name: user.name };
+};
+
+export default ApiServer;
@@ -254,6 +254,61 @@ class APIHelper:
         logger.error(f"❌ Indexing timeout for {repo_id}")
         return False
 
+    def wait_for_index_job(
+        self,
+        repo_id: str,
+        response: httpx.Response,
+        timeout: int = 300,
+        check_interval: int = 2
+    ) -> bool:
+        """Wait for a background indexing job to finish.
+
+        The index endpoints answer 202 with a job_id; the job is polled
+        through /index/status until it completes or fails.
+
+        Args:
+            repo_id: Repository ID
+            response: Response of the index request
+            timeout: Maximum wait time in seconds
+            check_interval: Check interval in seconds
+
+        Returns:
+            True if the job completed
+        """
+        if response.status_code == 200:
+            return True
+        if response.status_code != 202:
+            logger.error(f"❌ Indexing request failed: {response.text}")
+            return False
+
+        job_id = response.json().get('job_id')
+        url = f"{self.base_url}/api/repos/{repo_id}/index/status"
+        start_time = time.time()
+
+        while time.time() - start_time < timeout:
+            try:
+                status = self.client.get(url, params={"job_id": job_id})
+            except httpx.RequestError as e:
+                logger.error(f"❌ API request failed: {e}")
+                return False
+
+            if status.status_code != 200:
+                logger.error(f"❌ Failed to get job status: {status.text}")
+                return False
+
+            job = status.json().get('job') or {}
+            if job.get('status') == 'completed':
+                logger.info(f"✅ Indexing job {job_id} completed for {repo_id}")
+                return True
+            elif job.get('status') == 'failed':
+                logger.error(f"❌ Indexing job {job_id} failed: {job.get('error')}")
+                return False
+
+            time.sleep(check_interval)
+
+        logger.error(f"❌ Indexing job {job_id} timeout for {repo_id}")
+        return False
+
     def query(
         self,
         query: str,
@@ -254,14 +254,13 @@ def test_incremental_after_new_commit(
     logger.info("Triggering incremental indexing...")
     response = api_helper.client.post(f"{api_helper.base_url}/api/repos/{repo_id}/index/incremental")
 
-    if response.status_code != 200:
+    if response.status_code not in (200, 202):
         logger.error(f"❌ Failed to trigger incremental indexing: {response.text}")
         reporter.add_result("Incremental Indexing (New File)", False, time.time() - start_time)
         return False
 
-    # Wait for indexing
-    time.sleep(10)  # Give it time to process
-    completed = api_helper.wait_for_indexing(repo_id, timeout=60)
+    # Wait for the background job
+    completed = api_helper.wait_for_index_job(repo_id, response, timeout=60)
 
     if not completed:
         logger.error("❌ Incremental indexing did not complete")
@@ -344,14 +343,13 @@ def test_incremental_after_modification(
     logger.info("Triggering incremental indexing for modification...")
     response = api_helper.client.post(f"{api_helper.base_url}/api/repos/{repo_id}/index/incremental")
 
-    if response.status_code != 200:
+    if response.status_code not in (200, 202):
         logger.error(f"❌ Failed to trigger incremental indexing: {response.text}")
         reporter.add_result("Incremental Indexing (Modified File)", False, time.time() - start_time)
         return False
 
-    # Wait for indexing
-    time.sleep(10)
-    completed = api_helper.wait_for_indexing(repo_id, timeout=60)
+    # Wait for the background job
+    completed = api_helper.wait_for_index_job(repo_id, response, timeout=60)
 
     if not completed:
         logger.error("❌ Incremental indexing did not complete")
@@ -0,0 +1,15 @@
+"""Shared setup for unit tests.
+
+Unit tests import the service sources directly, so each service's
+requirements.txt must be installed in the test environment.
+"""
+
+import sys
+from pathlib import Path
+
+SERVICES_DIR = Path(__file__).resolve().parents[2] / "services"
+
+# rag-pipeline is imported as the "src" package (it uses relative imports);
+# file-watcher modules import each other as top-level modules
+sys.path.insert(0, str(SERVICES_DIR / "rag-pipeline"))
+sys.path.insert(0, str(SERVICES_DIR / "file-watcher" / "src"))
@@ -0,0 +1,132 @@
+"""Regression tests for splitting oversized chunks in CodeChunker."""
+
+import pytest
+
+from src.core.chunker import CodeChunker
+
+
+@pytest.fixture
+def chunker(monkeypatch):
+    # Pin token counts to the chars/4 estimate so results don't depend on
+    # whether the tiktoken BPE can be loaded
+    monkeypatch.setattr(CodeChunker, "_encoding", property(lambda self: None))
+    return CodeChunker(max_chunk_size=100, overlap=20)
+
+
+def split(chunker, chunk):
+    return [
+        (part['name'], part['start_line'], part['end_line'], part['line_count'])
+        for part in chunker.chunk_code([chunk])
+    ]
+
+
+def uniform_block():
+    """50 same-shaped lines with no preferred split points."""
+    lines = [f"    value_{i:03d} = compute({i})" for i in range(50)]
+    return {
+        'code': "\n".join(lines),
+        'name': 'block',
+        'chunk_type': 'block',
+        'start_line': 1,
+        'end_line': 50,
+    }
+
+
+def structured_function():
+    """A function whose loop bodies are separated by blank lines."""
+    lines = ["def process(items):", "    total = 0"]
+    for i in range(12):
+        lines += [
+            f"    # step {i}",
+            f"    for item in items[{i}]:",
+            f"        if item > {i}:",
+            "            total += item",
+            "",
+        ]
+    lines.append("    return total")
+    return {
+        'code': "\n".join(lines),
+        'name': 'process',
+        'chunk_type': 'function',
+        'signature': 'def process(items):',
+        'start_line': 10,
+        'end_line': 72,
+    }
+
+
+def test_small_chunk_is_not_split(chunker):
+    chunk = {'code': "def f():\n    return 1", 'name': 'f', 'chunk_type': 'function',
+             'start_line': 1, 'end_line': 2}
+
+    parts = chunker.chunk_code([chunk])
+
+    assert len(parts) == 1
+    assert 'is_partial' not in parts[0]
+
+
+def test_uniform_lines_are_packed_evenly(chunker):
+    chunk = uniform_block()
+    lines = chunk['code'].split("\n")
+    lines_per_chunk, _ = chunker._window_params(
+        chunk['code'], len(lines), chunker.count_tokens(chunk['code'])
+    )
+
+    assert lines_per_chunk == 14
+    # 4 parts of 13 lines, each but the first starting on the previous
+    # part's last line; no part grows past the 14-line window
+    assert split(chunker, chunk) == [
+        ('block_part1', 1, 13, 13),
+        ('block_part2', 13, 26, 14),
+        ('block_part3', 26, 39, 14),
+        ('block_part4', 39, 50, 12),
+    ]
+
+
+def test_splits_prefer_blank_lines(chunker):
+    assert split(chunker, structured_function()) == [
+        ('process_part1', 10, 20, 11),
+        ('process_part2', 20, 35, 16),
+        ('process_part3', 35, 50, 16),
+        ('process_part4', 50, 65, 16),
+        ('process_part5', 65, 72, 8),
+    ]
+
+
+@pytest.mark.parametrize("make_chunk", [uniform_block, structured_function])
+def test_parts_cover_source_with_overlap(chunker, make_chunk):
+    chunk = make_chunk()
+    lines = chunk['code'].split("\n")
+    parts = chunker.chunk_code([dict(chunk)])
+
+    previous_end = None
+    for number, part in enumerate(parts, 1):
+        offset = part['start_line'] - chunk['start_line']
+        assert part['code'] == "\n".join(lines[offset:offset + part['line_count']])
+        assert part['end_line'] == part['start_line'] + part['line_count'] - 1
+        assert part['part_number'] == number
+        assert part['is_partial'] is True
+        assert part['parent_chunk'] == chunk['name']
+        if previous_end is not None:
+            # Consecutive parts share exactly one line of overlap here
+            assert part['start_line'] == previous_end
+        previous_end = part['end_line']
+
+    assert parts[0]['start_line'] == chunk['start_line']
+    assert parts[-1]['end_line'] == chunk['end_line']
+
+
+def test_parts_keep_parent_signature(chunker):
+    parts = chunker.chunk_code([structured_function()])
+
+    assert {part['parent_signature'] for part in parts} == {'def process(items):'}
+
+
+def test_single_overlong_line_still_advances(chunker):
+    chunk = {'code': "\n".join(["x" * 1000] * 3), 'name': 'minified', 'chunk_type': 'block',
+             'start_line': 1, 'end_line': 3}
+
+    assert split(chunker, chunk) == [
+        ('minified_part1', 1, 1, 1),
+        ('minified_part2', 2, 2, 1),
+        ('minified_part3', 3, 3, 1),
+    ]
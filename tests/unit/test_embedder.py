@@ -0,0 +1,147 @@
+"""Tests for OpenAIEmbedder rate limiting, Retry-After parsing and batching."""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import embedder as embedder_module
+from src.core import tokens
+from src.core.embedder import OpenAIEmbedder, TokenBucket, _retry_after_seconds
+
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(embedder_module.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(embedder_module.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_bucket_starts_full(clock):
+    bucket = TokenBucket(per_minute=600)
+    bucket.acquire(600)
+    assert clock.sleeps == []
+
+
+def test_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(per_minute=600)  # 10 per second
+    bucket.acquire(600)
+    bucket.acquire(50)
+    assert clock.sleeps == [pytest.approx(5.0)]
+
+
+def test_bucket_refills_over_time(clock):
+    bucket = TokenBucket(per_minute=600)
+    bucket.acquire(600)
+    clock.now += 3.0
+    bucket.acquire(30)
+    assert clock.sleeps == []
+    bucket.acquire(1)
+    assert clock.sleeps == [pytest.approx(0.1)]
+
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(per_minute=600)
+    clock.now += 3600.0
+    bucket.acquire(600)
+    bucket.acquire(10)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_bucket_caps_oversized_requests(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.acquire(1000)
+    assert clock.sleeps == []
+
+
+def rate_limit_error(headers):
+    return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+
+def test_retry_after_seconds():
+    assert _retry_after_seconds(rate_limit_error({'retry-after': '20'})) == 20.0
+    assert _retry_after_seconds(rate_limit_error({'retry-after': '1.5'})) == 1.5
+
+
+def test_retry_after_ms_takes_precedence():
+    error = rate_limit_error({'retry-after-ms': '250', 'retry-after': '1'})
+    assert _retry_after_seconds(error) == 0.25
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    error = rate_limit_error({'retry-after': format_datetime(retry_at, usegmt=True)})
+    # The header has whole-second precision
+    assert 28.0 <= _retry_after_seconds(error) <= 30.0
+
+
+def test_retry_after_http_date_in_the_past():
+    error = rate_limit_error({'retry-after': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+    assert _retry_after_seconds(error) == 0.0
+
+
+def test_retry_after_missing_or_invalid():
+    assert _retry_after_seconds(Exception()) is None
+    assert _retry_after_seconds(rate_limit_error({})) is None
+    assert _retry_after_seconds(rate_limit_error({'retry-after': 'soon'})) is None
+
+
+@pytest.fixture
+def openai_embedder(monkeypatch):
+    # Pin token counts to the chars/4 estimate so results don't depend on
+    # whether the tiktoken BPE can be loaded
+    monkeypatch.setattr(tokens, "get_encoding", lambda: None)
+    return OpenAIEmbedder(api_key="test")
+
+
+def test_pack_batches_by_input_limit(openai_embedder):
+    texts = [f"text {i:03d}" for i in range(5)]  # 2 tokens each
+    batches = openai_embedder._pack_batches(texts, max_inputs=2)
+    assert batches == [(texts[0:2], 4), (texts[2:4], 4), (texts[4:5], 2)]
+
+
+def test_pack_batches_at_api_input_limit(openai_embedder):
+    texts = ["abcd"] * (OpenAIEmbedder.MAX_BATCH_INPUTS + 1)
+    batches = openai_embedder._pack_batches(texts, OpenAIEmbedder.MAX_BATCH_INPUTS)
+    assert [len(batch) for batch, _ in batches] == [OpenAIEmbedder.MAX_BATCH_INPUTS, 1]
+
+
+def test_pack_batches_by_token_limit(openai_embedder):
+    # 8000 tokens each: 36 fit under 290k, the 37th starts a new batch
+    text = "x" * 32000
+    batches = openai_embedder._pack_batches([text] * 40, OpenAIEmbedder.MAX_BATCH_INPUTS)
+    assert [(len(batch), count) for batch, count in batches] == [(36, 288_000), (4, 32_000)]
+    assert all(count <= OpenAIEmbedder.MAX_BATCH_TOKENS for _, count in batches)
+
+
+def test_pack_batches_truncates_oversized_inputs(openai_embedder):
+    oversized = "y" * (OpenAIEmbedder.MAX_INPUT_TOKENS * 4 + 400)
+    batches = openai_embedder._pack_batches(["small", oversized], max_inputs=10)
+    assert len(batches) == 1
+    batch, count = batches[0]
+    assert batch[0] == "small"
+    assert batch[1] == oversized[:OpenAIEmbedder.MAX_INPUT_TOKENS * 4]
+    assert count == 1 + OpenAIEmbedder.MAX_INPUT_TOKENS
+
+
+def test_pack_batches_keeps_order(openai_embedder):
+    texts = [f"chunk {i}" * (i + 1) for i in range(20)]
+    batches = openai_embedder._pack_batches(texts, max_inputs=3)
+    assert [text for batch, _ in batches for text in batch] == texts
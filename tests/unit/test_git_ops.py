@@ -0,0 +1,152 @@
+"""Unit tests for parsing NUL-separated Git output in GitOperations."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.core.git_ops import GitOperations, _parse_log_output, _parse_status_output
+
+
+FIXTURES_DIR = Path(__file__).resolve().parents[1] / "fixtures" / "git"
+
+
+def read_fixture(name: str) -> str:
+    """Read captured Git output as GitPython returns it (decoded text)."""
+    return (FIXTURES_DIR / name).read_bytes().decode("utf-8")
+
+
+def git(repo: Path, *args: str):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, capture_output=True
+    )
+
+
+# status-porcelain-v2.z was captured with
+#   git -c status.renames=copies status --porcelain=v2 -z --untracked-files=all --ignored
+# during a conflicted merge, so it holds every record type
+
+
+def test_status_fixture_modified_entries():
+    status = _parse_status_output(read_fixture("status-porcelain-v2.z"))
+
+    assert status['modified'] == [
+        "copy of plain.py",       # copy: new path, source path skipped
+        "image.bin",              # staged delete
+        "moved with space.py",    # rename: new path, original path skipped
+        "new\nline.py",           # newline in path
+        "plain.py",
+        "staged_new.py",
+    ]
+
+
+def test_status_fixture_unmerged_entries():
+    status = _parse_status_output(read_fixture("status-porcelain-v2.z"))
+
+    assert status['unmerged'] == ["conflict.py"]
+
+
+def test_status_fixture_untracked_entries_skip_ignored():
+    status = _parse_status_output(read_fixture("status-porcelain-v2.z"))
+
+    assert status['untracked'] == [
+        "image.bin",
+        "newdir/tab\there.py",
+        "untracked file.py",
+    ]
+    assert "debug.log" not in status['modified'] + status['untracked']
+
+
+def test_status_empty_output():
+    assert _parse_status_output("") == {'modified': [], 'untracked': [], 'unmerged': []}
+
+
+# log-numstat.z was captured with GitOperations._log_commits()'s arguments
+# from a history with a root commit, a rename (counted as delete plus add),
+# a binary change, a merge (diffed against its first parent) and paths with
+# spaces, tabs and newlines
+
+
+def test_log_fixture_commits():
+    commits = _parse_log_output(read_fixture("log-numstat.z"))
+
+    assert [c['short_hash'] for c in commits] == ["5f648154", "e1261711", "5b73f70f", "226b06aa"]
+    assert [c['files_changed'] for c in commits] == [9, 5, 1, 7]
+
+
+def test_log_fixture_metadata():
+    merge, _, _, root = _parse_log_output(read_fixture("log-numstat.z"))
+
+    assert merge['hash'] == "5f648154839ed07ee7b035ed49afaaa143960b3a"
+    assert merge['message'] == "Merge branch 'side'"
+    assert merge['author'] == "Test Author"
+    assert merge['author_email'] == "t@example.com"
+    assert merge['committed_at'] == "2024-02-01T08:30:00Z"
+
+    assert root['message'] == "Initial commit\n\nBody line one\nBody line two"
+    assert root['committed_at'] == "2024-01-31T12:00:00Z"
+
+
+def test_log_fixture_without_trailing_newline():
+    # GitPython strips the final newline from command output
+    output = read_fixture("log-numstat.z")
+    assert _parse_log_output(output.rstrip("\n")) == _parse_log_output(output)
+
+
+def test_log_empty_output():
+    assert _parse_log_output("") == []
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    (tmp_path / "keep.py").write_text("keep\n")
+    (tmp_path / "old name.py").write_text("rename me\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "Initial commit")
+    return tmp_path
+
+
+def test_status_from_live_repository(repo):
+    git(repo, "mv", "old name.py", "new name.py")
+    (repo / "keep.py").write_text("changed\n")
+    (repo / "notes with space.py").write_text("new\n")
+
+    git_ops = GitOperations(str(repo))
+
+    assert sorted(git_ops.get_modified_files()) == ["keep.py", "new name.py"]
+    assert git_ops.get_untracked_changes() == ["notes with space.py"]
+
+
+def test_status_is_cached_until_refresh(repo):
+    git_ops = GitOperations(str(repo))
+    assert git_ops.get_untracked_changes() == []
+
+    (repo / "later.py").write_text("new\n")
+
+    assert git_ops.get_untracked_changes() == []
+    assert git_ops.get_untracked_changes(refresh=True) == ["later.py"]
+
+
+def test_log_matches_commit_stats(repo):
+    (repo / "keep.py").write_text("changed\n")
+    (repo / "tab\there.py").write_text("odd name\n")
+    (repo / "image.bin").write_bytes(b"\x00\x01binary")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "Second commit", "-m", "With a body")
+    git(repo, "mv", "old name.py", "new name.py")
+    git(repo, "commit", "-q", "-m", "Rename")
+
+    git_ops = GitOperations(str(repo))
+    commits = git_ops.get_commit_history()
+
+    assert [c['message'] for c in commits] == [
+        "Rename", "Second commit\n\nWith a body", "Initial commit"
+    ]
+    for commit in commits:
+        stats = git_ops.repo.commit(commit['hash']).stats
+        assert commit['files_changed'] == len(stats.files)
+
+    since = git_ops.get_commits_since(commits[-1]['hash'])
+    assert [c['hash'] for c in since] == [c['hash'] for c in commits[:2]]
@@ -0,0 +1,199 @@
+"""Regression tests for the line-based Python and JavaScript parsers."""
+
+from pathlib import Path
+
+import pytest
+
+from src.core.parser import CodeParser
+
+
+FIXTURES_DIR = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+@pytest.fixture
+def parser():
+    return CodeParser()
+
+
+def parse_fixture(parser, name: str):
+    path = FIXTURES_DIR / name
+    return parser.parse_file(path, path.read_text())
+
+
+def outline(chunks):
+    return [(c['name'], c['chunk_type'], c['start_line'], c['end_line']) for c in chunks]
+
+
+PYTHON_EDGE_CASES = '''"""Module docstring."""
+import os
+from typing import List
+
+define_me = 1
+classes = []
+
+
+@decorator
+@other.decorator(arg=1)
+def first(a, b=2) -> int:
+    """Add things.
+
+    More text.
+    """
+    return a + b
+
+async def not_a_chunk_start():
+    pass
+
+class Outer(Base):
+    """Outer class."""
+    import json
+
+    def method(self):
+        def inner():
+            return 1
+        return inner
+def 
+class
+def last(): return os.sep'''
+
+
+def test_python_fixture_outline(parser):
+    assert outline(parse_fixture(parser, "sample-code.py")) == [
+        ('User', 'class', 8, 10),
+        ('__init__', 'function', 11, 22),
+        ('set_password', 'function', 23, 33),
+        ('check_password', 'function', 34, 50),
+        ('AuthenticationManager', 'class', 51, 53),
+        ('__init__', 'function', 54, 58),
+        ('register_user', 'function', 59, 81),
+        ('login', 'function', 82, 106),
+        ('logout', 'function', 107, 117),
+        ('get_user_by_token', 'function', 118, 128),
+        ('is_authenticated', 'function', 129, 139),
+    ]
+
+
+def test_python_fixture_metadata(parser):
+    chunks = {c['name']: c for c in parse_fixture(parser, "sample-database.py")}
+
+    assert outline([chunks['get_cursor'], chunks['delete_user']]) == [
+        ('get_cursor', 'function', 33, 50),
+        ('delete_user', 'function', 170, 182),
+    ]
+    assert chunks['get_cursor']['decorators'] == ['@contextmanager']
+    assert chunks['get_cursor']['signature'] == '    def get_cursor(self):'
+    assert chunks['create_user']['signature'] == (
+        '    def create_user(self, username: str, email: str, password_hash: str) -> int:'
+    )
+
+
+def test_python_definitions_only_at_line_start(parser):
+    chunks = parser.parse_file(Path("edge.py"), PYTHON_EDGE_CASES)
+
+    # Module code before the first definition is not chunked; "define_me",
+    # "async def", a bare "def " and a bare "class" don't start chunks
+    assert outline(chunks) == [
+        ('first', 'function', 11, 20),
+        ('Outer', 'class', 21, 24),
+        ('method', 'function', 25, 25),
+        ('inner', 'function', 26, 30),
+        ('last', 'function', 31, 31),
+    ]
+
+
+def test_python_signature_decorators_and_docstring(parser):
+    first, outer, *_ = parser.parse_file(Path("edge.py"), PYTHON_EDGE_CASES)
+
+    assert first['signature'] == 'def first(a, b=2) -> int:'
+    assert first['decorators'] == ['@decorator', '@other.decorator(arg=1)']
+    assert first['docstring'] == 'Add things.  More text.'
+    assert first['code'].startswith('def first(a, b=2) -> int:\n')
+    assert outer['imports'] == ['import json']
+
+
+JAVASCRIPT_EDGE_CASES = '''// header comment
+import { a } from './a';
+import b from "b";
+
+export function handler(event) {
+  const x = require('x');
+  if (event) {
+    function nested() { return 1; }
+  }
+  return x;
+}
+
+export class Widget extends Base {
+  render() { return null; }
+}
+const min = function(){return 1};const also = function named(){};
+'''
+
+
+def test_javascript_fixture_outline(parser):
+    chunks = parse_fixture(parser, "sample-api.js")
+
+    # Anonymous function expressions keep no name; the leading chunk before
+    # the first trigger starts at line 0
+    assert outline(chunks) == [
+        ('unknown', 'code', 0, 6),
+        ('ApiServer', 'class', 7, 17),
+        ('createRouter', 'function', 18, 25),
+        ('unknown', 'function', 26, 32),
+        ('unknown', 'function', 33, 38),
+    ]
+    assert chunks[0]['imports'] == ["import express from 'express';"]
+    assert all(c['language'] == 'javascript' for c in chunks)
+
+
+@pytest.mark.parametrize("file_name, language", [("edge.js", "javascript"), ("edge.ts", "typescript")])
+def test_javascript_triggers_inside_braces_do_not_split(parser, file_name, language):
+    chunks = parser.parse_file(Path(file_name), JAVASCRIPT_EDGE_CASES)
+
+    # The nested function renames the open chunk instead of splitting it,
+    # and several triggers on one line start a single chunk
+    assert outline(chunks) == [
+        ('unknown', 'code', 0, 4),
+        ('nested', 'function', 5, 15),
+        ('named', 'function', 16, 17),
+    ]
+    assert chunks[0]['imports'] == ["import { a } from './a';", 'import b from "b";']
+    assert 'imports' not in chunks[1]
+    assert {c['language'] for c in chunks} == {language}
+
+
+def test_javascript_blank_file(parser):
+    assert parser.parse_file(Path("blank.js"), "\n  \n") == []
+
+
+@pytest.mark.parametrize("content", [
+    PYTHON_EDGE_CASES,
+    PYTHON_EDGE_CASES + "\n",
+    "\n\n" + PYTHON_EDGE_CASES + "\n\n",
+    (FIXTURES_DIR / "sample-database.py").read_text(),
+])
+def test_python_line_ranges_match_code(parser, content):
+    lines = content.split("\n")
+    chunks = parser.parse_file(Path("edge.py"), content)
+
+    for chunk in chunks:
+        assert chunk['code'] == "\n".join(lines[chunk['start_line'] - 1:chunk['end_line']])
+        assert chunk['line_count'] == chunk['end_line'] - chunk['start_line'] + 1
+
+    # Chunks are contiguous and the last one runs to the end of the file
+    for previous, following in zip(chunks, chunks[1:]):
+        assert following['start_line'] == previous['end_line'] + 1
+    assert chunks[-1]['end_line'] == len(lines)
+
+
+def test_python_leading_blank_lines_shift_ranges(parser):
+    plain = outline(parser.parse_file(Path("edge.py"), PYTHON_EDGE_CASES))
+    shifted = outline(parser.parse_file(Path("edge.py"), "\n\n" + PYTHON_EDGE_CASES))
+
+    assert shifted == [(name, kind, start + 2, end + 2) for name, kind, start, end in plain]
+
+
+def test_python_file_starting_with_definition(parser):
+    chunks = parser.parse_file(Path("one.py"), "def only():\n    return 1\n")
+
+    assert outline(chunks) == [('only', 'function', 1, 3)]
@@ -0,0 +1,159 @@
+"""Unit tests for the semantic query cache."""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.retrieval.cache import SemanticQueryCache
+
+
+DIM = 8
+
+
+def unit(index: int) -> np.ndarray:
+    """Return the basis vector along one axis."""
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+def at_similarity(similarity: float) -> np.ndarray:
+    """Return a unit vector with the given cosine similarity to unit(0)."""
+    return similarity * unit(0) + math.sqrt(1 - similarity ** 2) * unit(1)
+
+
+@pytest.fixture
+def cache():
+    return SemanticQueryCache(max_entries=1024, threshold=0.97)
+
+
+@pytest.fixture
+def scope():
+    return SemanticQueryCache.make_scope("repo-1", "collection-1", 5)
+
+
+def test_semantic_hit_at_threshold(cache, scope):
+    cache.put(scope, "how does login work", unit(0), "answer")
+
+    assert cache.get_by_embedding(scope, at_similarity(0.99)) == "answer"
+    assert cache.get_by_embedding(scope, at_similarity(0.975)) == "answer"
+    # Scale doesn't matter, only direction
+    assert cache.get_by_embedding(scope, 3.0 * unit(0)) == "answer"
+
+
+def test_semantic_miss_below_threshold(cache, scope):
+    cache.put(scope, "how does login work", unit(0), "answer")
+
+    assert cache.get_by_embedding(scope, at_similarity(0.96)) is None
+    assert cache.get_by_embedding(scope, unit(1)) is None
+
+    stats = cache.get_stats()
+    assert stats['misses'] == 2
+    assert stats['hits'] == 0
+
+
+def test_exact_text_hit_ignores_case_and_whitespace(cache, scope):
+    cache.put(scope, "How does  login work", unit(0), "answer")
+
+    assert cache.get_by_text(scope, "how does login work") == "answer"
+    assert cache.get_by_text(scope, "  HOW does login\twork ") == "answer"
+    assert cache.get_by_text(scope, "how does logout work") is None
+
+
+def test_put_same_query_replaces_entry(cache, scope):
+    cache.put(scope, "query", unit(0), "old")
+    cache.put(scope, "query", unit(0), "new")
+
+    assert cache.get_by_text(scope, "query") == "new"
+    assert cache.get_by_embedding(scope, unit(0)) == "new"
+    assert cache.get_stats()['entries'] == 1
+
+
+def test_scopes_are_isolated(cache, scope):
+    cache.put(scope, "query", unit(0), "answer")
+
+    other_repo = SemanticQueryCache.make_scope("repo-2", "collection-1", 5)
+    other_params = SemanticQueryCache.make_scope("repo-1", "collection-1", 10)
+    filtered = SemanticQueryCache.make_scope(
+        "repo-1", "collection-1", 5, filters={'language': 'python'}
+    )
+
+    for other in (other_repo, other_params, filtered):
+        assert cache.get_by_text(other, "query") is None
+        assert cache.get_by_embedding(other, unit(0)) is None
+
+
+def test_filter_order_does_not_change_scope():
+    first = SemanticQueryCache.make_scope(
+        "repo-1", "collection-1", filters={'language': 'python', 'chunk_type': 'function'}
+    )
+    second = SemanticQueryCache.make_scope(
+        "repo-1", "collection-1", filters={'chunk_type': 'function', 'language': 'python'}
+    )
+    assert first == second
+
+
+def test_dimension_mismatch_is_a_miss(cache, scope):
+    cache.put(scope, "query", unit(0), "answer")
+
+    assert cache.get_by_embedding(scope, np.ones(DIM * 2, dtype=np.float32)) is None
+
+
+def test_lru_eviction_at_max_entries(cache, scope):
+    rng = np.random.default_rng(0)
+    for i in range(1024):
+        cache.put(scope, f"query {i}", rng.standard_normal(DIM), f"answer {i}")
+    assert cache.get_stats()['entries'] == 1024
+
+    # Touch the oldest entry so the second oldest is evicted instead
+    assert cache.get_by_text(scope, "query 0") == "answer 0"
+    cache.put(scope, "query 1024", rng.standard_normal(DIM), "answer 1024")
+
+    assert cache.get_stats()['entries'] == 1024
+    assert cache.get_by_text(scope, "query 0") == "answer 0"
+    assert cache.get_by_text(scope, "query 1") is None
+    assert cache.get_by_text(scope, "query 2") == "answer 2"
+    assert cache.get_by_text(scope, "query 1024") == "answer 1024"
+
+
+def test_eviction_keeps_semantic_rows_aligned():
+    cache = SemanticQueryCache(max_entries=2, threshold=0.97)
+    scope = SemanticQueryCache.make_scope("repo-1", "collection-1")
+
+    cache.put(scope, "first", unit(0), "first answer")
+    cache.put(scope, "second", unit(1), "second answer")
+    cache.put(scope, "third", unit(2), "third answer")
+
+    assert cache.get_by_embedding(scope, unit(0)) is None
+    assert cache.get_by_embedding(scope, unit(1)) == "second answer"
+    assert cache.get_by_embedding(scope, unit(2)) == "third answer"
+
+
+def test_invalidate_repo(cache):
+    scope_1 = SemanticQueryCache.make_scope("repo-1", "collection-1")
+    scope_1_filtered = SemanticQueryCache.make_scope(
+        "repo-1", "collection-1", filters={'language': 'python'}
+    )
+    scope_2 = SemanticQueryCache.make_scope("repo-2", "collection-2")
+
+    cache.put(scope_1, "query", unit(0), "repo 1")
+    cache.put(scope_1_filtered, "query", unit(0), "repo 1 filtered")
+    cache.put(scope_2, "query", unit(0), "repo 2")
+
+    cache.invalidate("repo-1")
+
+    assert cache.get_by_text(scope_1, "query") is None
+    assert cache.get_by_embedding(scope_1_filtered, unit(0)) is None
+    assert cache.get_by_text(scope_2, "query") == "repo 2"
+    assert cache.get_by_embedding(scope_2, unit(0)) == "repo 2"
+    assert cache.get_stats()['entries'] == 1
+
+
+def test_invalidate_all(cache):
+    cache.put(SemanticQueryCache.make_scope("repo-1", "c1"), "query", unit(0), "a")
+    cache.put(SemanticQueryCache.make_scope("repo-2", "c2"), "query", unit(0), "b")
+
+    cache.invalidate()
+
+    assert cache.get_stats()['entries'] == 0